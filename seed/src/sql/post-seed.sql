@@ -324,3 +324,365 @@ LEFT JOIN data_clean.dim_energy de ON fs.mine_id = de.mine_id
 WHERE ds.latitude IS NOT NULL
   AND ds.longitude IS NOT NULL;
 
+-- Mine Fitness - tier scores precomputed per scoring config
+-- Mirrors EvolutionaryModel.calculate_tier_scores. Each scoring config (tier weights,
+-- tier feature weights, country and status scores) is identified by the md5 of its
+-- JSONB text, so the server and the seed agree on versions without sharing code.
+CREATE TABLE data_analytics.scoring_configs (
+    config_version TEXT PRIMARY KEY,
+    config JSONB NOT NULL,
+    -- Maximum of each normalized input when the scores were computed
+    normalization JSONB,
+    -- public.data_versions '*' version the scores reflect
+    data_version BIGINT,
+    refreshed_at TIMESTAMP
+);
+
+CREATE TABLE data_analytics.mine_fitness (
+    config_version TEXT NOT NULL REFERENCES data_analytics.scoring_configs (config_version) ON DELETE CASCADE,
+    mine_id UUID NOT NULL,
+    -- md5 of the mine's scoring inputs, so a refresh only rewrites mines that changed
+    inputs_hash TEXT NOT NULL,
+    depth_score_norm FLOAT,
+    diameter_score_norm FLOAT,
+    shaft_count_score_norm FLOAT,
+    reported_shaft_score_norm FLOAT,
+    volume_score_norm FLOAT,
+    is_coal_mine_norm FLOAT,
+    country_score_norm FLOAT,
+    status_score_norm FLOAT,
+    transport_score_norm FLOAT,
+    has_grid_connection_norm FLOAT,
+    in_rez_zone_norm FLOAT,
+    deep_bonus_norm FLOAT,
+    multi_shaft_bonus_norm FLOAT,
+    has_evaluation_norm FLOAT,
+    has_identity_norm FLOAT,
+    has_company_norm FLOAT,
+    "T1_score" FLOAT,
+    "T2_score" FLOAT,
+    "T3_score" FLOAT,
+    "T4_score" FLOAT,
+    "T5_score" FLOAT,
+    has_required_data FLOAT,
+    overall_fitness FLOAT,
+    PRIMARY KEY (config_version, mine_id)
+);
+
+CREATE INDEX idx_mine_fitness_ranking
+    ON data_analytics.mine_fitness (config_version, overall_fitness DESC, mine_id);
+
+-- Clamp negatives to zero and scale by max_value, capped at 1, as _normalize_vectorized does
+CREATE FUNCTION data_analytics.normalize(value FLOAT, max_value FLOAT, inverse BOOLEAN DEFAULT FALSE)
+RETURNS FLOAT LANGUAGE sql IMMUTABLE AS $$
+    SELECT CASE
+        WHEN COALESCE(max_value, 0) = 0 THEN 0.0
+        WHEN inverse THEN 1 - LEAST(GREATEST(COALESCE(value, 0), 0) / max_value, 1)
+        ELSE LEAST(GREATEST(COALESCE(value, 0), 0) / max_value, 1)
+    END
+$$;
+
+-- Bring the scores of p_config up to date with the data and return its config version.
+-- Does nothing when the scores already reflect the current data version. Otherwise only
+-- new and changed mines are rescored, unless a normalization maximum moved, in which
+-- case every mine is. Concurrent refreshes of one config wait for each other.
+CREATE FUNCTION data_analytics.refresh_mine_fitness(p_config JSONB, p_force BOOLEAN DEFAULT FALSE)
+RETURNS TEXT LANGUAGE plpgsql AS $$
+DECLARE
+    v_version TEXT := md5(p_config::text);
+    v_data_version BIGINT;
+    v_exists BOOLEAN;
+    v_previous_data_version BIGINT;
+    v_previous_normalization JSONB;
+    v_normalization JSONB;
+    v_full BOOLEAN;
+    v_rescored INTEGER;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('mine_fitness:' || v_version));
+
+    SELECT version INTO v_data_version FROM public.data_versions WHERE scope = '*';
+    SELECT TRUE, data_version, normalization
+    INTO v_exists, v_previous_data_version, v_previous_normalization
+    FROM data_analytics.scoring_configs WHERE config_version = v_version;
+
+    IF v_exists AND NOT p_force AND v_previous_data_version IS NOT DISTINCT FROM v_data_version THEN
+        RETURN v_version;
+    END IF;
+
+    DROP TABLE IF EXISTS pg_temp.mine_fitness_inputs;
+    CREATE TEMP TABLE mine_fitness_inputs ON COMMIT DROP AS
+    SELECT DISTINCT ON (t0.mine_id)
+        t0.mine_id,
+        t0.country,
+        t0.status,
+        t1.no_shafts::FLOAT AS no_shafts,
+        t1.reported_no_shafts::FLOAT AS reported_no_shafts,
+        t1.total_shaft_volume,
+        t1.avg_diameter_m,
+        t1.avg_depth_m,
+        t1.is_coal_mine,
+        t2.nearest_train_station_km,
+        t2.nearest_airport_km,
+        t3.has_grid_connection,
+        t3.in_rez_zone,
+        t4.has_company,
+        t5.has_evaluation,
+        t5.has_identity
+    FROM data_analytics.t0_overview t0
+    LEFT JOIN data_analytics.t1_technical_parameters t1 ON t0.mine_id = t1.mine_id
+    LEFT JOIN data_analytics.t2_site_specific_conditions t2 ON t0.mine_id = t2.mine_id
+    LEFT JOIN data_analytics.t3_grid_integration t3 ON t0.mine_id = t3.mine_id
+    LEFT JOIN data_analytics.t4_financial_analysis t4 ON t0.mine_id = t4.mine_id
+    LEFT JOIN data_analytics.t5_investment_analysis t5 ON t0.mine_id = t5.mine_id
+    WHERE t0.mine_id IS NOT NULL
+    ORDER BY t0.mine_id;
+
+    SELECT jsonb_build_object(
+        'avg_depth_m', COALESCE(MAX(GREATEST(COALESCE(avg_depth_m, 0), 0)), 0),
+        'avg_diameter_m', COALESCE(MAX(GREATEST(COALESCE(avg_diameter_m, 0), 0)), 0),
+        'no_shafts', COALESCE(MAX(GREATEST(COALESCE(no_shafts, 0), 0)), 0),
+        'reported_no_shafts', COALESCE(MAX(GREATEST(COALESCE(reported_no_shafts, 0), 0)), 0),
+        'total_shaft_volume', COALESCE(MAX(GREATEST(COALESCE(total_shaft_volume, 0), 0)), 0),
+        'nearest_airport_km', COALESCE(MAX(GREATEST(COALESCE(nearest_airport_km, 0), 0)), 0),
+        'nearest_train_station_km', COALESCE(MAX(GREATEST(COALESCE(nearest_train_station_km, 0), 0)), 0)
+    )
+    INTO v_normalization
+    FROM mine_fitness_inputs;
+
+    v_full := p_force OR v_exists IS NOT TRUE OR v_previous_normalization IS DISTINCT FROM v_normalization;
+
+    INSERT INTO data_analytics.scoring_configs (config_version, config, normalization, data_version, refreshed_at)
+    VALUES (v_version, p_config, v_normalization, v_data_version, NOW())
+    ON CONFLICT (config_version) DO UPDATE
+        SET normalization = EXCLUDED.normalization,
+            data_version = EXCLUDED.data_version,
+            refreshed_at = EXCLUDED.refreshed_at;
+
+    DELETE FROM data_analytics.mine_fitness f
+    WHERE f.config_version = v_version
+      AND NOT EXISTS (SELECT 1 FROM mine_fitness_inputs i WHERE i.mine_id = f.mine_id);
+
+    WITH hashed AS (
+        SELECT i.*, md5(ROW(i.*)::text) AS inputs_hash
+        FROM mine_fitness_inputs i
+    ),
+    normalized AS (
+        SELECT
+            c.mine_id,
+            c.inputs_hash,
+            data_analytics.normalize(c.avg_depth_m, (v_normalization->>'avg_depth_m')::FLOAT) AS depth_score_norm,
+            data_analytics.normalize(c.avg_diameter_m, (v_normalization->>'avg_diameter_m')::FLOAT) AS diameter_score_norm,
+            data_analytics.normalize(c.no_shafts, (v_normalization->>'no_shafts')::FLOAT) AS shaft_count_score_norm,
+            data_analytics.normalize(c.reported_no_shafts, (v_normalization->>'reported_no_shafts')::FLOAT) AS reported_shaft_score_norm,
+            data_analytics.normalize(c.total_shaft_volume, (v_normalization->>'total_shaft_volume')::FLOAT) AS volume_score_norm,
+            1.0 - COALESCE(c.is_coal_mine::INT, 0) AS is_coal_mine_norm,
+            COALESCE((p_config->'country_scores'->>UPPER(c.country))::FLOAT, 0) AS country_score_norm,
+            COALESCE((p_config->'status_scores'->>UPPER(c.status))::FLOAT, 0) AS status_score_norm,
+            (
+                data_analytics.normalize(c.nearest_airport_km, (v_normalization->>'nearest_airport_km')::FLOAT, TRUE) +
+                data_analytics.normalize(c.nearest_train_station_km, (v_normalization->>'nearest_train_station_km')::FLOAT, TRUE)
+            ) / 2 AS transport_score_norm,
+            COALESCE(c.has_grid_connection::INT, 0)::FLOAT AS has_grid_connection_norm,
+            COALESCE(c.in_rez_zone::INT, 0)::FLOAT AS in_rez_zone_norm,
+            (GREATEST(COALESCE(c.avg_depth_m, 0), 0) > 200)::INT::FLOAT AS deep_bonus_norm,
+            (GREATEST(COALESCE(c.no_shafts, 0), 0) >= 3)::INT::FLOAT AS multi_shaft_bonus_norm,
+            COALESCE(c.has_evaluation::INT, 0)::FLOAT AS has_evaluation_norm,
+            COALESCE(c.has_identity::INT, 0)::FLOAT AS has_identity_norm,
+            COALESCE(c.has_company::INT, 0)::FLOAT AS has_company_norm,
+            (
+                UPPER(c.country) = 'AUSTRALIA'
+                AND c.has_grid_connection IS TRUE
+                AND c.in_rez_zone IS TRUE
+                AND c.total_shaft_volume > 0
+            )::INT::FLOAT AS has_required_data
+        FROM hashed c
+        WHERE v_full OR NOT EXISTS (
+            SELECT 1 FROM data_analytics.mine_fitness f
+            WHERE f.config_version = v_version AND f.mine_id = c.mine_id AND f.inputs_hash = c.inputs_hash
+        )
+    ),
+    -- One row per mine and feature, so tiers can weight features named in the config
+    features AS (
+        SELECT n.mine_id, f.feature, f.value
+        FROM normalized n
+        CROSS JOIN LATERAL (VALUES
+            ('depth_score_norm', n.depth_score_norm),
+            ('diameter_score_norm', n.diameter_score_norm),
+            ('shaft_count_score_norm', n.shaft_count_score_norm),
+            ('reported_shaft_score_norm', n.reported_shaft_score_norm),
+            ('volume_score_norm', n.volume_score_norm),
+            ('is_coal_mine_norm', n.is_coal_mine_norm),
+            ('country_score_norm', n.country_score_norm),
+            ('status_score_norm', n.status_score_norm),
+            ('transport_score_norm', n.transport_score_norm),
+            ('has_grid_connection_norm', n.has_grid_connection_norm),
+            ('in_rez_zone_norm', n.in_rez_zone_norm),
+            ('deep_bonus_norm', n.deep_bonus_norm),
+            ('multi_shaft_bonus_norm', n.multi_shaft_bonus_norm),
+            ('has_evaluation_norm', n.has_evaluation_norm),
+            ('has_identity_norm', n.has_identity_norm),
+            ('has_company_norm', n.has_company_norm)
+        ) AS f (feature, value)
+    ),
+    weights AS (
+        SELECT t.key AS tier, w.key AS feature, w.value::FLOAT AS weight
+        FROM jsonb_each(p_config->'scoring_config') t
+        CROSS JOIN LATERAL jsonb_each_text(t.value) w
+    ),
+    -- Weighted sum of each tier's features, clipped to [0, 1]
+    tiers AS (
+        SELECT f.mine_id, w.tier, LEAST(GREATEST(SUM(COALESCE(f.value, 0) * w.weight), 0), 1) AS score
+        FROM features f
+        JOIN weights w ON w.feature = f.feature
+        GROUP BY f.mine_id, w.tier
+    ),
+    tier_scores AS (
+        SELECT
+            mine_id,
+            COALESCE(MAX(score) FILTER (WHERE tier = 'T1'), 0) AS t1,
+            COALESCE(MAX(score) FILTER (WHERE tier = 'T2'), 0) AS t2,
+            COALESCE(MAX(score) FILTER (WHERE tier = 'T3'), 0) AS t3,
+            COALESCE(MAX(score) FILTER (WHERE tier = 'T4'), 0) AS t4,
+            COALESCE(MAX(score) FILTER (WHERE tier = 'T5'), 0) AS t5
+        FROM tiers
+        GROUP BY mine_id
+    )
+    INSERT INTO data_analytics.mine_fitness
+    SELECT
+        v_version,
+        n.mine_id,
+        n.inputs_hash,
+        n.depth_score_norm,
+        n.diameter_score_norm,
+        n.shaft_count_score_norm,
+        n.reported_shaft_score_norm,
+        n.volume_score_norm,
+        n.is_coal_mine_norm,
+        n.country_score_norm,
+        n.status_score_norm,
+        n.transport_score_norm,
+        n.has_grid_connection_norm,
+        n.in_rez_zone_norm,
+        n.deep_bonus_norm,
+        n.multi_shaft_bonus_norm,
+        n.has_evaluation_norm,
+        n.has_identity_norm,
+        n.has_company_norm,
+        s.t1, s.t2, s.t3, s.t4, s.t5,
+        n.has_required_data,
+        (
+            s.t1 * (p_config->'tier_weights'->>'T1')::FLOAT +
+            s.t2 * (p_config->'tier_weights'->>'T2')::FLOAT +
+            s.t3 * (p_config->'tier_weights'->>'T3')::FLOAT +
+            s.t4 * (p_config->'tier_weights'->>'T4')::FLOAT +
+            s.t5 * (p_config->'tier_weights'->>'T5')::FLOAT
+        ) * n.has_required_data
+    FROM normalized n
+    JOIN tier_scores s ON s.mine_id = n.mine_id
+    ON CONFLICT (config_version, mine_id) DO UPDATE
+        SET inputs_hash = EXCLUDED.inputs_hash,
+            depth_score_norm = EXCLUDED.depth_score_norm,
+            diameter_score_norm = EXCLUDED.diameter_score_norm,
+            shaft_count_score_norm = EXCLUDED.shaft_count_score_norm,
+            reported_shaft_score_norm = EXCLUDED.reported_shaft_score_norm,
+            volume_score_norm = EXCLUDED.volume_score_norm,
+            is_coal_mine_norm = EXCLUDED.is_coal_mine_norm,
+            country_score_norm = EXCLUDED.country_score_norm,
+            status_score_norm = EXCLUDED.status_score_norm,
+            transport_score_norm = EXCLUDED.transport_score_norm,
+            has_grid_connection_norm = EXCLUDED.has_grid_connection_norm,
+            in_rez_zone_norm = EXCLUDED.in_rez_zone_norm,
+            deep_bonus_norm = EXCLUDED.deep_bonus_norm,
+            multi_shaft_bonus_norm = EXCLUDED.multi_shaft_bonus_norm,
+            has_evaluation_norm = EXCLUDED.has_evaluation_norm,
+            has_identity_norm = EXCLUDED.has_identity_norm,
+            has_company_norm = EXCLUDED.has_company_norm,
+            "T1_score" = EXCLUDED."T1_score",
+            "T2_score" = EXCLUDED."T2_score",
+            "T3_score" = EXCLUDED."T3_score",
+            "T4_score" = EXCLUDED."T4_score",
+            "T5_score" = EXCLUDED."T5_score",
+            has_required_data = EXCLUDED.has_required_data,
+            overall_fitness = EXCLUDED.overall_fitness;
+
+    GET DIAGNOSTICS v_rescored = ROW_COUNT;
+    RAISE NOTICE 'Rescored % mines for scoring config %', v_rescored, v_version;
+    RETURN v_version;
+END;
+$$;
+
+-- Tell running API workers that all data has changed so they drop their caches
+INSERT INTO public.data_versions (scope, version, changed_at)
+VALUES ('*', (EXTRACT(EPOCH FROM clock_timestamp()) * 1000)::BIGINT, NOW())
+ON CONFLICT (scope) DO UPDATE
+    SET version = GREATEST(public.data_versions.version + 1, EXCLUDED.version),
+        changed_at = EXCLUDED.changed_at;
+
+-- Precompute tier scores for the default scoring config against the new data version.
+-- Keep in step with TIER_WEIGHTS, SCORING_CONFIG, COUNTRY_SCORES and STATUS_SCORES in
+-- server/src/ml/models/deap.py; any other config is scored when the server first needs it
+SELECT data_analytics.refresh_mine_fitness('{
+    "tier_weights": {
+        "T1": 0.4,
+        "T2": 0.25,
+        "T3": 0.25,
+        "T4": 0.07,
+        "T5": 0.03
+    },
+    "scoring_config": {
+        "T1": {
+            "volume_score_norm": 0.7,
+            "shaft_count_score_norm": 0.15,
+            "depth_score_norm": 0.05,
+            "reported_shaft_score_norm": 0.05,
+            "is_coal_mine_norm": 0.03,
+            "diameter_score_norm": 0.02
+        },
+        "T2": {
+            "country_score_norm": 0.7,
+            "status_score_norm": 0.2,
+            "transport_score_norm": 0.1
+        },
+        "T3": {
+            "has_grid_connection_norm": 0.55,
+            "in_rez_zone_norm": 0.45
+        },
+        "T4": {
+            "is_coal_mine_norm": 0.5,
+            "multi_shaft_bonus_norm": 0.3,
+            "deep_bonus_norm": 0.2
+        },
+        "T5": {
+            "has_evaluation_norm": 0.4,
+            "has_identity_norm": 0.3,
+            "has_company_norm": 0.3
+        }
+    },
+    "country_scores": {
+        "AUSTRALIA": 1.0,
+        "CANADA": 0.8,
+        "USA": 0.7,
+        "CHILE": 0.6,
+        "SOUTH AFRICA": 0.5
+    },
+    "status_scores": {
+        "CLOSED": 1.0,
+        "CLOSURE": 1.0,
+        "ABANDONED": 0.9,
+        "REHABILITATED": 0.9,
+        "MOTHBALLED": 0.7,
+        "CANCELLED": 0.6,
+        "SHELVED": 0.5,
+        "SUSPENDED": 0.5,
+        "MAINTENANCE": 0.3,
+        "OPERATION": 0.1,
+        "OPERATING": 0.1,
+        "ACTIVE": 0.0,
+        "PROPOSED": 0.0,
+        "OPENED": 0.0,
+        "REOPENING": 0.0,
+        "IN DEVELOPMENT": 0.0
+    }
+}'::jsonb);
+
+SELECT pg_notify('lucent_data_changed', '{"scope": "*"}');
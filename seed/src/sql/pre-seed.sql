@@ -43,6 +43,80 @@ CREATE TABLE public.pipeline_logs (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Slow queries captured by the API server
+CREATE TABLE public.slow_queries (
+    id SERIAL PRIMARY KEY,
+    route VARCHAR(255) NOT NULL,
+    query_hash VARCHAR(32) NOT NULL,
+    query TEXT NOT NULL,
+    param_shape JSONB,
+    duration_ms DOUBLE PRECISION NOT NULL,
+    row_count INTEGER,
+    plan JSONB,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX idx_slow_queries_created_at ON public.slow_queries(created_at);
+CREATE INDEX idx_slow_queries_route_duration ON public.slow_queries(route, duration_ms DESC);
+
+-- Data versions per table, bumped by writers alongside NOTIFY lucent_data_changed
+CREATE TABLE public.data_versions (
+    scope VARCHAR(255) PRIMARY KEY,
+    version BIGINT NOT NULL,
+    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Results of model runs, written by the API and job workers
+CREATE TABLE public.model_results (
+    id SERIAL PRIMARY KEY,
+    ml_name VARCHAR(255) NOT NULL,
+    results JSONB,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Queued model runs, claimed by workers with FOR UPDATE SKIP LOCKED
+CREATE TABLE public.model_jobs (
+    job_id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    model_type VARCHAR(100) NOT NULL,
+    model_name VARCHAR(255) NOT NULL,
+    force BOOLEAN NOT NULL DEFAULT FALSE,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'running', 'succeeded', 'failed', 'cancelled')),
+    progress JSONB,
+    cancel_requested BOOLEAN NOT NULL DEFAULT FALSE,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker VARCHAR(255),
+    result_id INTEGER REFERENCES public.model_results(id),
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    heartbeat_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+CREATE INDEX idx_model_jobs_claim ON public.model_jobs(created_at) WHERE status IN ('queued', 'running');
+CREATE INDEX idx_model_jobs_status ON public.model_jobs(status, created_at DESC);
+
+-- Model runs keyed on model type, config, data version and code version, so identical runs reuse their results
+CREATE TABLE public.model_runs (
+    run_key CHAR(64) PRIMARY KEY,
+    model_type VARCHAR(100) NOT NULL,
+    config JSONB NOT NULL,
+    data_version BIGINT NOT NULL,
+    code_version VARCHAR(64) NOT NULL,
+    result_id INTEGER NOT NULL REFERENCES public.model_results(id) ON DELETE CASCADE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Trained model artifacts by version, shared by the API and job workers on every node
+CREATE TABLE public.model_artifacts (
+    model_type VARCHAR(100) NOT NULL,
+    version INTEGER NOT NULL,
+    manifest JSONB NOT NULL,
+    archive BYTEA NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (model_type, version)
+);
+
 -- ========================================
 -- DATA_CLEAN SCHEMA TABLES
 -- ========================================
@@ -202,3 +276,5 @@ CREATE INDEX idx_shafts_number ON data_clean.fact_shafts(shaft_number);
 CREATE INDEX idx_documentation_mine_id ON data_clean.fact_documentation(mine_id);
 CREATE INDEX idx_commodities_mine_id ON data_clean.fact_commodities(mine_id);
 CREATE INDEX idx_commodities_commodity ON data_clean.fact_commodities(commodity);
+CREATE INDEX idx_pairwise_comparisons_w_id ON data_clean.fact_pairwise_comparisons(w_id);
+CREATE INDEX idx_pairwise_comparisons_l_id ON data_clean.fact_pairwise_comparisons(l_id);
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Genetic algorithm benchmark for the evolutionary model.
+
+Runs the GA over a synthetic fitness array two ways: the previous DEAP loop,
+with individuals as Python lists evaluated one at a time and mutated through a
+list to array round trip, and the array-based evolve() used now, which
+evaluates the whole population in one pass. With --islands, the same budget is
+also split across that many islands evolved in parallel processes. Needs no
+database. Run from the server directory:
+
+    poetry run python benchmarks/genetic.py --populations 50 500 2000 --generations 20 100 --output genetic.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import subprocess
+from datetime import datetime, timezone
+
+import numpy as np
+from deap import algorithms, base, creator, tools
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+# Nothing connects, but the database settings are read on import
+os.environ.setdefault("DB_PORT", "5432")
+
+from src.ml.models.deap import GA_PARAMETERS, evaluate_population, evolve, evolve_islands  # noqa: E402
+
+
+def synthetic_fitness(n: int, seed: int) -> np.ndarray:
+    """Tier score like fitness: most mines fail the hard requirements and score zero."""
+    rng = np.random.default_rng(seed)
+    return rng.random(n) * (rng.random(n) < 0.2)
+
+
+def legacy_evolve(fitness_array: np.ndarray, parameters: dict) -> float:
+    """The previous GA loop with DEAP list individuals. Returns the best fitness."""
+    for attr in ["FitnessMax", "Individual"]:
+        if hasattr(creator, attr):
+            delattr(creator, attr)
+    creator.create("FitnessMax", base.Fitness, weights=(1.0,))
+    creator.create("Individual", list, fitness=creator.FitnessMax)
+
+    n_mines = len(fitness_array)
+    length = parameters["individual_size"]
+
+    toolbox = base.Toolbox()
+    toolbox.register("mine_index", random.randrange, n_mines)
+    toolbox.register("individual", tools.initRepeat, creator.Individual, toolbox.mine_index, n=length)
+    toolbox.register("population", tools.initRepeat, list, toolbox.individual)
+
+    def evaluate_fast(individual):
+        unique_indices = np.unique(individual)
+        if len(unique_indices) < parameters["min_unique"]:
+            return (0.0,)
+        return (np.mean(fitness_array[unique_indices]) * len(unique_indices) / length,)
+
+    def mutate_fast(individual, indpb):
+        mask = np.random.random(len(individual)) < indpb
+        mutations = np.random.randint(0, n_mines, size=np.sum(mask))
+        individual_array = np.array(individual)
+        individual_array[mask] = mutations
+        individual[:] = individual_array.tolist()
+        return (individual,)
+
+    toolbox.register("evaluate", evaluate_fast)
+    toolbox.register("mate", tools.cxTwoPoint)
+    toolbox.register("mutate", mutate_fast, indpb=parameters["indpb"])
+    toolbox.register("select", tools.selTournament, tournsize=parameters["tournsize"])
+
+    population = toolbox.population(n=parameters["population_size"])
+    for generation in range(parameters["generations"] + 1):
+        if generation > 0:
+            population = toolbox.select(population, len(population))
+            population = algorithms.varAnd(population, toolbox, parameters["cxpb"], parameters["mutpb"])
+
+        invalid = [ind for ind in population if not ind.fitness.valid]
+        for ind, fit in zip(invalid, map(toolbox.evaluate, invalid)):
+            ind.fitness.values = fit
+
+    return tools.selBest(population, k=1)[0].fitness.values[0]
+
+
+def array_evolve(fitness_array: np.ndarray, parameters: dict) -> float:
+    """The current GA loop. Returns the best fitness."""
+    for state in evolve(fitness_array, parameters):
+        pass
+    return float(state["fitness"].max())
+
+
+def island_evolve(fitness_array: np.ndarray, parameters: dict) -> float:
+    """The island model. Returns the best fitness over every island."""
+    for state in evolve_islands(fitness_array, parameters):
+        pass
+    return float(state["fitness"].max())
+
+
+def check_evaluation(fitness_array: np.ndarray, parameters: dict, seed: int) -> float:
+    """Largest difference between the vectorized and per-individual fitness of a random population."""
+    rng = np.random.default_rng(seed)
+    length = parameters["individual_size"]
+    # Few distinct mines so both sides of the min_unique cut off are covered
+    population = rng.integers(0, rng.integers(20, 200, size=(500, 1)), size=(500, length))
+
+    expected = []
+    for individual in population:
+        unique_indices = np.unique(individual)
+        if len(unique_indices) < parameters["min_unique"]:
+            expected.append(0.0)
+        else:
+            expected.append(np.mean(fitness_array[unique_indices]) * len(unique_indices) / length)
+
+    actual = evaluate_population(population, fitness_array, parameters["min_unique"])
+    return float(np.abs(actual - np.array(expected)).max())
+
+
+def timed(fn, repeat: int) -> tuple:
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SERVER_DIR, capture_output=True, text=True
+        ).stdout.strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the DEAP list GA with the array GA")
+    parser.add_argument("--mines", type=int, default=20000, help="Mines in the fitness array (default: 20000)")
+    parser.add_argument("--populations", type=int, nargs="+", default=[50, 500, 2000], help="Population sizes to run")
+    parser.add_argument("--generations", type=int, nargs="+", default=[20, 100], help="Generation counts to run")
+    parser.add_argument("--legacy-max", type=int, default=200000,
+                        help="Largest population x generations to run the DEAP loop on (default: 200000)")
+    parser.add_argument("--islands", type=int, default=1,
+                        help="Also run each population split into this many parallel islands (default: 1, off)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per timing, best kept (default: 3)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    np.random.seed(args.seed)
+    fitness_array = synthetic_fitness(args.mines, args.seed)
+
+    max_error = check_evaluation(fitness_array, GA_PARAMETERS, args.seed)
+    print(f"Largest fitness difference from per-individual evaluation: {max_error:.2e}")
+
+    results = []
+    for population_size in args.populations:
+        for generations in args.generations:
+            parameters = {**GA_PARAMETERS, "population_size": population_size, "generations": generations,
+                          "seed": args.seed}
+            array_s, array_best = timed(lambda: array_evolve(fitness_array, parameters), args.repeat)
+            result = {
+                "population_size": population_size,
+                "generations": generations,
+                "array_s": round(array_s, 4),
+                "array_best_fitness": array_best,
+                "legacy_s": None,
+                "legacy_best_fitness": None,
+                "islands_s": None,
+                "islands_best_fitness": None
+            }
+
+            if args.islands > 1:
+                island_parameters = {**parameters, "islands": args.islands,
+                                     "population_size": max(population_size // args.islands, 2)}
+                islands_s, islands_best = timed(lambda: island_evolve(fitness_array, island_parameters), args.repeat)
+                result["islands_s"] = round(islands_s, 4)
+                result["islands_best_fitness"] = islands_best
+
+            if population_size * generations <= args.legacy_max:
+                legacy_s, legacy_best = timed(lambda: legacy_evolve(fitness_array, parameters), args.repeat)
+                result["legacy_s"] = round(legacy_s, 4)
+                result["legacy_best_fitness"] = legacy_best
+
+            results.append(result)
+            legacy = f"{result['legacy_s']:.3f}s" if result["legacy_s"] is not None else "skipped"
+            speedup = f" ({result['legacy_s'] / result['array_s']:.0f}x)" if result["legacy_s"] else ""
+            islands = f"  islands={result['islands_s']:.4f}s" if result["islands_s"] is not None else ""
+            print(f"{population_size:>6} x {generations:<4} legacy={legacy:<10} array={result['array_s']:.4f}s{speedup}  "
+                  f"best={array_best:.4f}{islands}")
+
+    report = {
+        "benchmark": "genetic",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "mines": args.mines,
+        "islands": args.islands,
+        "cpu_count": os.cpu_count(),
+        "max_evaluation_error": max_error,
+        "results": results
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
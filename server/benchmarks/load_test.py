@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+HTTP load test for the data API.
+
+Runs closed-loop concurrent clients against a running API for a fixed duration.
+Each client repeatedly picks a route scenario and records its latency.
+Throughput and p50/p95/p99 latency per route are printed and can be written as
+JSON so releases can be compared. Seed the database first with seed_synthetic.py.
+
+    poetry run python benchmarks/load_test.py --concurrency 16 --duration 60 --output load.json
+"""
+
+import os
+import json
+import time
+import random
+import argparse
+import platform
+import threading
+import subprocess
+import http.client
+from urllib.parse import urlencode, urlsplit
+from datetime import datetime, timezone
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASE_URL = os.getenv('SERVER_URL', 'http://localhost:5174')
+
+# Mines sampled once up front so row lookups and nearby searches hit real data
+SAMPLE_SQL = """
+    SELECT ds.mine_id::text AS mine_id, ds.latitude::float AS latitude, ds.longitude::float AS longitude
+    FROM data_clean.dim_spatial ds
+    TABLESAMPLE SYSTEM (10)
+    LIMIT 1000
+"""
+
+
+def table_browse(rng, samples):
+    params = {"limit": 50, "offset": rng.randrange(0, 5000)}
+    return "GET", f"/api/v1/schemas/data_clean/tables/dim_locations?{urlencode(params)}", None
+
+
+def board(rng, samples):
+    params = {"limit": 100, "offset": rng.choice([0, 0, 0, 100, 200])}
+    return "GET", f"/api/v1/evaluation-board/mines?{urlencode(params)}", None
+
+
+def spatial(rng, samples):
+    params = {"limit": 500, "country": rng.choice(["Australia", "Canada", "USA", "Australia,Chile"])}
+    return "GET", f"/api/v1/spatial/mines?{urlencode(params)}", None
+
+
+def nearby(rng, samples):
+    mine = rng.choice(samples)
+    params = {"latitude": mine["latitude"], "longitude": mine["longitude"], "radius_m": 5000}
+    return "GET", f"/api/v1/schemas/data_analytics/tables/shaft_summary/nearby?{urlencode(params)}", None
+
+
+def query(rng, samples):
+    sql = rng.choice([
+        "SELECT country, COUNT(*) AS mines FROM data_clean.dim_locations GROUP BY country ORDER BY mines DESC",
+        "SELECT * FROM data_analytics.t1_technical_parameters ORDER BY total_shaft_volume DESC NULLS LAST",
+        "SELECT status, COUNT(*) AS mines FROM data_clean.dim_status GROUP BY status",
+    ])
+    return "POST", "/api/v1/query", {"sql": sql, "limit": 100, "offset": 0}
+
+
+def row_lookup(rng, samples):
+    mine = rng.choice(samples)
+    params = {"id_key": "mine_id", "id_value": mine["mine_id"]}
+    return "GET", f"/api/v1/schemas/data_analytics/tables/mine_summary/row?{urlencode(params)}", None
+
+
+SCENARIOS = {
+    "table_browse": table_browse,
+    "board": board,
+    "spatial": spatial,
+    "nearby": nearby,
+    "query": query,
+    "row_lookup": row_lookup,
+}
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Client:
+    """One keep-alive HTTP connection issuing requests in a closed loop."""
+
+    def __init__(self, base_url: str, timeout: float) -> None:
+        parts = urlsplit(base_url)
+        connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.connection = connection_class(parts.hostname, parts.port, timeout=timeout)
+
+    def request(self, method: str, path: str, body) -> tuple:
+        payload = json.dumps(body) if body is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        try:
+            self.connection.request(method, path, body=payload, headers=headers)
+            response = self.connection.getresponse()
+            data = response.read()
+            return response.status, len(data)
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            return None, 0
+
+
+def fetch_samples(base_url: str, timeout: float) -> list:
+    client = Client(base_url, timeout)
+    client.connection.request("POST", "/api/v1/query", body=json.dumps({"sql": SAMPLE_SQL, "limit": None}),
+                              headers={"Content-Type": "application/json"})
+    response = client.connection.getresponse()
+    body = json.loads(response.read())
+    if response.status != 200 or not body.get("data"):
+        raise RuntimeError(f"Could not sample mines from the API ({response.status}): {body}")
+    return body["data"]
+
+
+def worker(base_url, timeout, routes, samples, seed, deadline, record_after, results, lock):
+    rng = random.Random(seed)
+    client = Client(base_url, timeout)
+    local = {route: {"latencies": [], "errors": 0, "bytes": 0} for route in routes}
+
+    while True:
+        route = rng.choice(routes)
+        method, path, body = SCENARIOS[route](rng, samples)
+
+        start = time.perf_counter()
+        status, size = client.request(method, path, body)
+        finished = time.perf_counter()
+
+        if finished >= deadline:
+            break
+        if finished < record_after:
+            continue
+
+        entry = local[route]
+        entry["latencies"].append(finished - start)
+        entry["bytes"] += size
+        if status is None or status >= 400:
+            entry["errors"] += 1
+
+    with lock:
+        for route, entry in local.items():
+            results[route]["latencies"].extend(entry["latencies"])
+            results[route]["errors"] += entry["errors"]
+            results[route]["bytes"] += entry["bytes"]
+
+
+def summarise(results: dict, measured_s: float) -> dict:
+    summary = {}
+    for route, entry in results.items():
+        latencies = sorted(entry["latencies"])
+        count = len(latencies)
+        summary[route] = {
+            "requests": count,
+            "errors": entry["errors"],
+            "throughput_rps": round(count / measured_s, 2) if measured_s else 0.0,
+            "mean_ms": round(sum(latencies) / count * 1000, 2) if count else 0.0,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            "max_ms": round(latencies[-1] * 1000, 2) if count else 0.0,
+            "avg_bytes": round(entry["bytes"] / count) if count else 0
+        }
+    return summary
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SERVER_DIR, capture_output=True, text=True
+        ).stdout.strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the data API with concurrent clients and report latency per route")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL, help=f"API base URL (default: {DEFAULT_BASE_URL})")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients (default: 8)")
+    parser.add_argument("--duration", type=float, default=30, help="Measured seconds (default: 30)")
+    parser.add_argument("--warmup", type=float, default=5, help="Unmeasured seconds before measuring (default: 5)")
+    parser.add_argument("--routes", nargs="+", choices=sorted(SCENARIOS), default=list(SCENARIOS),
+                        help="Route scenarios to include (default: all)")
+    parser.add_argument("--timeout", type=float, default=60, help="Per-request timeout in seconds (default: 60)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for scenario selection (default: 42)")
+    parser.add_argument("--label", default="", help="Free-form label stored with the results, e.g. a release name")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    samples = fetch_samples(args.base_url, args.timeout)
+    print(f"Sampled {len(samples)} mines, running {args.concurrency} clients for "
+          f"{args.warmup:.0f}s warm-up + {args.duration:.0f}s")
+
+    results = {route: {"latencies": [], "errors": 0, "bytes": 0} for route in args.routes}
+    lock = threading.Lock()
+
+    record_after = time.perf_counter() + args.warmup
+    deadline = record_after + args.duration
+
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(args.base_url, args.timeout, args.routes, samples, args.seed + i, deadline, record_after, results, lock)
+        )
+        for i in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    summary = summarise(results, args.duration)
+    total_requests = sum(route["requests"] for route in summary.values())
+
+    print(f"\n{'route':<14}{'requests':>10}{'errors':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for route, stats in summary.items():
+        print(f"{route:<14}{stats['requests']:>10}{stats['errors']:>8}{stats['throughput_rps']:>10.2f}"
+              f"{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}")
+    print(f"\nTotal throughput: {total_requests / args.duration:.2f} req/s")
+
+    report = {
+        "benchmark": "load_test",
+        "label": args.label,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "base_url": args.base_url,
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "warmup_s": args.warmup,
+        "seed": args.seed,
+        "total_throughput_rps": round(total_requests / args.duration, 2),
+        "routes": summary
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
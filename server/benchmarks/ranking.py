@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Ranking benchmark for the learn to rank model.
+
+Ranks synthetic mines with an untrained ranker two ways: the previous heap sort,
+which ran a batch-of-one forward pass per comparison and swapped pandas rows
+with iloc, and the batched path used now, one forward pass then a top-k
+partition. The heap sort only runs up to --heap-max mines as it takes minutes
+beyond that. Needs no database. Run from the server directory:
+
+    poetry run python benchmarks/ranking.py --sizes 10000 100000 --output ranking.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import torch
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVER_DIR)
+# Nothing connects, but the database settings are read on import
+os.environ.setdefault("DB_PORT", "5432")
+
+from src.ml.models.pytorch import DEFAULT_CONFIG, LinearModel  # noqa: E402
+from src.ml.scoring import top_k  # noqa: E402
+
+FEATURES = DEFAULT_CONFIG["numerical_features"]
+
+
+def synthetic_mines(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    mines = pd.DataFrame(rng.random((n, len(FEATURES))), columns=FEATURES)
+    mines.insert(0, "mine_id", [f"mine-{i:07d}" for i in range(n)])
+    return mines
+
+
+def heap_rank(model: LinearModel, mines: pd.DataFrame) -> pd.DataFrame:
+    """The previous ranking: heap sort scoring one iloc row per comparison."""
+
+    def predict(row):
+        x = torch.from_numpy(row.to_numpy(dtype="float32")).unsqueeze(0)
+        with torch.no_grad():
+            return model(x).squeeze()
+
+    def heapify(n, i):
+        smallest = i
+        l = 2 * i + 1
+        r = 2 * i + 2
+
+        small_score = predict(mines[FEATURES].iloc[smallest])
+        if l < n and predict(mines[FEATURES].iloc[l]) < small_score:
+            smallest = l
+        if r < n and predict(mines[FEATURES].iloc[r]) < small_score:
+            smallest = r
+
+        if smallest != i:
+            mines.iloc[i], mines.iloc[smallest] = mines.iloc[smallest], mines.iloc[i]
+            heapify(n, smallest)
+
+    n = len(mines)
+    for i in range(n // 2 - 1, -1, -1):
+        heapify(n, i)
+    for i in range(n - 1, 0, -1):
+        mines.iloc[0], mines.iloc[i] = mines.iloc[i], mines.iloc[0]
+        heapify(i, 0)
+    return mines
+
+
+def batched_rank(model: LinearModel, mines: pd.DataFrame, k: int = None) -> pd.DataFrame:
+    """The current ranking: one forward pass, then a top-k partition and sort."""
+    scores = model.predict(mines[FEATURES].to_numpy(dtype=np.float32))
+    order = top_k(scores, mines["mine_id"].to_numpy(), k)
+    return mines.iloc[order].assign(score=scores[order])
+
+
+def timed(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SERVER_DIR, capture_output=True, text=True
+        ).stdout.strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare heap sort and batched top-k ranking of mines")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000], help="Mine counts to rank")
+    parser.add_argument("--top-k", type=int, default=100, help="Page size for the top-k timing (default: 100)")
+    parser.add_argument("--heap-max", type=int, default=10000,
+                        help="Largest mine count to time the heap sort on (default: 10000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per batched timing, best kept (default: 3)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    torch.manual_seed(args.seed)
+    model = LinearModel(input_dim=len(FEATURES), output_dim=1).eval()
+
+    results = []
+    for n in args.sizes:
+        mines = synthetic_mines(n, args.seed)
+        result = {
+            "mines": n,
+            "batched_full_s": round(timed(lambda: batched_rank(model, mines), args.repeat), 4),
+            "batched_top_k_s": round(timed(lambda: batched_rank(model, mines, args.top_k), args.repeat), 4),
+            "heap_s": None
+        }
+
+        if n <= args.heap_max:
+            start = time.perf_counter()
+            heap_ranked = heap_rank(model, mines.copy())
+            result["heap_s"] = round(time.perf_counter() - start, 4)
+
+            # The heap sort leaves the best mines first, so the two orders should agree up to ties
+            heap_ids = heap_ranked["mine_id"].tolist()[:args.top_k]
+            batched_ids = batched_rank(model, mines, args.top_k)["mine_id"].tolist()
+            result["top_k_overlap"] = len(set(heap_ids) & set(batched_ids)) / max(len(batched_ids), 1)
+
+        results.append(result)
+        heap = f"{result['heap_s']:.3f}s" if result["heap_s"] is not None else "skipped"
+        speedup = f" ({result['heap_s'] / result['batched_full_s']:.0f}x)" if result["heap_s"] else ""
+        print(f"{n:>8} mines  heap={heap:<10} batched={result['batched_full_s']:.4f}s{speedup}  "
+              f"top-{args.top_k}={result['batched_top_k_s']:.4f}s")
+
+    report = {
+        "benchmark": "ranking",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "torch": torch.__version__,
+        "top_k": args.top_k,
+        "results": results
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Seed a local Postgres with a synthetic mine dataset for benchmarking.
+
+Recreates the schemas with the seed pipeline's pre-seed.sql, fills the data_clean
+dims and facts (plus the data_raw supplementary tables the analytics views join)
+entirely server-side with generate_series, then builds the analytics views with
+post-seed.sql. The same --seed always produces the same dataset.
+
+This DROPS the data_raw, data_clean, data_analytics and public schemas. Run from
+the server directory against a throwaway database:
+
+    poetry run python benchmarks/seed_synthetic.py --mines 100000 --yes
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import psycopg2
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SQL_DIR = os.path.join(SERVER_DIR, "..", "seed", "src", "sql")
+
+SYNTHETIC_MINES = """
+CREATE TEMP TABLE synthetic_mines AS
+SELECT
+    i,
+    md5('mine-' || i)::uuid AS mine_id,
+    CASE WHEN random() < 0.45 THEN 'Australia'
+         ELSE (ARRAY['Canada', 'USA', 'Chile', 'South Africa', 'New Zealand', 'Peru', 'China', 'India'])[1 + floor(random() * 8)::int]
+    END AS country,
+    random() AS r_lat,
+    random() AS r_lng,
+    random() AS r_state,
+    random() AS r_flags,
+    floor(random() * 5)::int AS n_shafts
+FROM generate_series(1, %(mines)s) i
+"""
+
+SYNTHETIC_TABLES = [
+    ("data_clean.dim_raw", """
+        INSERT INTO data_clean.dim_raw (mine_id, source_table)
+        SELECT mine_id, 'synthetic_benchmark' FROM synthetic_mines ORDER BY i
+    """),
+    ("data_clean.dim_spatial", """
+        INSERT INTO data_clean.dim_spatial (mine_id, latitude, longitude)
+        SELECT
+            mine_id,
+            CASE WHEN country = 'Australia' THEN -10 - r_lat * 33 ELSE -60 + r_lat * 130 END,
+            CASE WHEN country = 'Australia' THEN 113 + r_lng * 40 ELSE -180 + r_lng * 360 END
+        FROM synthetic_mines
+    """),
+    ("data_clean.dim_locations", """
+        INSERT INTO data_clean.dim_locations (mine_id, country, state, district, rez_zone, city, region)
+        SELECT
+            mine_id,
+            country,
+            CASE WHEN country = 'Australia'
+                 THEN (ARRAY['New South Wales', 'Queensland', 'Victoria', 'South Australia', 'Western Australia',
+                             'Tasmania', 'Northern Territory', 'Australian Capital Territory'])[1 + floor(r_state * 8)::int]
+                 ELSE country || ' Region ' || (1 + floor(r_state * 20)::int)
+            END,
+            'District ' || (i %% 500),
+            CASE WHEN country = 'Australia' AND r_flags < 0.35 THEN 'REZ ' || (1 + i %% 40)
+                 WHEN country = 'Australia' THEN 'Not in REZ'
+            END,
+            'City ' || (i %% 2000),
+            'Region ' || (i %% 100)
+        FROM synthetic_mines
+    """),
+    ("data_clean.dim_identification", """
+        INSERT INTO data_clean.dim_identification (mine_id, primary_name, alternate_name, description, mine_id_external)
+        SELECT
+            mine_id,
+            'Synthetic Mine ' || i,
+            CASE WHEN r_flags < 0.2 THEN 'Alt Mine ' || i END,
+            CASE WHEN r_flags > 0.7 THEN 'Synthetic benchmark mine ' || i END,
+            'EXT-' || i
+        FROM synthetic_mines
+    """),
+    ("data_clean.dim_status", """
+        INSERT INTO data_clean.dim_status (mine_id, status, closure_year, opening_year)
+        SELECT
+            mine_id,
+            (ARRAY['Closed', 'Abandoned', 'Rehabilitated', 'Mothballed', 'Cancelled', 'Shelved', 'Suspended',
+                   'Maintenance', 'Operating', 'Active', 'Proposed'])[1 + floor(random() * 11)::int],
+            CASE WHEN r_flags < 0.6 THEN 1950 + floor(random() * 75)::int END,
+            1850 + floor(random() * 150)::int
+        FROM synthetic_mines
+    """),
+    ("data_clean.dim_company", """
+        INSERT INTO data_clean.dim_company (mine_id, company_name, company_website)
+        SELECT mine_id, 'Company ' || (i %% 5000), 'https://company' || (i %% 5000) || '.example.com'
+        FROM synthetic_mines
+        WHERE r_flags < 0.7
+    """),
+    ("data_clean.dim_energy", """
+        INSERT INTO data_clean.dim_energy (mine_id, grid_connection)
+        SELECT mine_id, random() < 0.5
+        FROM synthetic_mines
+        WHERE r_flags < 0.8
+    """),
+    ("data_clean.dim_evaluations", """
+        INSERT INTO data_clean.dim_evaluations (mine_id, evaluation_status, evaluation_description, evaluation_score)
+        SELECT
+            mine_id,
+            CASE WHEN r_flags < 0.01 THEN 'under_review'
+                 WHEN r_flags < 0.02 THEN 'shortlisted'
+                 WHEN r_flags < 0.03 THEN 'approved'
+                 WHEN r_flags < 0.04 THEN 'rejected'
+                 ELSE 'not_evaluated'
+            END,
+            CASE WHEN r_flags < 0.04 THEN 'Synthetic evaluation' END,
+            CASE WHEN r_flags < 0.04 THEN floor(random() * 100)::int END
+        FROM synthetic_mines
+    """),
+    ("data_clean.fact_shafts", """
+        INSERT INTO data_clean.fact_shafts (shaft_id, mine_id, shaft_number, shaft_depth, shaft_diameter, no_shafts)
+        SELECT
+            md5('shaft-' || m.i || '-' || s.n)::uuid,
+            m.mine_id,
+            s.n,
+            CASE WHEN random() < 0.85 THEN round((50 + random() * 1500)::numeric, 2) END,
+            CASE WHEN random() < 0.75 THEN round((2 + random() * 8)::numeric, 2) END,
+            m.n_shafts
+        FROM synthetic_mines m
+        CROSS JOIN LATERAL generate_series(1, m.n_shafts) AS s(n)
+    """),
+    ("data_clean.fact_commodities", """
+        INSERT INTO data_clean.fact_commodities (mine_id, commodity, coal_type)
+        SELECT
+            mine_id,
+            c.commodity,
+            CASE WHEN c.commodity = 'Coal' THEN 'Bituminous' END
+        FROM (
+            SELECT mine_id, (ARRAY['Coal', 'Coal', 'Gold', 'Copper', 'Iron Ore', 'Zinc', 'Nickel'])[1 + floor(random() * 7)::int] AS commodity
+            FROM synthetic_mines
+        ) c
+    """),
+    ("data_clean.fact_documentation", """
+        INSERT INTO data_clean.fact_documentation (mine_id, reference)
+        SELECT mine_id, 'https://docs.example.com/mines/' || i
+        FROM synthetic_mines
+        WHERE r_flags > 0.8
+    """),
+    ("data_clean.fact_pairwise_comparisons", """
+        WITH shafts AS MATERIALIZED (
+            SELECT shaft_id, row_number() OVER (ORDER BY shaft_id) AS rn FROM data_clean.fact_shafts
+        ),
+        total AS (SELECT COUNT(*) AS n FROM shafts),
+        pairs AS MATERIALIZED (
+            SELECT 1 + floor(random() * total.n)::bigint AS w_rn, 1 + floor(random() * total.n)::bigint AS l_rn
+            FROM generate_series(1, %(comparisons)s), total
+            WHERE total.n > 1
+        )
+        INSERT INTO data_clean.fact_pairwise_comparisons (w_id, l_id)
+        SELECT w.shaft_id, l.shaft_id
+        FROM pairs
+        JOIN shafts w ON w.rn = pairs.w_rn
+        JOIN shafts l ON l.rn = pairs.l_rn
+        WHERE w.shaft_id <> l.shaft_id
+    """),
+    ("data_raw.s_api_google_places", """
+        INSERT INTO data_raw.s_api_google_places (mine_id, nearest_train_station, nearest_airport)
+        SELECT
+            ds.mine_id::text,
+            jsonb_build_object('location', jsonb_build_object(
+                'latitude', ds.latitude + (random() - 0.5), 'longitude', ds.longitude + (random() - 0.5))),
+            jsonb_build_object('location', jsonb_build_object(
+                'latitude', ds.latitude + (random() - 0.5) * 4, 'longitude', ds.longitude + (random() - 0.5) * 4))
+        FROM data_clean.dim_spatial ds
+        WHERE random() < 0.6
+    """),
+]
+
+SUPPLEMENTARY_TABLES = """
+CREATE TABLE IF NOT EXISTS data_raw.s_api_google_places (
+    id SERIAL PRIMARY KEY,
+    mine_id TEXT,
+    nearest_train_station JSONB,
+    nearest_airport JSONB,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS data_raw.s_apvi_solar_supplementary_2025_xlsx_1 (
+    state TEXT,
+    installations TEXT
+);
+
+INSERT INTO data_raw.s_apvi_solar_supplementary_2025_xlsx_1 (state, installations)
+SELECT state, (10000 + floor(random() * 500000)::int)::text
+FROM unnest(ARRAY['NSW', 'QLD', 'VIC', 'SA', 'WA', 'TAS', 'NT', 'ACT']) AS state;
+"""
+
+
+def get_connection():
+    return psycopg2.connect(
+        host=os.getenv('DB_HOST'),
+        port=int(os.getenv('DB_PORT', 5432)),
+        database=os.getenv('DB_NAME'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD')
+    )
+
+
+def run_sql_file(cursor, path: str):
+    with open(path, "r") as f:
+        cursor.execute(f.read())
+
+
+def timed(label: str, func, *args):
+    start = time.perf_counter()
+    func(*args)
+    print(f"  {label:<45} {time.perf_counter() - start:8.2f}s")
+
+
+def seed(mines: int, comparisons: int, random_seed: float, sql_dir: str):
+    conn = get_connection()
+
+    try:
+        with conn.cursor() as cursor:
+            print(f"Seeding {mines:,} synthetic mines")
+            timed("pre-seed.sql", run_sql_file, cursor, os.path.join(sql_dir, "pre-seed.sql"))
+            timed("supplementary data_raw tables", cursor.execute, SUPPLEMENTARY_TABLES)
+
+            cursor.execute("SELECT setseed(%s)", [random_seed])
+            timed("synthetic_mines", cursor.execute, SYNTHETIC_MINES, {"mines": mines})
+
+            for table, statement in SYNTHETIC_TABLES:
+                timed(table, cursor.execute, statement, {"comparisons": comparisons})
+
+            timed("post-seed.sql", run_sql_file, cursor, os.path.join(sql_dir, "post-seed.sql"))
+            timed("ANALYZE", cursor.execute, "ANALYZE")
+
+            counts = {}
+            for table, _ in SYNTHETIC_TABLES:
+                cursor.execute(f"SELECT COUNT(*) FROM {table}")
+                counts[table] = cursor.fetchone()[0]
+        conn.commit()
+
+        print("Row counts:")
+        for table, count in counts.items():
+            print(f"  {table:<45} {count:>12,}")
+
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed a throwaway database with synthetic mines for benchmarks")
+    parser.add_argument("--mines", type=int, default=10000, help="Number of mines to generate (default: 10000)")
+    parser.add_argument("--comparisons", type=int, default=None,
+                        help="Pairwise comparisons to generate (default: mines / 10)")
+    parser.add_argument("--seed", type=float, default=0.42, help="Random seed between -1 and 1 (default: 0.42)")
+    parser.add_argument("--sql-dir", default=DEFAULT_SQL_DIR, help="Directory containing pre-seed.sql and post-seed.sql")
+    parser.add_argument("--yes", action="store_true", help="Confirm that the target database may be wiped")
+    args = parser.parse_args()
+
+    if not args.yes:
+        print(f"This will DROP and recreate all schemas in {os.getenv('DB_NAME')} on {os.getenv('DB_HOST')}.")
+        print("Re-run with --yes to continue.")
+        sys.exit(1)
+
+    comparisons = args.comparisons if args.comparisons is not None else max(args.mines // 10, 1)
+
+    start = time.perf_counter()
+    seed(args.mines, comparisons, args.seed, args.sql_dir)
+    print(f"Seeding complete in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
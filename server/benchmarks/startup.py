@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the API.
+
+Imports each target module in a fresh interpreter with `-X importtime` and reports
+the wall time, the module's own cumulative import time and its most expensive
+top-level dependencies. Run from the server directory:
+
+    poetry run python benchmarks/startup.py --output startup.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+from datetime import datetime, timezone
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = [
+    "main",
+    "src.routes.data",
+    "src.routes.model",
+    "src.routes.assistant",
+    "src.ml.helpers",
+    "src.ai.agent",
+    "src.ml.models.deap",
+    "src.ml.models.sklearn",
+    "src.ml.models.pytorch",
+]
+
+
+def parse_importtime(stderr: str, module: str) -> tuple:
+    """Parse `-X importtime` output for the target module.
+
+    Children are printed before their parent and indented two spaces per level, so
+    the direct imports of the target are the depth 1 entries preceding its line.
+
+    Returns:
+        Tuple of (cumulative seconds for the module, list of direct dependencies)
+    """
+    pending = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entry = {"module": name.strip(), "cumulative_s": int(cumulative_us) / 1e6}
+
+        if depth == 1:
+            pending.append(entry)
+        elif depth == 0:
+            if entry["module"] == module:
+                return entry["cumulative_s"], pending
+            pending = []
+
+    return None, []
+
+
+def measure(module: str, repeat: int, env: dict) -> dict:
+    """Import a module `repeat` times in fresh interpreters and summarise the cost."""
+    walls = []
+    own, dependencies = None, []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=SERVER_DIR, env=env, capture_output=True, text=True
+        )
+        walls.append(time.perf_counter() - start)
+
+        if proc.returncode != 0:
+            error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "unknown error"
+            return {"module": module, "status": "error", "error": error}
+
+        own, dependencies = parse_importtime(proc.stderr, module)
+
+    dependencies = sorted(dependencies, key=lambda entry: entry["cumulative_s"], reverse=True)
+
+    return {
+        "module": module,
+        "status": "ok",
+        "wall_s": round(statistics.median(walls), 4),
+        "wall_min_s": round(min(walls), 4),
+        "import_s": round(own, 4) if own is not None else None,
+        "top_dependencies": [
+            {"module": entry["module"], "cumulative_s": round(entry["cumulative_s"], 4)}
+            for entry in dependencies[:10]
+        ]
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SERVER_DIR, capture_output=True, text=True
+        ).stdout.strip() or "unknown"
+    except OSError:
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure API import and startup cost per module")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per module (default: 3)")
+    parser.add_argument("--modules", nargs="+", default=TARGETS, help="Modules to import")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    env = os.environ.copy()
+    env["WARM_UP_ON_START"] = "false"
+    env.setdefault("DB_PORT", "5432")
+
+    results = []
+    for module in args.modules:
+        result = measure(module, args.repeat, env)
+        results.append(result)
+
+        if result["status"] == "ok":
+            import_s = f"{result['import_s']:.3f}s" if result["import_s"] is not None else "n/a"
+            slowest = ", ".join(f"{dep['module']}={dep['cumulative_s']:.3f}s" for dep in result["top_dependencies"][:3])
+            print(f"{module:<28} wall={result['wall_s']:.3f}s import={import_s:<8} slowest: {slowest}")
+        else:
+            print(f"{module:<28} FAILED: {result['error']}")
+
+    report = {
+        "benchmark": "startup",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": results
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
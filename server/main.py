@@ -2,7 +2,8 @@ import os
 from flask import Flask, jsonify
 from flask_cors import CORS
 
-from src.routes import data, assistant, model
+from src.routes import data, assistant, model, monitoring
+from src.utils import cache, database, metrics, warmup
 
 SERVER_PORT = int(os.getenv("SERVER_PORT", 5174))
 
@@ -13,10 +14,15 @@ CORS(app,
      allow_headers=["Content-Type", "Authorization", "X-Requested-With"],
      methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"])
 
+# Instrument every request before registering blueprints
+metrics.init_app(app)
+database.init_app(app)
+
 # Register blueprints
 app.register_blueprint(data.bp)
 app.register_blueprint(assistant.bp)
 app.register_blueprint(model.bp)
+app.register_blueprint(monitoring.bp)
 
 @app.route('/')
 def home():
@@ -43,4 +49,8 @@ def internal_error(error):
     return jsonify({"message": "Internal server error"}), 500
 
 if __name__ == '__main__':
+    # The debug reloader re-runs this file in a child process, only that one serves requests
+    if os.getenv("WERKZEUG_RUN_MAIN") == "true":
+        warmup.start()
+        cache.ensure_listener()
     app.run(debug=True, host='0.0.0.0', port=SERVER_PORT)
\ No newline at end of file
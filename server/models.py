@@ -20,7 +20,8 @@ def display_menu():
     print("1. Genetic Algorithm (DEAP) - Multi-criteria mine evaluation")
     print("2. Clustering Algorithm (K-Means) - Group mines by characteristics")
     print("3. Linear Model (Pytorch) - Train on labeled dataset and then rank mines")
-    print("4. Exit")
+    print("4. Sensitivity Analysis (Monte Carlo) - Rank stability under perturbed weights")
+    print("5. Exit")
     print("="*60)
 
 
@@ -77,7 +78,7 @@ def main():
         display_menu()
 
         try:
-            choice = input("\nSelect an option (1-4): ").strip()
+            choice = input("\nSelect an option (1-5): ").strip()
 
             if choice == '1':
                 print(f"\nCreating Genetic Algorithm model...")
@@ -97,11 +98,16 @@ def main():
                 run_model(model, "Linear Model")
 
             elif choice == '4':
+                print(f"\nCreating Sensitivity Analysis model...")
+                model = model_factory("sensitivity_analysis")
+                run_model(model, "Sensitivity Analysis")
+
+            elif choice == '5':
                 print("\nExiting... Goodbye!")
                 sys.exit(0)
 
             else:
-                print("Invalid choice. Please select 1, 2, or 3.")
+                print("Invalid choice. Please select 1, 2, 3, 4 or 5.")
 
         except KeyboardInterrupt:
             print("\n\nExiting... Goodbye!")
@@ -6,8 +6,10 @@ from src.ai import toolkit
 from langchain.schema import HumanMessage
 from typing import Any
 from datetime import datetime
+import threading
 
 _AGENT = None
+_AGENT_LOCK = threading.Lock()
 
 SYSTEM_PROMPT = """You are Lucent Bot, a helpful mining data assistant with access to both a PostgreSQL database and a knowledge base.
 
@@ -62,13 +64,16 @@ class LucentBot:
     @classmethod
     def with_tools(cls) -> "LucentBot":
         global _AGENT
-        
+
         if _AGENT is None:
-            llm = openai.get_llm(model="gpt-5-mini", temperature=0)
-            sql_tools = toolkit.get_sql_tools()
-            retriever_tool = toolkit.get_retriever_tool()
-            tools = sql_tools + [retriever_tool]
-            _AGENT = cls(llm, tools)
+            # Only one thread builds the agent, the rest wait for it
+            with _AGENT_LOCK:
+                if _AGENT is None:
+                    llm = openai.get_llm(model="gpt-5-mini", temperature=0)
+                    sql_tools = toolkit.get_sql_tools()
+                    retriever_tool = toolkit.get_retriever_tool()
+                    tools = sql_tools + [retriever_tool]
+                    _AGENT = cls(llm, tools)
 
         return _AGENT
     
@@ -5,6 +5,9 @@ from typing import Generator, Union
 class BaseModel(ABC):
     """defines how a model is implemented"""
 
+    # Name used by model_factory and the model registry
+    model_type = None
+
     @abstractmethod
     def __init__(self, config: dict, mines_data) -> None:
         """Force subclasses to define their own init to handle the config differently"""
@@ -20,20 +23,56 @@ class BaseModel(ABC):
         """gets the results to be displayed in the UI"""
         pass
 
-def model_factory(model_type: str) -> BaseModel:
-    """model_factory creates the correct Model Object using model type"""
+    def save_model(self, directory: str) -> Union[None, dict]:
+        """writes the trained artifacts into directory for the model registry.
+
+        Returns the feature schema, config and metrics to record in the manifest, or None if there is nothing to save
+        """
+        return None
+
+    @classmethod
+    def run_config(cls) -> Union[None, dict]:
+        """the settings a new run uses, which with the data and code determine its results.
+
+        Runs are memoized on it, so None, the default, runs the model every time
+        """
+        return None
+
+    @classmethod
+    def load_model(cls, directory: str, manifest: dict) -> dict:
+        """loads the artifacts written by save_model, for scoring without retraining"""
+        raise NotImplementedError(f"{cls.__name__} does not support loading saved models")
+
+
+def model_class(model_type: str) -> type:
+    """model_class gets the Model class for a model type without constructing it"""
     model = None
 
     if model_type == "genetic_algorithm":
         from .models.deap import EvolutionaryModel
-        model = EvolutionaryModel()
+        model = EvolutionaryModel
 
     if model_type == "clustering_algorithm":
         from .models.sklearn import ClusteringModel
-        model = ClusteringModel()
+        model = ClusteringModel
 
     if model_type == "linear_model":
         from .models.pytorch import LearnToRankModel
-        model = LearnToRankModel()
+        model = LearnToRankModel
+
+    if model_type == "sensitivity_analysis":
+        from .models.sensitivity import SensitivityModel
+        model = SensitivityModel
+
+    if model is None:
+        raise ValueError(f"Unknown model type: {model_type}")
+
+    return model
 
-    return model
\ No newline at end of file
+
+def model_factory(model_type: str) -> BaseModel:
+    """model_factory creates the correct Model Object using model type"""
+    try:
+        return model_class(model_type)()
+    except ValueError:
+        return None
\ No newline at end of file
@@ -1,9 +1,25 @@
 """
 Models package for Lucent mine analysis.
+
+Model classes are resolved on first access so importing the package does not
+pull in DEAP, scikit-learn or torch.
 """
 
+from importlib import import_module
+
 from .BaseModel import BaseModel, model_factory
-from .models.deap import EvolutionaryModel
-from .models.sklearn import ClusteringModel
 
-__all__ = ['BaseModel', 'model_factory', 'EvolutionaryModel', 'ClusteringModel']
\ No newline at end of file
+_LAZY_ATTRIBUTES = {
+    'EvolutionaryModel': '.models.deap',
+    'ClusteringModel': '.models.sklearn',
+}
+
+__all__ = ['BaseModel', 'model_factory', 'EvolutionaryModel', 'ClusteringModel']
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,84 @@
+"""Tier scores precomputed in data_analytics.mine_fitness.
+
+post-seed.sql scores every mine for the default scoring config. Other configs,
+and data changed since the last refresh, are brought up to date by
+data_analytics.refresh_mine_fitness, which rescores only new and changed
+mines unless a normalization maximum moved. Configs are versioned by the md5
+of their JSONB text, computed in the database so both sides agree. Loaded
+scores are cached per config and data version.
+"""
+
+import os
+
+import pandas as pd
+from psycopg2.extras import Json
+
+from src.utils import cache
+from src.utils.database import get_connection
+from src.utils.logging import setup
+
+logger = setup()
+
+FITNESS_CACHE_TTL = float(os.getenv('FITNESS_CACHE_TTL', 3600))
+
+fitness_cache = cache.Cache('mine_fitness', ttl=FITNESS_CACHE_TTL, max_entries=4)
+
+# Columns calculate_tier_scores adds to the mine features
+FITNESS_COLUMNS = [
+    'depth_score_norm', 'diameter_score_norm', 'shaft_count_score_norm', 'reported_shaft_score_norm',
+    'volume_score_norm', 'is_coal_mine_norm', 'country_score_norm', 'status_score_norm',
+    'transport_score_norm', 'has_grid_connection_norm', 'in_rez_zone_norm', 'deep_bonus_norm',
+    'multi_shaft_bonus_norm', 'has_evaluation_norm', 'has_identity_norm', 'has_company_norm',
+    'T1_score', 'T2_score', 'T3_score', 'T4_score', 'T5_score', 'has_required_data', 'overall_fitness'
+]
+
+
+def scoring_config(tier_weights: dict, scoring_config: dict, country_scores: dict, status_scores: dict) -> dict:
+    """The config refresh_mine_fitness scores with."""
+    return {
+        "tier_weights": tier_weights,
+        "scoring_config": scoring_config,
+        "country_scores": country_scores,
+        "status_scores": status_scores
+    }
+
+
+def refresh(config: dict, force: bool = False) -> str:
+    """Bring the config's scores up to date with the data. Returns its config version."""
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT data_analytics.refresh_mine_fitness(%s, %s)", [Json(config), force])
+            return cursor.fetchone()[0]
+
+
+def _load_scores(version: str) -> pd.DataFrame:
+    columns = ", ".join(f'"{col}"' for col in FITNESS_COLUMNS)
+    # From the primary, which a refresh may have just written to
+    with get_connection() as conn:
+        scores = pd.read_sql_query(
+            f"SELECT mine_id::text AS mine_id, {columns} FROM data_analytics.mine_fitness WHERE config_version = %(version)s",
+            conn,
+            params={"version": version}
+        )
+    logger.info(f"Loaded precomputed tier scores for {len(scores)} mines (config {version})")
+    return scores
+
+
+def load(config: dict) -> tuple:
+    """Precomputed tier scores of every mine for config, refreshing them first if the data changed.
+
+    Returns:
+        Tuple of (scores with mine_id and FITNESS_COLUMNS, normalization maxima the scores used)
+    """
+    version = refresh(config)
+
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT normalization, data_version FROM data_analytics.scoring_configs WHERE config_version = %s",
+                [version]
+            )
+            normalization, data_version = cursor.fetchone()
+
+    scores = fitness_cache.get_or_set((version, data_version), lambda: _load_scores(version), tables=("*",))
+    return scores, normalization
@@ -1,8 +1,11 @@
+import os
 import pandas as pd
+from psycopg2 import sql
 
+from src.utils import cache
 from src.utils.database import get_connection
 from src.utils.logging import setup
-from src.ml import helpers
+from src.ml import helpers, snapshot
 import json
 
 logger = setup()
@@ -11,11 +14,20 @@ def get_all_mines_data() -> pd.DataFrame:
     """Retrieve all mines with joined T1-T5 data using the standard query."""
     logger.info("Fetching all mines with T1-T5 analytics data")
 
-    connection = get_connection()
+    try:
+        # Copied out of the shared snapshot, as models modify the frame in place
+        mines_data = snapshot.load_features().to_pandas()
+        logger.info(f"Retrieved {len(mines_data)} mines from snapshot")
+        return mines_data
+    except Exception as e:
+        logger.warning(f"Feature snapshot unavailable, querying directly: {e}")
+
     query = helpers.get_features()
 
     try:
-        mines_data = pd.read_sql_query(query, connection)
+        # Feature pulls are large reads and can be served by a replica
+        with get_connection(readonly=True) as connection:
+            mines_data = pd.read_sql_query(query, connection)
         logger.info(f"Retrieved {len(mines_data)} mines")
         return mines_data
 
@@ -25,41 +37,72 @@ def get_all_mines_data() -> pd.DataFrame:
 
 
 
-def get_pair_wise_mines(features: list[str]) -> pd.DataFrame:
-    logger.info("Fetching pairwise comparisons with T1-T5 analytics data")
-
-    engine = get_connection()
+PAIRWISE_SOURCE = "data_analytics.shaft_summary"
+PAIRWISE_CACHE_TTL = float(os.getenv('PAIRWISE_CACHE_TTL', 3600))
 
-    try:
+# shaft_summary is a view, so any data change can affect it
+pairwise_cache = cache.Cache('pairwise', ttl=PAIRWISE_CACHE_TTL, max_entries=8)
 
-        queries = []
-        # We are going to query twice once for the winners data and second for the losers data.
-        with open("src/config/get_winner_data.sql", "r") as f:
-            queries.append(f.read())
-        with open("src/config/get_loser_data.sql", "r") as f:
-            queries.append(f.read())
-        
-        results = {}
 
-        for key, query in zip(['w', 'l'], queries): 
+def _load_pair_wise_mines(features: tuple) -> pd.DataFrame:
+    schema, table = PAIRWISE_SOURCE.split(".")
 
-            results[key] = pd.read_sql_query(query, engine)
+    with get_connection(readonly=True) as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT column_name FROM information_schema.columns WHERE table_schema = %s AND table_name = %s",
+                [schema, table]
+            )
+            existing = {row[0] for row in cursor.fetchall()}
 
             # Only keep features that actually exist in database
-            available_features = [f for f in features if f in results[key].columns]
+            available_features = [f for f in features if f in existing]
+
+            # One pass over the comparisons, joining the shaft features of the winner and of the loser
+            columns = [sql.SQL("pc.id AS comparison_id")]
+            for alias, suffix in (("w", "_w"), ("l", "_l")):
+                columns += [
+                    sql.SQL("{}.{} AS {}").format(sql.Identifier(alias), sql.Identifier(f), sql.Identifier(f + suffix))
+                    for f in available_features
+                ]
 
-            results[key] = results[key][["comparison_id"] + available_features]
+            query = sql.SQL("""
+                SELECT {columns}
+                FROM data_clean.fact_pairwise_comparisons pc
+                JOIN {source} w ON w.shaft_id = pc.w_id
+                JOIN {source} l ON l.shaft_id = pc.l_id
+            """).format(columns=sql.SQL(", ").join(columns), source=sql.Identifier(schema, table))
 
-        # merging the 2 datasets so we end up with one dataset with labels for both
-        pairwise_data = results['w'].merge(results['l'], on="comparison_id", suffixes=("_w", "_l"))
+        pairwise_data = pd.read_sql_query(query.as_string(conn), conn)
 
-        logger.info(f"Retrieved {len(pairwise_data)} mines")
-        return pairwise_data
+    logger.info(f"Retrieved {len(pairwise_data)} pairwise comparisons")
+    return pairwise_data
+
+
+def get_pair_wise_mines(features: list[str]) -> pd.DataFrame:
+    """Winner and loser shaft features of every pairwise comparison, as <feature>_w and <feature>_l columns.
+
+    Cached per data version, so treat the returned frame as read-only.
+    """
+    logger.info("Fetching pairwise comparisons with T1-T5 analytics data")
+
+    try:
+        features = tuple(features)
+        return pairwise_cache.get_or_set(
+            (features, cache.data_version()),
+            lambda: _load_pair_wise_mines(features),
+            tables=("*",)
+        )
 
     except Exception as e:
         logger.error(f"Error fetching mine data: {e}")
         raise
 
+def feature_schema(df: pd.DataFrame, columns: list[str]) -> list[dict]:
+    """Names and dtypes of the feature columns a model was trained on."""
+    return [{"name": col, "dtype": str(df[col].dtype)} for col in columns]
+
+
 def get_features() -> str:
     return """
 SELECT DISTINCT
@@ -96,19 +139,24 @@ ORDER BY t0.mine_id
 
 
 def save_ml_results(model_name: str, results: dict):
+    """Save model results, returning the new public.model_results id or None on failure."""
     try:
 
         query = """
             INSERT INTO public.model_results (ml_name, results)
-            VALUES (%s, %s);
+            VALUES (%s, %s)
+            RETURNING id;
         """
 
         with get_connection() as conn:
             with conn.cursor() as cursor:
-                # Get rows
-                cursor.execute(query, [model_name, json.dumps(results)])
+                # Results can hold numpy and date values
+                cursor.execute(query, [model_name, json.dumps(results, default=str)])
+                result_id = cursor.fetchone()[0]
 
         logger.info(f"Saved results to public.model_results")
+        return result_id
 
     except Exception as e:
-        logger.error(f"Error saving results: {e}")
\ No newline at end of file
+        logger.error(f"Error saving results: {e}")
+        return None
\ No newline at end of file
@@ -0,0 +1,258 @@
+"""Postgres-backed queue of model runs.
+
+The API enqueues jobs into public.model_jobs and notifies workers. Workers
+(worker.py, on this node or any other) claim the oldest job with
+FOR UPDATE SKIP LOCKED, so each job runs exactly once however many workers are
+polling. Running jobs heartbeat, and a job whose worker stops heartbeating is
+picked up again until it runs out of attempts.
+"""
+
+import os
+import json
+import time
+import threading
+from psycopg2.extras import Json, RealDictCursor
+
+from src.ml import runs
+from src.ml.progress import ProgressTracker
+from src.utils.database import get_connection
+from src.utils.logging import setup
+
+logger = setup()
+
+JOB_CHANNEL = "lucent_model_jobs"
+
+JOB_HEARTBEAT_SECONDS = float(os.getenv('JOB_HEARTBEAT_SECONDS', 10))
+JOB_STALE_SECONDS = float(os.getenv('JOB_STALE_SECONDS', 120))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+JOB_PROGRESS_INTERVAL = float(os.getenv('JOB_PROGRESS_INTERVAL', 1))
+
+# Model ids used by the API mapped to (model type, display name)
+MODELS = {
+    "1": ("genetic_algorithm", "Genetic Algorithm"),
+    "2": ("clustering_algorithm", "Clustering Algorithm"),
+    "3": ("linear_model", "Linear Model"),
+    "4": ("sensitivity_analysis", "Sensitivity Analysis"),
+}
+
+FINISHED_STATUSES = ("succeeded", "failed", "cancelled")
+
+JOB_COLUMNS = """
+    j.job_id, j.model_type, j.model_name, j.force, j.status, j.progress, j.cancel_requested, j.attempts,
+    j.worker, j.result_id, j.error, j.created_at, j.started_at, j.heartbeat_at, j.finished_at
+"""
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job when cancellation was requested."""
+
+
+def _fetch(query: str, params: list, many: bool = False):
+    with get_connection() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(query, params)
+            if many:
+                return [dict(row) for row in cursor.fetchall()]
+            row = cursor.fetchone()
+            return dict(row) if row else None
+
+
+def _json(value) -> Json:
+    # Progress events and results can hold numpy and date values
+    return Json(value, dumps=lambda obj: json.dumps(obj, default=str))
+
+
+def enqueue(model_type: str, model_name: str, force: bool = False) -> dict:
+    """Queue a model run and wake up idle workers once it is committed.
+
+    force runs the model even when an identical run's results are stored.
+    """
+    query = f"""
+        INSERT INTO public.model_jobs AS j (model_type, model_name, force)
+        VALUES (%s, %s, %s)
+        RETURNING {JOB_COLUMNS}
+    """
+
+    with get_connection() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(query, [model_type, model_name, force])
+            job = dict(cursor.fetchone())
+            cursor.execute("SELECT pg_notify(%s, %s)", [JOB_CHANNEL, str(job["job_id"])])
+
+    logger.info(f"Queued {model_name} job {job['job_id']}")
+    return job
+
+
+def get_job(job_id: str, include_results: bool = True) -> dict:
+    """Get a job with its latest progress, and its results once it has succeeded."""
+    results = "r.results" if include_results else "NULL"
+    query = f"""
+        SELECT {JOB_COLUMNS}, {results} AS results
+        FROM public.model_jobs j
+        LEFT JOIN public.model_results r ON r.id = j.result_id
+        WHERE j.job_id = %s
+    """
+    return _fetch(query, [job_id])
+
+
+def list_jobs(status: str = None, limit: int = 50) -> list:
+    """List the most recent jobs, optionally filtered by status."""
+    query = f"""
+        SELECT {JOB_COLUMNS}
+        FROM public.model_jobs j
+        WHERE %s::text IS NULL OR j.status = %s
+        ORDER BY j.created_at DESC
+        LIMIT %s
+    """
+    return _fetch(query, [status, status, limit], many=True)
+
+
+def cancel(job_id: str) -> dict:
+    """Cancel a job. Queued jobs stop immediately, running jobs at their next progress update."""
+    query = f"""
+        UPDATE public.model_jobs j
+        SET cancel_requested = TRUE,
+            status = CASE WHEN j.status = 'queued' THEN 'cancelled' ELSE j.status END,
+            finished_at = CASE WHEN j.status = 'queued' THEN NOW() ELSE j.finished_at END
+        WHERE j.job_id = %s
+        RETURNING {JOB_COLUMNS}
+    """
+    return _fetch(query, [job_id])
+
+
+def claim(worker: str) -> dict:
+    """Claim the oldest runnable job for this worker, or None when there is nothing to do.
+
+    Jobs whose worker stopped heartbeating are retried until JOB_MAX_ATTEMPTS, then failed.
+    """
+    expire_query = """
+        UPDATE public.model_jobs
+        SET status = CASE WHEN cancel_requested THEN 'cancelled' ELSE 'failed' END,
+            error = CASE WHEN cancel_requested THEN error ELSE 'Worker stopped responding' END,
+            finished_at = NOW()
+        WHERE status = 'running'
+          AND heartbeat_at < NOW() - make_interval(secs => %s)
+          AND (attempts >= %s OR cancel_requested)
+    """
+
+    claim_query = f"""
+        UPDATE public.model_jobs j
+        SET status = 'running', worker = %s, attempts = j.attempts + 1,
+            started_at = NOW(), heartbeat_at = NOW(), error = NULL
+        WHERE j.job_id = (
+            SELECT job_id
+            FROM public.model_jobs
+            WHERE status = 'queued'
+               OR (status = 'running' AND heartbeat_at < NOW() - make_interval(secs => %s))
+            ORDER BY created_at
+            FOR UPDATE SKIP LOCKED
+            LIMIT 1
+        )
+        RETURNING {JOB_COLUMNS}
+    """
+
+    with get_connection() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(expire_query, [JOB_STALE_SECONDS, JOB_MAX_ATTEMPTS])
+            cursor.execute(claim_query, [worker, JOB_STALE_SECONDS])
+            row = cursor.fetchone()
+            return dict(row) if row else None
+
+
+def heartbeat(job_id: str, attempt: int, progress: dict = None) -> bool:
+    """Record that the job is alive, with its latest progress event.
+
+    The attempt number fences off a worker whose job was presumed dead and handed to another.
+
+    Returns:
+        True if the job should stop, because it was cancelled or is no longer ours
+    """
+    query = """
+        UPDATE public.model_jobs
+        SET heartbeat_at = NOW(), progress = COALESCE(%s::jsonb, progress)
+        WHERE job_id = %s AND attempts = %s AND status = 'running'
+        RETURNING cancel_requested
+    """
+    row = _fetch(query, [_json(progress) if progress is not None else None, job_id, attempt])
+    return row is None or row["cancel_requested"]
+
+
+def finish(job_id: str, attempt: int, status: str, result_id: int = None, error: str = None):
+    query = """
+        UPDATE public.model_jobs
+        SET status = %s, result_id = %s, error = %s, finished_at = NOW(), heartbeat_at = NOW()
+        WHERE job_id = %s AND attempts = %s AND status = 'running'
+        RETURNING job_id
+    """
+    if _fetch(query, [status, result_id, error, job_id, attempt]) is None:
+        logger.warning(f"Job {job_id} attempt {attempt} was taken over, not recording it as {status}")
+
+
+def _keep_alive(job_id: str, attempt: int, stop: threading.Event, cancelled: threading.Event):
+    """Heartbeat while a model is busy in a step that does not report progress."""
+    while not stop.wait(JOB_HEARTBEAT_SECONDS):
+        try:
+            if heartbeat(job_id, attempt):
+                cancelled.set()
+        except Exception as e:
+            logger.warning(f"Heartbeat for job {job_id} failed: {e}")
+
+
+def run(job: dict) -> str:
+    """Run a claimed job to completion and record its outcome.
+
+    Returns:
+        The final job status
+    """
+    job_id, attempt = job["job_id"], job["attempts"]
+    stop, cancelled = threading.Event(), threading.Event()
+    keep_alive = threading.Thread(target=_keep_alive, args=(job_id, attempt, stop, cancelled), daemon=True)
+    keep_alive.start()
+
+    events = None
+    try:
+        logger.info(f"Running {job['model_name']} job {job_id} (attempt {attempt})")
+        tracker = ProgressTracker()
+        events = runs.execute(job["model_type"], job["model_name"], tracker, job.get("force", False))
+
+        run, last_update = None, 0.0
+        for event in events:
+            if cancelled.is_set():
+                raise JobCancelled()
+
+            # The results are stored in model_results, not in the job's progress
+            if 'result_id' in event:
+                run = event
+                continue
+
+            # Progress is throttled, but failures, completions and saving are always recorded
+            now = time.monotonic()
+            if now - last_update >= JOB_PROGRESS_INTERVAL or event.get("status") in ("completed", "error") \
+                    or event.get("step") == "results":
+                last_update = now
+                if heartbeat(job_id, attempt, {**event, 'timings': tracker.timings()}):
+                    raise JobCancelled()
+
+        result_id = run["result_id"]
+        if run["cached"]:
+            logger.info(f"Job {job_id} reused the results {result_id} of an identical run")
+
+        finish(job_id, attempt, "succeeded", result_id=result_id)
+        logger.info(f"Job {job_id} succeeded with results {result_id}")
+        return "succeeded"
+
+    except JobCancelled:
+        finish(job_id, attempt, "cancelled")
+        logger.info(f"Job {job_id} cancelled")
+        return "cancelled"
+
+    except Exception as e:
+        logger.error(f"Job {job_id} failed: {e}")
+        finish(job_id, attempt, "failed", error=str(e))
+        return "failed"
+
+    finally:
+        # Stops a model still running and releases its claim
+        if events is not None:
+            events.close()
+        stop.set()
@@ -1,12 +1,16 @@
+import os
+import json
+import multiprocessing
 import pandas as pd
 import numpy as np
-from deap import algorithms, base, creator, tools
-import random
-from typing import Dict, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Generator
 
 from src.utils.logging import setup
+from src.ml import fitness, portfolio
 from src.ml.BaseModel import BaseModel
-from src.ml.helpers import get_all_mines_data
+from src.ml.helpers import feature_schema, get_all_mines_data
 
 logger = setup()
 
@@ -38,13 +42,348 @@ SCORING_CONFIG = {
     'T5': {'has_evaluation_norm': 0.4, 'has_identity_norm': 0.3, 'has_company_norm': 0.3}
 }
 
+# Columns read by calculate_tier_scores
+SCORING_INPUTS = [
+    'avg_depth_m', 'avg_diameter_m', 'no_shafts', 'reported_no_shafts', 'total_shaft_volume',
+    'is_coal_mine', 'country', 'status', 'nearest_airport_km', 'nearest_train_station_km',
+    'has_grid_connection', 'in_rez_zone', 'has_evaluation', 'has_identity', 'has_company'
+]
+
+ARTIFACT_FILE = "evolutionary.json"
+
+# Read tier scores from data_analytics.mine_fitness rather than calculating them every run
+GA_PRECOMPUTED_SCORES = os.getenv('GA_PRECOMPUTED_SCORES', 'true').lower() == 'true'
+
+# Processes that evolve islands, at most one per island
+GA_WORKERS = int(os.getenv('GA_WORKERS', 0)) or os.cpu_count() or 1
+
+GA_PARAMETERS = {
+    # "portfolio" evolves a Pareto front of mine portfolios, "fitness" the single fittest set of mines
+    "objective": os.getenv('GA_OBJECTIVE', 'portfolio'),
+    "population_size": 50,
+    "generations": 20,
+    "individual_size": 50,
+    # Individuals with fewer distinct mines than this score zero
+    "min_unique": 25,
+    "cxpb": 0.7,
+    "mutpb": 0.3,
+    "indpb": 0.1,
+    "tournsize": 3,
+    "seed": None,
+    # Sub-populations of population_size each, evolved in parallel processes when above 1
+    "islands": int(os.getenv('GA_ISLANDS', 1)),
+    # Generations between migrations, when each island's best individuals replace the next island's worst
+    "migration_interval": 5,
+    "migrants": 2,
+    # Portfolios hold portfolio_size of the highest fitness candidates, at most max_per_region per state
+    "portfolio_size": 20,
+    "candidates": 1000,
+    "max_per_region": 5
+}
+
+
+def evaluate_population(population: np.ndarray, fitness_array: np.ndarray, min_unique: int) -> np.ndarray:
+    """Fitness of every individual in one pass.
+
+    An individual's fitness is the mean fitness of its distinct mines scaled by the
+    share of its genes that are distinct, i.e. their sum over the individual size.
+    Rows are sorted so distinct mines are the positions that differ from their left
+    neighbour, which masks out repeats without a per-individual np.unique.
+    """
+    ordered = np.sort(population, axis=1)
+    distinct = np.ones(ordered.shape, dtype=bool)
+    distinct[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+
+    counts = distinct.sum(axis=1)
+    totals = np.where(distinct, fitness_array[ordered], 0.0).sum(axis=1)
+    return np.where(counts < min_unique, 0.0, totals / population.shape[1])
+
+
+def select_tournament(fitness: np.ndarray, k: int, tournsize: int, rng: np.random.Generator) -> np.ndarray:
+    """Rows picked by k tournaments, as deap.tools.selTournament does: the fittest of tournsize random draws."""
+    aspirants = rng.integers(0, len(fitness), size=(k, tournsize))
+    return aspirants[np.arange(k), fitness[aspirants].argmax(axis=1)]
+
+
+def crossover_population(population: np.ndarray, cxpb: float, rng: np.random.Generator) -> np.ndarray:
+    """Two-point crossover of consecutive pairs with probability cxpb, in place.
+
+    Cut points are drawn as in deap.tools.cxTwoPoint. Returns a mask of the changed rows.
+    """
+    n, size = population.shape
+    changed = np.zeros(n, dtype=bool)
+    pairs = np.flatnonzero(rng.random(n // 2) < cxpb) * 2
+    if len(pairs) == 0 or size < 2:
+        return changed
+
+    first = rng.integers(1, size + 1, size=len(pairs))
+    second = rng.integers(1, size, size=len(pairs))
+    second = np.where(second >= first, second + 1, second)
+    start, end = np.minimum(first, second), np.maximum(first, second)
+
+    genes = np.arange(size)
+    swap = (genes >= start[:, None]) & (genes < end[:, None])
+    left, right = population[pairs], population[pairs + 1]
+    population[pairs] = np.where(swap, right, left)
+    population[pairs + 1] = np.where(swap, left, right)
+
+    changed[pairs] = changed[pairs + 1] = True
+    return changed
+
+
+def mutate_population(population: np.ndarray, mutpb: float, indpb: float, n_mines: int,
+                      rng: np.random.Generator) -> np.ndarray:
+    """Replace genes with random mines in place: each row mutates with probability mutpb, each of its genes with indpb.
+
+    Returns a mask of the mutated rows.
+    """
+    mutated = rng.random(len(population)) < mutpb
+    genes = (rng.random(population.shape) < indpb) & mutated[:, None]
+    population[genes] = rng.integers(0, n_mines, size=int(genes.sum()))
+    return mutated
+
+
+def _initial_population(fitness_array: np.ndarray, parameters: dict, rng: np.random.Generator) -> tuple:
+    population = rng.integers(0, len(fitness_array), size=(parameters["population_size"], parameters["individual_size"]))
+    return population, evaluate_population(population, fitness_array, parameters["min_unique"])
+
+
+def _next_generation(population: np.ndarray, fitness: np.ndarray, fitness_array: np.ndarray, parameters: dict,
+                     rng: np.random.Generator) -> tuple:
+    """Select, cross over and mutate the population, re-evaluating only the changed rows.
+
+    Returns:
+        Tuple of (population, fitness, number of evaluations)
+    """
+    selected = select_tournament(fitness, len(population), parameters["tournsize"], rng)
+    population, fitness = population[selected], fitness[selected]
+
+    changed = crossover_population(population, parameters["cxpb"], rng)
+    changed |= mutate_population(population, parameters["mutpb"], parameters["indpb"], len(fitness_array), rng)
+    fitness[changed] = evaluate_population(population[changed], fitness_array, parameters["min_unique"])
+    return population, fitness, int(changed.sum())
+
+
+def evolve(fitness_array: np.ndarray, parameters: dict) -> Generator[dict, None, None]:
+    """Evolve a population of mine index arrays, as algorithms.eaSimple does with DEAP lists.
+
+    The population is a (population_size, individual_size) array of indexes into
+    fitness_array. Each generation selects, crosses over and mutates it in array form
+    and evaluates only the changed rows. Yields the state after every generation,
+    the initial population being generation 0.
+    """
+    rng = np.random.default_rng(parameters["seed"])
+    population, fitness = _initial_population(fitness_array, parameters, rng)
+    yield {"generation": 0, "population": population, "fitness": fitness, "evaluations": len(population)}
+
+    for generation in range(1, parameters["generations"] + 1):
+        population, fitness, evaluations = _next_generation(population, fitness, fitness_array, parameters, rng)
+        yield {"generation": generation, "population": population, "fitness": fitness, "evaluations": evaluations}
+
+
+# Arrays of the island worker process, attached from shared memory
+_island_memory = []
+_island_arrays = {}
+
+
+def _attach_arrays(specs: dict):
+    for name, (memory_name, shape, dtype) in specs.items():
+        memory = shared_memory.SharedMemory(name=memory_name)
+        _island_memory.append(memory)
+        _island_arrays[name] = np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+
+
+def _initial_island(objective: str, arrays: dict, parameters: dict, rng: np.random.Generator) -> dict:
+    """A new island: a dict of arrays with a row per individual, the individuals under "population"."""
+    if objective == "portfolio":
+        return portfolio.initial_population(arrays["fitness"], arrays["distances"], arrays["regions"], parameters, rng)
+    population, fitness = _initial_population(arrays["fitness"], parameters, rng)
+    return {"population": population, "fitness": fitness}
+
+
+def _next_island(objective: str, island: dict, arrays: dict, parameters: dict, rng: np.random.Generator) -> tuple:
+    """The island's next generation and the number of evaluations it took."""
+    if objective == "portfolio":
+        return portfolio.next_generation(island, arrays["fitness"], arrays["distances"], arrays["regions"],
+                                         parameters, rng)
+    population, fitness, evaluations = _next_generation(island["population"], island["fitness"], arrays["fitness"],
+                                                        parameters, rng)
+    return {"population": population, "fitness": fitness}, evaluations
+
+
+def _island_progress(objective: str, island: dict) -> tuple:
+    """Best and mean fitness of an island, over its feasible portfolios for the portfolio objective."""
+    fitness = portfolio.feasible_fitness(island) if objective == "portfolio" else island["fitness"]
+    return float(fitness.max()), float(fitness.mean())
+
+
+def _ranked(objective: str, island: dict) -> np.ndarray:
+    """Rows of an island from best to worst."""
+    if objective == "portfolio":
+        return np.lexsort((-island["crowding"], island["ranks"]))
+    return np.argsort(island["fitness"])[::-1]
+
+
+def _evolve_island(objective: str, island: dict, parameters: dict, generations: int,
+                   rng: np.random.Generator) -> tuple:
+    """Evolve one island for a number of generations. Runs in a worker process."""
+    history, evaluations = [], 0
+    for _ in range(generations):
+        island, count = _next_island(objective, island, _island_arrays, parameters, rng)
+        evaluations += count
+        history.append(_island_progress(objective, island))
+    return island, rng, history, evaluations
+
+
+def _migrate(objective: str, islands: list, migrants: int):
+    """Copy each island's best individuals over the worst of the next island, in a ring."""
+    emigrants = []
+    for island in islands:
+        best = _ranked(objective, island)[:migrants]
+        emigrants.append({key: values[best].copy() for key, values in island.items()})
+
+    for i, island in enumerate(islands):
+        arrivals = emigrants[i - 1]
+        worst = _ranked(objective, island)[::-1][:len(arrivals["population"])]
+        for key, values in island.items():
+            values[worst] = arrivals[key]
+        if objective == "portfolio":
+            # Fronts and crowding are relative to the rest of the island
+            islands[i] = portfolio.rank(island)
+
+
+def _combined(objective: str, islands: list) -> dict:
+    """One population of every island's individuals, re-ranked as a whole for the portfolio objective."""
+    combined = {key: np.concatenate([island[key] for island in islands]) for key in islands[0]}
+    return portfolio.rank(combined) if objective == "portfolio" else combined
+
+
+def _island_summary(histories: list, generation: int) -> list:
+    """Convergence of each island: its best and mean fitness now, and when it last found a better individual."""
+    summary = []
+    for island, history in enumerate(histories):
+        bests = [best for best, _ in history]
+        best_generation = int(np.argmax(bests))
+        summary.append({
+            "island": island,
+            "best_fitness": history[-1][0],
+            "mean_fitness": history[-1][1],
+            "best_generation": best_generation,
+            "stalled_generations": generation - best_generation
+        })
+    return summary
+
+
+def evolve_islands(objective: str, arrays: dict, parameters: dict) -> Generator[dict, None, None]:
+    """Evolve parameters["islands"] populations in a process pool, with migration between them.
+
+    arrays holds what the objective evaluates against: the mine fitness array for
+    "fitness", the candidates' fitness, distances and region codes for "portfolio".
+    Islands run migration_interval generations at a time in GA_WORKERS processes,
+    then the best migrants of each island replace the worst of the next. The arrays
+    are placed in shared memory once rather than pickled to every task, and only
+    the small index populations travel between processes. Yields the combined
+    population after generation 0 and after every migration, with each island's
+    convergence under "islands".
+    """
+    n_islands = parameters["islands"]
+    rngs = [np.random.default_rng(seed) for seed in np.random.SeedSequence(parameters["seed"]).spawn(n_islands)]
+    arrays = {name: np.ascontiguousarray(values) for name, values in arrays.items()}
+
+    islands = [_initial_island(objective, arrays, parameters, rng) for rng in rngs]
+    histories = [[_island_progress(objective, island)] for island in islands]
+
+    def state(generation: int, evaluations: int) -> dict:
+        return {
+            "generation": generation,
+            **_combined(objective, islands),
+            "evaluations": evaluations,
+            "islands": _island_summary(histories, generation)
+        }
+
+    yield state(0, sum(len(island["population"]) for island in islands))
+
+    memories = []
+    try:
+        specs = {}
+        for name, values in arrays.items():
+            memory = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            memories.append(memory)
+            np.ndarray(values.shape, dtype=values.dtype, buffer=memory.buf)[...] = values
+            specs[name] = (memory.name, values.shape, values.dtype)
+
+        workers = min(n_islands, GA_WORKERS)
+        # Not forked, as the API process runs threads that may hold locks at the time
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("forkserver"),
+                                 initializer=_attach_arrays, initargs=(specs,)) as pool:
+            generation = 0
+            while generation < parameters["generations"]:
+                epoch = min(parameters["migration_interval"], parameters["generations"] - generation)
+                futures = [
+                    pool.submit(_evolve_island, objective, island, parameters, epoch, rng)
+                    for island, rng in zip(islands, rngs)
+                ]
+
+                evaluations = 0
+                for i, future in enumerate(futures):
+                    islands[i], rngs[i], history, count = future.result()
+                    histories[i].extend(history)
+                    evaluations += count
+
+                generation += epoch
+                if generation < parameters["generations"] and n_islands > 1:
+                    _migrate(objective, islands, parameters["migrants"])
+                yield state(generation, evaluations)
+    finally:
+        for memory in memories:
+            memory.close()
+            memory.unlink()
+
+
 class EvolutionaryModel(BaseModel):
     """Highly optimized mine evaluation model using vectorized operations and efficient DEAP."""
 
+    model_type = "genetic_algorithm"
+
     def __init__(self) -> None:
         self.mines_data = None
         self.scored_data = None
         self.fitness_array = None
+        # Maximum of each normalized column, so later scoring uses the same scale
+        self.normalization = {}
+        self.fixed_normalization = False
+        self.best_individual = None
+        self.best_fitness = None
+        self.islands = None
+        self.candidates = None
+        self.pareto_front = None
+        self.parameters = dict(GA_PARAMETERS)
+        self.tier_weights = TIER_WEIGHTS
+        self.scoring_config = SCORING_CONFIG
+        self.country_scores = COUNTRY_SCORES
+        self.status_scores = STATUS_SCORES
+
+    @classmethod
+    def run_config(cls) -> dict:
+        return {
+            "tier_weights": TIER_WEIGHTS,
+            "scoring_config": SCORING_CONFIG,
+            "country_scores": COUNTRY_SCORES,
+            "status_scores": STATUS_SCORES,
+            "parameters": GA_PARAMETERS
+        }
+
+    @classmethod
+    def from_artifacts(cls, artifacts: dict) -> 'EvolutionaryModel':
+        """Model that scores mines with a registered run's config and normalization scale."""
+        model = cls()
+        model.tier_weights = artifacts['tier_weights']
+        model.scoring_config = artifacts['scoring_config']
+        model.country_scores = artifacts['country_scores']
+        model.status_scores = artifacts['status_scores']
+        model.normalization = dict(artifacts['normalization'])
+        model.fixed_normalization = True
+        return model
 
     def get_all_mines(self) -> pd.DataFrame:
         """Retrieve all mines data."""
@@ -55,10 +394,15 @@ class EvolutionaryModel(BaseModel):
         series = pd.to_numeric(series, errors='coerce').fillna(0)
         # Clamp negative values to zero - negative dimensions don't make sense
         series = series.clip(lower=0)
-        max_val = series.max()
+        if self.fixed_normalization:
+            max_val = self.normalization.get(series.name, 0)
+        else:
+            max_val = series.max()
+            self.normalization[series.name] = float(max_val)
         if max_val == 0:
             return series * 0
-        normalized = series / max_val
+        # Mines scored against a saved scale can exceed its maximum
+        normalized = (series / max_val).clip(upper=1)
         return (1 - normalized) if inverse else normalized
 
     def _score_strings(self, series: pd.Series, mapping: Dict) -> pd.Series:
@@ -72,6 +416,14 @@ class EvolutionaryModel(BaseModel):
         logger.info("Calculating optimized tier scores")
         if self.mines_data is None:
             self.mines_data = self.get_all_mines()
+
+        # Runs scoring against a saved scale compute their own
+        if GA_PRECOMPUTED_SCORES and not self.fixed_normalization:
+            try:
+                return self._precomputed_tier_scores()
+            except Exception as e:
+                logger.warning(f"Precomputed tier scores unavailable, calculating them: {e}")
+
         df = self.mines_data.copy()
 
         # T1 Technical - vectorized normalization with _norm suffix
@@ -84,8 +436,8 @@ class EvolutionaryModel(BaseModel):
         df['is_coal_mine_norm'] = 1.0 - pd.to_numeric(df['is_coal_mine'], errors='coerce').fillna(0).astype(float)
 
         # T2 Site Conditions - vectorized scoring with _norm suffix
-        df['country_score_norm'] = self._score_strings(df['country'], COUNTRY_SCORES)
-        df['status_score_norm'] = self._score_strings(df['status'], STATUS_SCORES)
+        df['country_score_norm'] = self._score_strings(df['country'], self.country_scores)
+        df['status_score_norm'] = self._score_strings(df['status'], self.status_scores)
 
         # Transport scoring - combined and inverted
         airport_norm = self._normalize_vectorized(df['nearest_airport_km'], inverse=True)
@@ -106,7 +458,7 @@ class EvolutionaryModel(BaseModel):
         df['has_company_norm'] = pd.to_numeric(df['has_company'], errors='coerce').fillna(0).astype(float)
 
         # Calculate tier scores using matrix operations
-        for tier, weights in SCORING_CONFIG.items():
+        for tier, weights in self.scoring_config.items():
             tier_score = 0
             for col, weight in weights.items():
                 if col in df.columns:
@@ -115,7 +467,7 @@ class EvolutionaryModel(BaseModel):
 
         # Overall fitness calculation
         df['overall_fitness'] = sum(
-            df[f'T{i}_score'] * TIER_WEIGHTS[f'T{i}'] for i in range(1, 6)
+            df[f'T{i}_score'] * self.tier_weights[f'T{i}'] for i in range(1, 6)
         )
 
         # CRITICAL REQUIREMENTS: Must have Australia, grid connection, REZ zone, and volume
@@ -140,70 +492,149 @@ class EvolutionaryModel(BaseModel):
         logger.info(f"Tier scoring complete. Top fitness: {df['overall_fitness'].max():.3f}")
         return df
 
-    def invoke(self) -> None:
-        """Optimized DEAP genetic algorithm."""
+    def _precomputed_tier_scores(self) -> pd.DataFrame:
+        """Tier scores from data_analytics.mine_fitness for this model's scoring config."""
+        config = fitness.scoring_config(self.tier_weights, self.scoring_config, self.country_scores, self.status_scores)
+        scores, normalization = fitness.load(config)
+
+        df = self.mines_data.drop(columns=fitness.FITNESS_COLUMNS, errors='ignore').merge(scores, on='mine_id', how='left')
+        # Mines not in the table yet score zero, like mines missing required data
+        df[fitness.FITNESS_COLUMNS] = df[fitness.FITNESS_COLUMNS].fillna(0.0)
+
+        self.normalization = {col: float(max_val) for col, max_val in normalization.items()}
+        self.fitness_array = df['overall_fitness'].values
+
+        logger.info(f"Tier scoring complete. Top fitness: {df['overall_fitness'].max():.3f}")
+        return df
+
+    def invoke(self) -> Generator[dict, None, None]:
+        """Optimized DEAP genetic algorithm with per-generation progress updates."""
         logger.info('Running optimized DEAP genetic algorithm')
 
-        self.get_all_mines()
+        yield {'step': 'data_fetch', 'status': 'running', 'message': 'Fetching mine data'}
+        self.mines_data = self.get_all_mines()
+
+        yield {'step': 'scoring', 'status': 'running', 'message': 'Calculating tier scores'}
         self.scored_data = self.calculate_tier_scores()
 
-        # Clean DEAP creators
-        for attr in ["FitnessMax", "Individual"]:
-            if hasattr(creator, attr):
-                delattr(creator, attr)
-
-        # Setup DEAP with optimized parameters
-        creator.create("FitnessMax", base.Fitness, weights=(1.0,))
-        creator.create("Individual", list, fitness=creator.FitnessMax)
-
-        toolbox = base.Toolbox()
-        n_mines = len(self.scored_data)
-
-        # Optimized individual creation
-        toolbox.register("mine_index", random.randrange, n_mines)
-        toolbox.register("individual", tools.initRepeat, creator.Individual, toolbox.mine_index, n=50)
-        toolbox.register("population", tools.initRepeat, list, toolbox.individual)
-
-        def evaluate_fast(individual: List[int]) -> Tuple[float]:
-            """Ultra-fast fitness evaluation using pre-calculated arrays."""
-            unique_indices = np.unique(individual)
-            if len(unique_indices) < 25:  # Reduced threshold for speed
-                return (0.0,)
-
-            # Direct array access for maximum speed
-            fitness_values = self.fitness_array[unique_indices]
-            mean_fitness = np.mean(fitness_values)
-            diversity_bonus = len(unique_indices) / 50.0
-
-            return (mean_fitness * diversity_bonus,)
-
-        def mutate_fast(individual: List[int], indpb: float = 0.1) -> Tuple[List[int]]:
-            """Fast mutation with vectorized operations."""
-            mask = np.random.random(len(individual)) < indpb
-            mutations = np.random.randint(0, n_mines, size=np.sum(mask))
-            individual_array = np.array(individual)
-            individual_array[mask] = mutations
-            individual[:] = individual_array.tolist()
-            return (individual,)
-
-        # Register optimized operators
-        toolbox.register("evaluate", evaluate_fast)
-        toolbox.register("mate", tools.cxTwoPoint)
-        toolbox.register("mutate", mutate_fast)
-        toolbox.register("select", tools.selTournament, tournsize=3)
-
-        # Run with optimized parameters
-        population = toolbox.population(n=50)  # Reduced population for speed
-        algorithms.eaSimple(
-            population, toolbox,
-            cxpb=0.7, mutpb=0.3, ngen=20,  # Reduced generations for speed
-            verbose=False
-        )
+        yield {'step': 'initialization', 'status': 'running', 'message': 'Setting up genetic algorithm'}
+
+        if self.parameters["objective"] == "portfolio":
+            yield from self._evolve_portfolios()
+        else:
+            yield from self._evolve_fitness()
 
-        best_individual = tools.selBest(population, k=1)[0]
-        best_indices = np.unique(best_individual)
+        best_indices = np.unique(self.best_individual)
         logger.info(f'Optimization complete. Selected {len(best_indices)} unique mines')
 
+        yield {'step': 'complete', 'status': 'completed', 'message': f'Selected {len(best_indices)} unique mines'}
+
+    def _evolve_fitness(self) -> Generator[dict, None, None]:
+        """Evolve the single set of mines with the highest mean fitness."""
+        ngen = self.parameters["generations"]
+        if self.parameters["islands"] > 1:
+            logger.info(f'Evolving {self.parameters["islands"]} islands of {self.parameters["population_size"]}')
+            states = evolve_islands("fitness", {"fitness": self.fitness_array}, self.parameters)
+        else:
+            states = evolve(self.fitness_array, self.parameters)
+
+        for state in states:
+            fitnesses = state["fitness"]
+            event = {
+                'step': 'evolution',
+                'status': 'running',
+                'message': f'Generation {state["generation"]}/{ngen}: best {fitnesses.max():.4f}, mean {fitnesses.mean():.4f}',
+                'generation': state["generation"],
+                'generations': ngen,
+                'best_fitness': float(fitnesses.max()),
+                'mean_fitness': float(fitnesses.mean()),
+                'evaluations': state["evaluations"]
+            }
+            if "islands" in state:
+                self.islands = state["islands"]
+                event['islands'] = self.islands
+            yield event
+
+        best = int(fitnesses.argmax())
+        self.best_individual = state["population"][best].copy()
+        self.best_fitness = float(fitnesses[best])
+
+    def _evolve_portfolios(self) -> Generator[dict, None, None]:
+        """Evolve portfolios trading total fitness against geographic spread and regions covered.
+
+        Candidates are the highest fitness mines meeting the hard requirements. The
+        best individual is the front's portfolio with the highest total fitness.
+        """
+        ngen = self.parameters["generations"]
+        eligible = np.flatnonzero(self.fitness_array > 0)
+        order = np.argsort(-self.fitness_array[eligible], kind='stable')
+        self.candidates = eligible[order[:self.parameters["candidates"]]]
+
+        candidates = self.scored_data.iloc[self.candidates].reindex(columns=['latitude', 'longitude', 'country', 'state'])
+        fitness = self.fitness_array[self.candidates]
+        distances = portfolio.distance_matrix(
+            pd.to_numeric(candidates['latitude'], errors='coerce'),
+            pd.to_numeric(candidates['longitude'], errors='coerce')
+        )
+        regions = pd.factorize(
+            candidates['country'].astype(str).str.upper() + '|' + candidates['state'].astype(str).str.upper()
+        )[0]
+        logger.info(f'Searching portfolios of {len(self.candidates)} candidates across {regions.max(initial=-1) + 1} regions')
+
+        if len(self.candidates) < 2:
+            logger.warning('Too few mines meet the requirements to build portfolios')
+            self.pareto_front = []
+            self.best_individual = self.candidates
+            self.best_fitness = float(fitness.sum())
+            return
+
+        if self.parameters["islands"] > 1:
+            logger.info(f'Evolving {self.parameters["islands"]} islands of {self.parameters["population_size"]} portfolios')
+            states = evolve_islands(
+                "portfolio", {"fitness": fitness, "distances": distances, "regions": regions}, self.parameters
+            )
+        else:
+            states = portfolio.evolve(fitness, distances, regions, self.parameters)
+
+        for state in states:
+            feasible = state["violation"] == 0
+            totals = portfolio.feasible_fitness(state)
+            event = {
+                'step': 'evolution',
+                'status': 'running',
+                'message': f'Generation {state["generation"]}/{ngen}: best {totals.max():.4f}, mean {totals.mean():.4f}, '
+                           f'front {int((state["ranks"] == 0).sum())}',
+                'generation': state["generation"],
+                'generations': ngen,
+                'best_fitness': float(totals.max()),
+                'mean_fitness': float(totals.mean()),
+                'front_size': int(((state["ranks"] == 0) & feasible).sum()),
+                'evaluations': state["evaluations"]
+            }
+            if "islands" in state:
+                self.islands = state["islands"]
+                event['islands'] = self.islands
+            yield event
+
+        portfolios, objectives = portfolio.pareto_front(
+            state["population"], state["objectives"], state["violation"], state["ranks"]
+        )
+        mine_ids = self.scored_data['mine_id'].to_numpy()
+        self.pareto_front = [
+            {**dict(zip(portfolio.OBJECTIVES, map(float, values))), "mine_ids": mine_ids[self.candidates[members]].tolist()}
+            for members, values in zip(portfolios, objectives)
+        ]
+
+        if len(portfolios):
+            self.best_individual = self.candidates[portfolios[0]]
+            self.best_fitness = float(objectives[0, 0])
+        else:
+            # No portfolio met the constraints, keep the least violating one
+            logger.warning('No feasible portfolio found, relax max_per_region or portfolio_size')
+            best = np.lexsort((-state["objectives"][:, 0], state["violation"]))[0]
+            self.best_individual = self.candidates[state["population"][best]]
+            self.best_fitness = float(state["objectives"][best, 0])
+
     def get_results(self) -> Dict:
         """Generate optimized results with top performers."""
         if self.scored_data is None:
@@ -223,12 +654,69 @@ class EvolutionaryModel(BaseModel):
             logger.warning("mine_id column not found, using index instead")
             top_100_ids = ranked.index.tolist()
 
-        return {
+        results = {
             "config": {
-                "population_size": 50,
-                "generations": 20,
+                "objective": self.parameters["objective"],
+                "population_size": self.parameters["population_size"],
+                "generations": self.parameters["generations"],
+                "islands": self.parameters["islands"],
+                "island_convergence": self.islands,
                 "total_mines_analyzed": len(self.scored_data)
             },
             "top_20_detailed": top_20_data,
             "top_100": top_100_ids
-        }
\ No newline at end of file
+        }
+
+        if self.pareto_front is not None:
+            portfolio_columns = ['mine_id', 'mine_name', 'country', 'state', 'latitude', 'longitude', 'overall_fitness']
+            chosen = self.scored_data.iloc[self.best_individual].reindex(columns=portfolio_columns)
+            results["config"].update({
+                "portfolio_size": self.parameters["portfolio_size"],
+                "candidates": len(self.candidates),
+                "max_per_region": self.parameters["max_per_region"]
+            })
+            results["portfolio"] = chosen.replace({np.nan: None}).to_dict('records')
+            results["pareto_front"] = self.pareto_front
+
+        return results
+
+    def save_model(self, directory: str):
+        """Save the scoring config and normalization scale with the best individual's mines."""
+        if self.best_individual is None:
+            return None
+
+        best_indices = np.unique(self.best_individual)
+        with open(os.path.join(directory, ARTIFACT_FILE), 'w') as f:
+            json.dump({
+                "normalization": self.normalization,
+                "best_individual": self.scored_data['mine_id'].iloc[best_indices].tolist(),
+                "best_fitness": self.best_fitness,
+                "pareto_front": self.pareto_front
+            }, f, indent=2, default=str)
+
+        return {
+            "features": feature_schema(self.mines_data, SCORING_INPUTS),
+            "config": {
+                "tier_weights": self.tier_weights,
+                "scoring_config": self.scoring_config,
+                "country_scores": self.country_scores,
+                "status_scores": self.status_scores,
+                "population_size": self.parameters["population_size"],
+                "generations": self.parameters["generations"],
+                "islands": self.parameters["islands"],
+                "objective": self.parameters["objective"],
+                "portfolio_size": self.parameters["portfolio_size"],
+                "max_per_region": self.parameters["max_per_region"]
+            },
+            "metrics": {
+                "best_fitness": self.best_fitness,
+                "pareto_front_size": len(self.pareto_front) if self.pareto_front is not None else None,
+                "total_mines_analyzed": len(self.scored_data)
+            }
+        }
+
+    @classmethod
+    def load_model(cls, directory: str, manifest: dict) -> dict:
+        with open(os.path.join(directory, ARTIFACT_FILE)) as f:
+            artifacts = json.load(f)
+        return {**manifest["config"], **artifacts}
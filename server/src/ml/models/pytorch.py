@@ -1,15 +1,34 @@
+import os
+import copy
+import glob
+import json
+import time
+import hashlib
+import tempfile
 from typing import Generator
 from ..BaseModel import BaseModel
 import torch
 import torch.nn as nn
-from torch.utils.data import DataLoader, Dataset
+from torch.utils.data import TensorDataset
 from sklearn.preprocessing import OneHotEncoder
+import numpy as np
 import pandas as pd
-from ..helpers import get_all_mines_data, get_pair_wise_mines
+from .. import scoring
+from ..helpers import feature_schema, get_pair_wise_mines
 from ...utils.logging import setup
 
 LOGGER = setup()
 
+ARTIFACT_FILE = "ranker.pt"
+
+# Mines kept in the saved results, the full ranking is served by the scoring endpoint
+RESULTS_PAGE_SIZE = 100
+
+MODEL_CHECKPOINT_DIR = os.getenv('MODEL_CHECKPOINT_DIR', os.path.join(tempfile.gettempdir(), 'lucent-checkpoints'))
+# Checkpoints of runs that died and were never retried are removed once this old
+MODEL_CHECKPOINT_MAX_AGE = float(os.getenv('MODEL_CHECKPOINT_MAX_AGE', 24 * 3600))
+TORCH_NUM_THREADS = int(os.getenv('TORCH_NUM_THREADS', 0)) or None
+
 DEFAULT_CONFIG = {
         "comparison_source": "data_clean.pairwise_comparisons",
         "data_source": "data_analytics.shaft_summary",
@@ -23,15 +42,27 @@ DEFAULT_CONFIG = {
         ],
         "catagorical_features": [],
         "parameters": {
-            "epochs": 10,
-            "batch_size": 5,
-            "shuffle": True
+            "epochs": 100,
+            "batch_size": 1024,
+            "shuffle": True,
+            "learning_rate": 0.001,
+            "validation_split": 0.2,
+            "patience": 10,
+            "min_delta": 1e-4,
+            "num_threads": TORCH_NUM_THREADS,
+            "seed": 42
         }
     }
 
 
 
-class PairwiseDataset(Dataset):
+class PairwiseDataset(TensorDataset):
+    """
+    Winner and loser features of every comparison, converted once into float32 tensors.
+
+    Items are (x1, x2, y) where x1 holds the winner's features, x2 the loser's and
+    y is 1 as x1 always beat x2.
+    """
     def __init__(self, data_source, features: list[str]):
 
         self.features = features
@@ -45,44 +76,31 @@ class PairwiseDataset(Dataset):
         self.w_feats = [col for col in all_columns if col.endswith("_w")]
         self.l_feats = [col for col in all_columns if col.endswith("_l")]
 
+        # Same conversion as scoring, so the ranker sees identical inputs at both stages
+        x_w = scoring.feature_matrix(self.data, self.w_feats)
+        x_l = scoring.feature_matrix(self.data, self.l_feats)
+
+        super().__init__(
+            torch.from_numpy(x_w),
+            torch.from_numpy(x_l),
+            torch.ones(len(self.data), dtype=torch.float32)
+        )
 
-    def __len__(self):
-        return len(self.data)
-    
     def get_input_dim(self):
         return len(self.w_feats)
     
     def get_avaliable_features(self):
         return [col.removesuffix("_w") for col in self.w_feats]
 
-    
-    def __getitem__(self, idx):
-        """
-        Returns (x1, x2, y) where:
-        x1 -> winner features
-        x2 -> loser features
-        y  -> target (e.g., 1 if x1 > x2, 0 otherwise)
-        """
-        row = self.data.iloc[idx]
-
-        # Extract winner and loser features
-        x1 = [row[feat] for feat in self.w_feats]
-        x2 = [row[feat] for feat in self.l_feats]
-
-        # since we have x1=winner > x2=loser y is always 1
-        y = 1.0
-
-        return (
-            torch.tensor(x1, dtype=torch.float32),
-            torch.tensor(x2, dtype=torch.float32),
-            torch.tensor(y, dtype=torch.float32)
-        )
-
 
 class LinearModel(nn.Module):
     def __init__(self, input_dim, output_dim, activation=None):
         super().__init__()
 
+        # Feature scaling learnt from the training data, saved with the weights
+        self.register_buffer("feature_mean", torch.zeros(input_dim))
+        self.register_buffer("feature_std", torch.ones(input_dim))
+
         self.linear_relu_stack = nn.Sequential(
             nn.Linear(input_dim, 20),
             nn.ReLU(),
@@ -91,13 +109,11 @@ class LinearModel(nn.Module):
             nn.Linear(10, output_dim)
         )
 
-    def predict(self, row):
+    def predict(self, rows: np.ndarray) -> np.ndarray:
         """
-        Run a prediction on a single DataFrame row.
+        Score a batch of feature rows in one forward pass.
         """
-        # Convert Series -> NumPy -> tensor
-        row = row.to_numpy(dtype="float32")
-        x = torch.from_numpy(row).unsqueeze(0)  # add batch dimension
+        x = torch.as_tensor(rows, dtype=torch.float32).reshape(len(rows), -1)
 
         # Move tensor to same device as model
         x = x.to(next(self.parameters()).device)
@@ -106,22 +122,28 @@ class LinearModel(nn.Module):
         with torch.no_grad():
             y = self.forward(x)
 
-        return y.squeeze()  # remove batch dimension
+        return y.reshape(-1).cpu().numpy()
+
+    def fit_scaling(self, x: torch.Tensor):
+        """Standardise inputs with the mean and spread of x."""
+        self.feature_mean.copy_(x.mean(dim=0))
+        self.feature_std.copy_(x.std(dim=0).nan_to_num(1.0).clamp(min=1e-6))
 
     def forward(self, x):
+        x = (x - self.feature_mean) / self.feature_std
         x = self.linear_relu_stack(x)
         return x
     
     def pairwise_loss(self, score_i, score_j, y):
-        # y = 1 if x_i > x_j, 0 otherwise
-        pred = torch.sigmoid(score_i - score_j)
-        loss = nn.BCELoss()(pred, y)
-        return loss
+        # y = 1 if x_i > x_j, 0 otherwise. Same as BCE of sigmoid(score_i - score_j), but stable
+        return nn.functional.binary_cross_entropy_with_logits(score_i - score_j, y)
     
 
 class LearnToRankModel(BaseModel):
     """defines how a training model is implemented"""
 
+    model_type = "linear_model"
+
     def __init__(self) -> None:
         """
         Initialise the learn to rank model training class with configuration parameters.
@@ -135,11 +157,11 @@ class LearnToRankModel(BaseModel):
                 - 'data_source': Dictionary containing data source information (e.g., Postgres table).
 
         This method sets up:
-            - DataLoader for batch processing
+            - Pairwise dataset as tensors
             - Linear model based on dataset input dimensions
         """
         self.config = DEFAULT_CONFIG.copy()
-        self.mines_data = None
+        self.ranking = None
 
         self.features = self.config['numerical_features']
         self.catagorical_feats = self.config['catagorical_features']
@@ -150,99 +172,284 @@ class LearnToRankModel(BaseModel):
         data_source = self.config['data_source']
 
         dataset = PairwiseDataset(data_source, self.features)
+        LOGGER.info(f"Pairwise dataset created with {len(dataset)} comparisons")
 
-        self.dataloader = DataLoader(
-            dataset=dataset,
-            batch_size=self.parameters['batch_size'],
-            shuffle=self.parameters['shuffle']
-        )
-        LOGGER.info(f"DataLoader Created with batch size {self.parameters['batch_size']} and shuffle set to {self.parameters['shuffle']}")
-
+        self.dataset = dataset
         self.model = LinearModel(input_dim=dataset.get_input_dim(), output_dim=1)
         self.avaliable_features = dataset.get_avaliable_features()
+        self.history = []
+        self.best_epoch = None
+        self.checkpoint_path = None
 
         
+    @classmethod
+    def run_config(cls) -> dict:
+        return DEFAULT_CONFIG
+
     def invoke(self) -> Generator[dict, None, None]:
         """Run Linear model with progress updates."""
 
         yield {'step': 'initialisation', 'status': 'running', 'message': 'Setting up linear training'}
 
-        self._train()
+        yield from self._train()
 
-        # Get data if not provided
-        if self.mines_data is None:
-            yield {'step': 'data_fetch', 'status': 'running', 'message': 'Fetching mine data'}
-            self.mines_data = get_all_mines_data()
-            self.mines_data = self.mines_data[['mine_id'] + self.avaliable_features]  
+        # The ranker is trained on shafts, so mines are scored from the same source
+        yield {'step': 'data_fetch', 'status': 'running', 'message': 'Fetching shaft data'}
+        shafts = scoring.get_shafts(self.config['data_source'], self.avaliable_features)
 
-        n = len(self.mines_data)
+        yield {'step': 'ranking', 'status': 'running', 'message': f'Scoring {len(shafts)} shafts'}
+        scores = self.model.predict(scoring.feature_matrix(shafts, self.avaliable_features))
 
-        # Build a minheap
-        LOGGER.info(f"Model training completed, starting ranking mines, n:{n}")
-        for i in range(n // 2 - 1, -1, -1):
-            self.heapify_mines(self.mines_data, n, i)
+        # Each mine is ranked by its best shaft
+        mines = scoring.best_shafts(shafts, scores)
+        order = scoring.top_k(mines['score'].to_numpy(), mines['mine_id'].to_numpy())
+        self.ranking = scoring.with_mine_names(mines.iloc[order].reset_index(drop=True))
 
-        # reorder mines
-        LOGGER.info("Minheap build, reordering now")
-        for i in range(n - 1, 0, -1):
-            self.mines_data.iloc[0], self.mines_data.iloc[i] = self.mines_data.iloc[i], self.mines_data.iloc[0]
-            self.heapify_mines(self.mines_data, i, 0)
-            if i%(n//10) == 0:
-                LOGGER.info(f"At {i} of {n}")
-        
-        LOGGER.info("Ranking completed")
+        LOGGER.info(f"Ranking completed for {len(self.ranking)} mines")
+        yield {'step': 'complete', 'status': 'completed', 'message': f'Ranked {len(self.ranking)} mines'}
 
 
-    def _train(self) -> Generator[dict, None, None]:
-        """trains the model and yields to stream steps to the UI"""
-        optimiser = torch.optim.Adam(self.model.parameters(), lr=0.001)
+    def _split(self) -> tuple:
+        """Shuffle comparisons once into training and validation indices."""
+        n = len(self.dataset)
+        generator = torch.Generator().manual_seed(self.parameters['seed'])
+        indices = torch.randperm(n, generator=generator)
 
-        return
+        n_val = int(n * self.parameters['validation_split'])
+        # Keep at least one comparison to train on
+        n_val = min(n_val, n - 1) if n > 1 else 0
+        return indices[n_val:], indices[:n_val]
 
-        total_epochs = self.parameters['epochs']
-        for epoch in range(total_epochs):
-            total_loss = 0
-            for x1, x2, y in self.dataloader:
-                optimiser.zero_grad()
-                s1 = self.model(x1).squeeze()  # score for x1
-                s2 = self.model(x2).squeeze()  # score for x2
-                loss = self.model.pairwise_loss(s1, s2, y)
-                loss.backward()
-                optimiser.step()
-                total_loss += loss.item()
-            if (epoch+1) % max(1, total_epochs//10) == 0: # Log 10 of the epochs 
-                LOGGER.info(f"Epoch {epoch+1}, Loss: {total_loss:.4f}")
-
-        LOGGER.info(f"Final epoch {epoch+1}, Loss: {total_loss:.4f}")
-
-
-    def heapify_mines(self, mines: pd.DataFrame, n, i):
-    
-        smallest = i 
-        l = 2 * i + 1 
-        r = 2 * i + 2  
+    def _evaluate(self, indices: torch.Tensor) -> tuple:
+        """Loss and accuracy (winner scored above loser) over the given comparisons."""
+        x_w, x_l, y = self.dataset.tensors
+        self.model.eval()
+        with torch.no_grad():
+            s_w = self.model(x_w[indices]).reshape(-1)
+            s_l = self.model(x_l[indices]).reshape(-1)
+            loss = self.model.pairwise_loss(s_w, s_l, y[indices]).item()
+            accuracy = (s_w > s_l).float().mean().item()
+        return loss, accuracy
+
+    def _training_digest(self) -> str:
+        """Digest of the parameters, features and comparisons, so only an identical run resumes a checkpoint."""
+        digest = hashlib.sha256(json.dumps(self.parameters, sort_keys=True, default=str).encode())
+        digest.update(json.dumps(self.avaliable_features).encode())
+        for tensor in self.dataset.tensors:
+            digest.update(tensor.numpy().tobytes())
+        return digest.hexdigest()[:16]
+
+    def _checkpoint(self, epoch: int, optimiser, best_loss: float, best_state: dict, stale_epochs: int):
+        """Write the training state after epoch, so a run that dies part way resumes from it."""
+        tmp_path = None
+        try:
+            os.makedirs(MODEL_CHECKPOINT_DIR, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=MODEL_CHECKPOINT_DIR, prefix=".ranker-", suffix=".pt")
+            os.close(fd)
+            torch.save({
+                "epoch": epoch,
+                "model_state_dict": self.model.state_dict(),
+                "optimiser_state_dict": optimiser.state_dict(),
+                "rng_state": torch.get_rng_state(),
+                "best_loss": best_loss,
+                "best_state": best_state,
+                "best_epoch": self.best_epoch,
+                "stale_epochs": stale_epochs,
+                "history": self.history
+            }, tmp_path)
+            # Replaced whole, so a run killed mid-write still resumes from the previous epoch
+            os.replace(tmp_path, self.checkpoint_path)
+            tmp_path = None
+        except Exception as e:
+            LOGGER.warning(f"Failed to write checkpoint: {e}")
+        finally:
+            if tmp_path is not None:
+                self._remove(tmp_path)
+
+    def _resume(self, optimiser):
+        """Restore the state of an identical run that died part way, returning its checkpoint, or None to start afresh."""
+        try:
+            checkpoint = torch.load(self.checkpoint_path, weights_only=True)
+            self.model.load_state_dict(checkpoint["model_state_dict"])
+            optimiser.load_state_dict(checkpoint["optimiser_state_dict"])
+            torch.set_rng_state(checkpoint["rng_state"])
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            LOGGER.warning(f"Ignoring unreadable checkpoint {self.checkpoint_path}: {e}")
+            return None
+
+        self.history = checkpoint["history"]
+        self.best_epoch = checkpoint["best_epoch"]
+        return checkpoint
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    @classmethod
+    def _prune_checkpoints(cls):
+        """Remove the checkpoints of runs that died and were never retried."""
+        cutoff = time.time() - MODEL_CHECKPOINT_MAX_AGE
+        for path in glob.glob(os.path.join(MODEL_CHECKPOINT_DIR, "*ranker-*.pt")):
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    cls._remove(path)
+            except OSError:
+                pass
 
-        small_score = self.model.predict(mines[self.avaliable_features].iloc[smallest])
+    def _train(self) -> Generator[dict, None, None]:
+        """trains the model and yields to stream steps to the UI"""
+        if len(self.dataset) == 0:
+            LOGGER.warning("No pairwise comparisons to train on, ranking with an untrained model")
+            yield {'step': 'training', 'status': 'running', 'message': 'No comparisons to train on'}
+            return
 
-        # If left child score is less than root
-        if l < n and self.model.predict(mines[self.avaliable_features].iloc[l]) < small_score:
-            smallest = l
+        if self.parameters['num_threads']:
+            torch.set_num_threads(self.parameters['num_threads'])
+        torch.manual_seed(self.parameters['seed'])
 
-        # If right child score is less than smallest so far
-        if r < n and self.model.predict(mines[self.avaliable_features].iloc[r]) < small_score:
-            smallest = r
+        x_w, x_l, y = self.dataset.tensors
+        train_idx, val_idx = self._split()
+        # Validate on the training data when there is too little to hold any back
+        monitor_idx = val_idx if len(val_idx) else train_idx
 
-        # If smallest is not root
-        if smallest != i:
-            mines.iloc[i], mines.iloc[smallest] = mines.iloc[smallest], mines.iloc[i]
+        self.model.fit_scaling(torch.cat([x_w[train_idx], x_l[train_idx]]))
+        optimiser = torch.optim.Adam(self.model.parameters(), lr=self.parameters['learning_rate'])
 
-            self.heapify_mines(mines, n, smallest)
+        total_epochs = self.parameters['epochs']
+        batch_size = self.parameters['batch_size']
+        best_loss, best_state, stale_epochs, start = float('inf'), None, 0, 1
+
+        self._prune_checkpoints()
+        self.checkpoint_path = os.path.join(MODEL_CHECKPOINT_DIR, f"ranker-{self._training_digest()}.pt")
+        resumed = self._resume(optimiser)
+        if resumed is not None:
+            best_loss, best_state, stale_epochs = resumed["best_loss"], resumed["best_state"], resumed["stale_epochs"]
+            # A run that died after stopping early has no epochs left to train
+            start = total_epochs + 1 if stale_epochs >= self.parameters['patience'] else resumed["epoch"] + 1
+            LOGGER.info(f"Resuming training after epoch {resumed['epoch']} from {self.checkpoint_path}")
+            yield {
+                'step': 'training',
+                'status': 'running',
+                'message': f'Resuming from epoch {resumed["epoch"]}/{total_epochs}',
+                'epoch': resumed["epoch"],
+                'epochs': total_epochs
+            }
+
+        try:
+            for epoch in range(start, total_epochs + 1):
+                self.model.train()
+                order = train_idx[torch.randperm(len(train_idx))] if self.parameters['shuffle'] else train_idx
+
+                total_loss = 0.0
+                for batch in order.split(batch_size):
+                    optimiser.zero_grad()
+                    s1 = self.model(x_w[batch]).reshape(-1)  # score for winners
+                    s2 = self.model(x_l[batch]).reshape(-1)  # score for losers
+                    loss = self.model.pairwise_loss(s1, s2, y[batch])
+                    loss.backward()
+                    optimiser.step()
+                    total_loss += loss.item() * len(batch)
+
+                train_loss = total_loss / len(train_idx)
+                val_loss, val_accuracy = self._evaluate(monitor_idx)
+                self.history.append({
+                    "epoch": epoch,
+                    "train_loss": round(train_loss, 6),
+                    "val_loss": round(val_loss, 6),
+                    "val_accuracy": round(val_accuracy, 4)
+                })
+
+                if val_loss < best_loss - self.parameters['min_delta']:
+                    best_loss, stale_epochs = val_loss, 0
+                    best_state = copy.deepcopy(self.model.state_dict())
+                    self.best_epoch = epoch
+                else:
+                    stale_epochs += 1
+
+                self._checkpoint(epoch, optimiser, best_loss, best_state, stale_epochs)
+
+                yield {
+                    'step': 'training',
+                    'status': 'running',
+                    'message': f'Epoch {epoch}/{total_epochs}: train loss {train_loss:.4f}, validation loss {val_loss:.4f}',
+                    'epoch': epoch,
+                    'epochs': total_epochs,
+                    'train_loss': train_loss,
+                    'val_loss': val_loss,
+                    'val_accuracy': val_accuracy
+                }
+
+                if stale_epochs >= self.parameters['patience']:
+                    LOGGER.info(f"Early stopping at epoch {epoch}, best epoch {self.best_epoch}")
+                    break
+
+        finally:
+            # Only a run that died keeps its checkpoint, for its retry to resume from. Finished,
+            # failed and cancelled runs, including a closed stream, remove theirs
+            self._remove(self.checkpoint_path)
+
+        # Keep the weights that generalised best, not the last ones
+        if best_state is not None:
+            self.model.load_state_dict(best_state)
+        self.model.eval()
+
+        LOGGER.info(f"Training complete after {len(self.history)} epochs, best validation loss {best_loss:.4f}")
+
+
+    def save_model(self, directory: str):
+        """saves the ranker's weights with the features it scores"""
+        torch.save(self.model.state_dict(), os.path.join(directory, ARTIFACT_FILE))
+
+        winner_data = self.dataset.data[self.dataset.w_feats].rename(columns=lambda col: col.removesuffix("_w"))
+
+        return {
+            "features": feature_schema(winner_data, self.avaliable_features),
+            "config": {
+                "input_dim": self.dataset.get_input_dim(),
+                "data_source": self.config['data_source'],
+                "comparison_source": self.config['comparison_source'],
+                "parameters": self.parameters
+            },
+            "metrics": {
+                "comparisons": len(self.dataset),
+                "epochs_run": len(self.history),
+                "best_epoch": self.best_epoch,
+                "best": self.history[self.best_epoch - 1] if self.best_epoch else None
+            }
+        }
 
-    def save_model(self) -> list[dict]:
-        """saves the model to the database"""
-        pass
+    @classmethod
+    def load_model(cls, directory: str, manifest: dict) -> dict:
+        model = LinearModel(input_dim=manifest["config"]["input_dim"], output_dim=1)
+        model.load_state_dict(torch.load(os.path.join(directory, ARTIFACT_FILE), weights_only=True))
+        model.eval()
+        return {
+            "model": model,
+            "features": [feature["name"] for feature in manifest["features"]]
+        }
 
-    def get_results(self) -> dict:
-        return self.mines_data.to_dict()
+    def get_results(self, offset: int = 0, limit: int = RESULTS_PAGE_SIZE) -> dict:
+        """gets a page of the mine ranking, best first"""
+        if self.ranking is None:
+            return {"config": {}, "total_mines": 0, "ranking": []}
+
+        page = self.ranking.iloc[offset:offset + limit]
+
+        return {
+            "config": {
+                "features": self.avaliable_features,
+                "data_source": self.config['data_source'],
+                "parameters": self.parameters
+            },
+            "total_mines": len(self.ranking),
+            "offset": offset,
+            "limit": limit,
+            "ranking": page.replace({np.nan: None}).to_dict('records')
+        }
 
 
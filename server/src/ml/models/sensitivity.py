@@ -0,0 +1,213 @@
+import os
+import numpy as np
+from typing import Dict, Generator
+
+from src.utils.logging import setup
+from src.ml import whatif
+from src.ml.BaseModel import BaseModel
+
+logger = setup()
+
+SENSITIVITY_PARAMETERS = {
+    "scenarios": max(int(os.getenv('SENSITIVITY_SCENARIOS', 2000)), 1),
+    # Standard deviation of the log-normal noise multiplying each weight
+    "perturbation": float(os.getenv('SENSITIVITY_PERTURBATION', 0.2)),
+    "top_n": int(os.getenv('SENSITIVITY_TOP_N', 100)),
+    "percentiles": [5, 50, 95],
+    # Memory for the scores and ranks of one chunk of scenarios
+    "chunk_mb": int(os.getenv('SENSITIVITY_CHUNK_MB', 256)),
+    # Rank histogram bins per mine, percentiles are exact for up to this many candidates
+    "rank_bins": int(os.getenv('SENSITIVITY_RANK_BINS', 2000)),
+    "seed": None
+}
+
+
+def weight_entries(config: dict) -> tuple:
+    """The scoring config's (tier, feature) weights as flat arrays.
+
+    Returns:
+        Tuple of (weights, tier index of each weight, feature of each weight)
+    """
+    entries = [
+        (t, feature, weight)
+        for t, tier in enumerate(whatif.TIERS)
+        for feature, weight in config['scoring_config'].get(tier, {}).items()
+    ]
+    tiers, features, weights = zip(*entries) if entries else ((), (), ())
+    return np.array(weights, dtype=np.float64), np.array(tiers, dtype=np.int64), list(features)
+
+
+def perturb(weights: np.ndarray, groups: np.ndarray, n: int, sigma: float, rng: np.random.Generator) -> np.ndarray:
+    """n copies of weights, each multiplied by log-normal noise then rescaled so every group keeps its total.
+
+    Keeping each tier's feature weights at their total keeps the tier scores
+    within [0, 1], so the tier clip never applies and scores stay linear.
+    """
+    noisy = weights * np.exp(sigma * rng.standard_normal((n, len(weights))))
+    membership = np.eye(groups.max() + 1 if len(groups) else 0)[groups]
+    totals = noisy @ membership
+    target = weights @ membership
+    scale = np.divide(target, totals, out=np.zeros_like(totals), where=totals > 0)
+    return noisy * scale[:, groups]
+
+
+def sample_scenarios(config: dict, features: list, n: int, sigma: float, rng: np.random.Generator) -> np.ndarray:
+    """Per-feature effective weights of n perturbed configs, as an (n, features) array.
+
+    A mine's score under a scenario is the dot product of its normalized features
+    with the scenario's row: every feature weight times its tier's weight, summed
+    over the tiers the feature appears in.
+    """
+    weights, tiers, entry_features = weight_entries(config)
+    tier_weights = np.array([config['tier_weights'].get(tier, 0.0) for tier in whatif.TIERS])
+
+    feature_weights = perturb(weights, tiers, n, sigma, rng)
+    scenario_tiers = perturb(tier_weights, np.zeros(len(tier_weights), dtype=np.int64), n, sigma, rng)
+
+    # (weights x features) indicator that sums each weight into its feature
+    index = {feature: i for i, feature in enumerate(features)}
+    to_features = np.zeros((len(weights), len(features)))
+    to_features[np.arange(len(weights)), [index[feature] for feature in entry_features]] = 1.0
+    return (feature_weights * scenario_tiers[:, tiers]) @ to_features
+
+
+def histogram_percentiles(histogram: np.ndarray, percentiles: list, bin_width: int) -> np.ndarray:
+    """Nearest-rank percentiles of every mine from its rank histogram, as a (percentiles, mines) array.
+
+    Each percentile is the first rank of the bin where the mine's cumulative count reaches it.
+    """
+    cumulative = histogram.cumsum(axis=1)
+    total = cumulative[:, -1:]
+    values = []
+    for p in percentiles:
+        threshold = np.maximum(np.ceil(total * p / 100), 1)
+        values.append((cumulative >= threshold).argmax(axis=1) * bin_width + 1)
+    return np.array(values, dtype=np.float64)
+
+
+def chunk_ranks(scores: np.ndarray) -> np.ndarray:
+    """1-based rank of every column within each row, ties keeping column order."""
+    order = np.argsort(-scores, axis=1, kind='stable')
+    ranks = np.empty(scores.shape, dtype=np.int32)
+    np.put_along_axis(ranks, order, np.arange(1, scores.shape[1] + 1, dtype=np.int32)[None, :], axis=1)
+    return ranks
+
+
+class SensitivityModel(BaseModel):
+    """Monte Carlo stability of the genetic algorithm's tier-score ranking under perturbed weights."""
+
+    model_type = "sensitivity_analysis"
+
+    def __init__(self) -> None:
+        self.parameters = dict(SENSITIVITY_PARAMETERS)
+        self.matrix = None
+        self.candidates = None
+        self.scenarios = 0
+        self.bin_width = 1
+        self.rank_histogram = None
+        self.top_n_counts = None
+        self.score_mean = None
+        self.score_std = None
+
+    @classmethod
+    def run_config(cls) -> dict:
+        return {"parameters": SENSITIVITY_PARAMETERS, "scoring": whatif.default_config()}
+
+    def invoke(self) -> Generator[dict, None, None]:
+        """Score the mines meeting the hard requirements under every scenario, a chunk of scenarios at a time.
+
+        Every other mine scores zero whatever the weights, so ranks are among these mines.
+        """
+        yield {'step': 'data_fetch', 'status': 'running', 'message': 'Loading normalized mine features'}
+        self.matrix = whatif.feature_matrix()
+        config = self.matrix.defaults
+
+        # Candidates in mine_id order, so a stable sort breaks ties by mine_id
+        eligible = np.flatnonzero(self.matrix.required > 0)
+        self.candidates = eligible[np.argsort(self.matrix.mine_ids[eligible], kind='stable')]
+        x = self.matrix.x[self.candidates].copy()
+        for feature in whatif.MAPPED_FEATURES:
+            x[:, self.matrix.index[feature]] = self.matrix.mapped(feature, config)[self.candidates]
+
+        n, n_mines = self.parameters["scenarios"], len(self.candidates)
+        rng = np.random.default_rng(self.parameters["seed"])
+        scenarios = sample_scenarios(config, self.matrix.features, n, self.parameters["perturbation"], rng)
+
+        # Per scenario and mine: the float64 score, int64 argsort, int32 rank and int64 histogram index
+        chunk = max(1, int(self.parameters["chunk_mb"] * 2 ** 20 // max(n_mines * 28, 1)))
+        score_sum, score_sq = np.zeros(n_mines), np.zeros(n_mines)
+
+        # Ranks are counted, not kept, so memory does not grow with the scenarios
+        self.bin_width = max(1, -(-n_mines // max(self.parameters["rank_bins"], 1)))
+        n_bins = max(1, -(-n_mines // self.bin_width))
+        self.rank_histogram = np.zeros((n_mines, n_bins), dtype=np.int64)
+        self.top_n_counts = np.zeros(n_mines, dtype=np.int64)
+        mine_offsets = np.arange(n_mines, dtype=np.int64) * n_bins
+
+        logger.info(f'Scoring {n_mines} mines under {n} scenarios, {chunk} at a time')
+        for start in range(0, n, chunk):
+            scores = scenarios[start:start + chunk] @ x.T
+            ranks = chunk_ranks(scores)
+            np.add.at(self.rank_histogram.reshape(-1), (mine_offsets + (ranks - 1) // self.bin_width).ravel(), 1)
+            self.top_n_counts += (ranks <= self.parameters["top_n"]).sum(axis=0)
+            score_sum += scores.sum(axis=0)
+            score_sq += (scores ** 2).sum(axis=0)
+
+            done = min(start + chunk, n)
+            yield {
+                'step': 'scoring',
+                'status': 'running',
+                'message': f'Scored {done}/{n} scenarios',
+                'scenarios_done': done,
+                'scenarios': n
+            }
+
+        self.scenarios = n
+        self.score_mean = score_sum / max(n, 1)
+        self.score_std = np.sqrt(np.maximum(score_sq / max(n, 1) - self.score_mean ** 2, 0))
+
+        yield {'step': 'complete', 'status': 'completed', 'message': f'Ranked {n_mines} mines under {n} scenarios'}
+
+    def get_results(self) -> Dict:
+        """Rank percentiles and top_n probability of every candidate, most stable top mines first."""
+        if self.rank_histogram is None:
+            return {"config": {}, "mines": []}
+
+        top_n = self.parameters["top_n"]
+        percentiles = self.parameters["percentiles"]
+        rank_percentiles = histogram_percentiles(self.rank_histogram, percentiles, self.bin_width)
+        p_top_n = self.top_n_counts / self.scenarios
+
+        # Default ranks among the candidates, ties by mine_id as in the scenarios
+        default_scores = self.matrix.default_scores[self.candidates]
+        default_ranks = chunk_ranks(default_scores[None, :])[0]
+
+        mines = []
+        for i, mine in enumerate(self.candidates):
+            entry = {
+                "mine_id": self.matrix.mine_ids[mine],
+                "mine_name": self.matrix.mine_names[mine],
+                "default_rank": int(default_ranks[i]),
+                "default_score": float(default_scores[i]),
+                "score_mean": float(self.score_mean[i]),
+                "score_std": float(self.score_std[i]),
+                "p_top_n": float(p_top_n[i])
+            }
+            for p, values in zip(percentiles, rank_percentiles):
+                entry[f"rank_p{p}"] = float(values[i])
+            mines.append(entry)
+
+        mines.sort(key=lambda m: (-m["p_top_n"], m["default_rank"]))
+
+        return {
+            "config": {
+                "scenarios": self.scenarios,
+                "perturbation": self.parameters["perturbation"],
+                "top_n": top_n,
+                "percentiles": percentiles,
+                "rank_bin_width": self.bin_width,
+                "candidates": len(self.candidates),
+                "total_mines_analyzed": len(self.matrix.mine_ids)
+            },
+            "mines": mines
+        }
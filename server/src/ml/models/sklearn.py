@@ -1,18 +1,39 @@
 import pandas as pd
 import numpy as np
+import os
+import copy
 import json
+import joblib
 from sklearn.preprocessing import StandardScaler
 from sklearn.compose import ColumnTransformer
-from sklearn.metrics import silhouette_score
-from sklearn.cluster import KMeans
+from sklearn.metrics import calinski_harabasz_score, silhouette_score
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from joblib import Parallel, delayed
 from typing import Generator
 
 from ...utils.logging import setup
+from .. import registry
 from ..BaseModel import BaseModel
-from ..helpers import get_all_mines_data
+from ..helpers import feature_schema, get_all_mines_data
 
 logger = setup()
 
+ARTIFACT_FILE = "clustering.joblib"
+
+# Processes used to fit candidate cluster counts, -1 for every core
+CLUSTERING_N_JOBS = int(os.getenv('CLUSTERING_N_JOBS', -1))
+# Mines sampled for the silhouette score, which is quadratic in the number of points
+CLUSTERING_SILHOUETTE_SAMPLE = int(os.getenv('CLUSTERING_SILHOUETTE_SAMPLE', 5000))
+# Above this many mines candidates are fitted with MiniBatchKMeans
+CLUSTERING_MINIBATCH_THRESHOLD = int(os.getenv('CLUSTERING_MINIBATCH_THRESHOLD', 50000))
+CLUSTERING_RANDOM_STATE = 42
+# Assign mines to the latest registered clusters instead of refitting, unless they have drifted
+CLUSTERING_INCREMENTAL = os.getenv('CLUSTERING_INCREMENTAL', 'true').lower() == 'true'
+# Refit once the mean squared distance to the centres grows by more than this fraction
+CLUSTERING_MAX_INERTIA_GROWTH = float(os.getenv('CLUSTERING_MAX_INERTIA_GROWTH', 0.2))
+# Refit once this fraction of mines would have to move between clusters to match the fitted sizes
+CLUSTERING_MAX_SIZE_SHIFT = float(os.getenv('CLUSTERING_MAX_SIZE_SHIFT', 0.1))
+
 DEFAULT_CONFIG = {
     "source_table": "data_analytics.mine_summary",
     "features": [
@@ -30,6 +51,38 @@ DEFAULT_CONFIG = {
 }
 
 
+def _fit_candidate(k: int, df_processed: np.ndarray, parameters: dict, minibatch: bool, silhouette_sample: int,
+                   score: bool = True) -> tuple:
+    """Fit one candidate cluster count and score it unless score is False. Runs in a worker process."""
+    if minibatch:
+        kmeans = MiniBatchKMeans(n_clusters=k, batch_size=4096, **parameters, random_state=CLUSTERING_RANDOM_STATE)
+    else:
+        kmeans = KMeans(n_clusters=k, **parameters, random_state=CLUSTERING_RANDOM_STATE)
+    labels = kmeans.fit_predict(df_processed)
+    cluster_counts = np.bincount(labels, minlength=k)
+    if not score:
+        return kmeans, labels, None, None, cluster_counts
+
+    # Sampled silhouette, exact when there are fewer mines than the sample size
+    sample_size = silhouette_sample if len(df_processed) > silhouette_sample else None
+    sil_score = silhouette_score(df_processed, labels, sample_size=sample_size, random_state=CLUSTERING_RANDOM_STATE)
+    calinski_score = calinski_harabasz_score(df_processed, labels)
+    return kmeans, labels, sil_score, calinski_score, cluster_counts
+
+
+def _row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """Hash of each mine's feature values, to find the mines that changed since the last run."""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def _fit_summary(labels: np.ndarray, distances: np.ndarray, n_clusters: int) -> dict:
+    """Mean squared distance to the centres and share of mines per cluster, compared between runs to detect drift."""
+    return {
+        "inertia_per_mine": float(np.mean(distances ** 2)) if len(distances) else 0.0,
+        "cluster_shares": (np.bincount(labels, minlength=n_clusters) / max(len(labels), 1)).tolist()
+    }
+
+
 class ClusteringModel(BaseModel):
     """ML Model using DEAP for mine evaluation and ranking - optimised for deep coal mines near Wollongong/Brisbane
 
@@ -52,6 +105,8 @@ class ClusteringModel(BaseModel):
         }
     }
     """
+    model_type = "clustering_algorithm"
+
     def __init__(self) -> None:
         self.mines_data = None
         self.config = DEFAULT_CONFIG.copy()
@@ -71,6 +126,14 @@ class ClusteringModel(BaseModel):
         self.available = []
         self.unavailable = []
         self.clustered_data = None
+        self.fill_values = {}
+        self.scaler = None
+        self.kmeans = None
+        self.incremental = CLUSTERING_INCREMENTAL
+        self.refit = True
+        self.baseline = None
+        self.drift = {}
+        self.changed_mines = None
 
     def get_all_mines(self) -> pd.DataFrame:
         """Retrieve all mines with joined T1-T5 data."""
@@ -123,10 +186,15 @@ class ClusteringModel(BaseModel):
         self.df = self.df.dropna(subset=self.available, how='all')
         logger.info(f"After removing rows with all null features: {len(self.df)} mines remain")
 
+        if self.incremental and self._assign_to_previous():
+            return self.df
+
         # Fill remaining NaN values with median for better clustering
         for col in self.available:
+            median_val = self.df[col].median()
+            # Kept so mines scored later are filled the same way
+            self.fill_values[col] = float(median_val) if pd.notna(median_val) else 0.0
             if self.df[col].isna().any():
-                median_val = self.df[col].median()
                 self.df[col] = self.df[col].fillna(median_val)
                 logger.info(f"  Filled {col} NaN values with median: {median_val}")
 
@@ -151,23 +219,118 @@ class ClusteringModel(BaseModel):
         df_processed = preprocessor.fit_transform(self.df[self.available])
 
         # Error handling if preprocessing collapsed to a single value
-        if len(np.unique(df_processed, axis=0)) == 1:
+        if (df_processed.max(axis=0) == df_processed.min(axis=0)).all():
             raise Exception("PreprocessingError: Data has no variance (all rows identical). Clustering cannot proceed.")
 
-        k = self._get_best_k(df_processed)
+        # The winning candidate's fit is kept rather than fitting it again
+        k, kmeans, clusters = self._get_best_k(df_processed)
         logger.info(f"Optimal number of clusters determined: {k}")
 
-        # Perform clustering
-        kmeans = KMeans(n_clusters=k, **self.parameters)
-        clusters = kmeans.fit_predict(df_processed)
+        self.scaler = preprocessor.named_transformers_['num']
+        self.kmeans = kmeans
 
-        # Add cluster labels to DataFrame
+        # Add cluster labels to DataFrame, with each mine's distance to its cluster centre
         self.df['cluster'] = clusters
+        self.df['distance'] = kmeans.transform(df_processed)[np.arange(len(clusters)), clusters]
         self.clustered_data = self.df
 
+        # Later incremental runs measure drift against this fit
+        self.refit = True
+        self.baseline = _fit_summary(clusters, self.df['distance'].to_numpy(), k)
+        self.drift = {}
+        self.changed_mines = len(self.df)
+
         logger.info(f"Clustering complete with {k} clusters")
         return self.df
 
+    def _assign_to_previous(self) -> bool:
+        """Assign mines to the latest registered clusters without refitting.
+
+        The saved scaler and centres are reused; mines that are new or changed since that
+        fit update MiniBatchKMeans centres with partial_fit, while KMeans centres stay fixed.
+        Falls back to a full refit when the fit has drifted: the mean squared distance to
+        the centres grew by more than CLUSTERING_MAX_INERTIA_GROWTH, or the cluster sizes
+        shifted by more than CLUSTERING_MAX_SIZE_SHIFT.
+
+        Returns:
+            True if every mine was assigned, False if a full refit is needed
+        """
+        try:
+            previous = registry.load(self.model_type)
+        except LookupError:
+            logger.info("No registered clusters to assign to, running a full fit")
+            return False
+
+        features = previous["features"]
+        baseline = previous.get("baseline")
+        if baseline is None or not set(features) <= set(self.available) or previous["mine_ids"] is None:
+            logger.info(f"Registered clusters v{previous['manifest']['version']} cannot be reused, running a full fit")
+            return False
+
+        df = self.df.copy()
+        df[features] = df[features].fillna(previous["fill_values"])
+        if df.empty:
+            return False
+
+        # New mines and mines whose features changed since the registered fit
+        hashes = _row_hashes(df[features])
+        known = pd.Index(previous["mine_ids"]).get_indexer(df['mine_id'].astype(str))
+        changed = (known < 0) | (previous["row_hashes"][np.maximum(known, 0)] != hashes)
+
+        scaler = previous["scaler"]
+        kmeans = previous["kmeans"]
+        processed = scaler.transform(df[features])
+        if isinstance(kmeans, MiniBatchKMeans) and changed.any():
+            # Registry artifacts are shared, so update a copy
+            kmeans = copy.deepcopy(kmeans)
+            kmeans.partial_fit(processed[changed])
+
+        distances = kmeans.transform(processed)
+        labels = distances.argmin(axis=1)
+        nearest = distances[np.arange(len(labels)), labels]
+
+        current = _fit_summary(labels, nearest, kmeans.n_clusters)
+        inertia_growth = current["inertia_per_mine"] / baseline["inertia_per_mine"] - 1 if baseline["inertia_per_mine"] else 0.0
+        size_shift = 0.5 * float(np.abs(np.array(current["cluster_shares"]) - np.array(baseline["cluster_shares"])).sum())
+        drift = {"inertia_growth": inertia_growth, "size_shift": size_shift}
+        logger.info(
+            f"{int(changed.sum())} new or changed mines since v{previous['manifest']['version']}, "
+            f"inertia growth={inertia_growth:.3f}, size shift={size_shift:.3f}"
+        )
+
+        if inertia_growth > CLUSTERING_MAX_INERTIA_GROWTH or size_shift > CLUSTERING_MAX_SIZE_SHIFT:
+            logger.info("Clusters have drifted past the thresholds, running a full fit")
+            return False
+
+        self.available = features
+        self.fill_values = dict(previous["fill_values"])
+        self.scaler = scaler
+        self.kmeans = kmeans
+        self.refit = False
+        self.baseline = baseline
+        self.drift = drift
+        self.changed_mines = int(changed.sum())
+
+        df['cluster'] = labels
+        df['distance'] = nearest
+        self.df = df
+        self.clustered_data = df
+
+        logger.info(f"Assigned {len(df)} mines to {kmeans.n_clusters} existing clusters")
+        return True
+
+    @classmethod
+    def run_config(cls) -> dict:
+        return {
+            **DEFAULT_CONFIG,
+            "random_state": CLUSTERING_RANDOM_STATE,
+            "minibatch_threshold": CLUSTERING_MINIBATCH_THRESHOLD,
+            "silhouette_sample": CLUSTERING_SILHOUETTE_SAMPLE,
+            "incremental": CLUSTERING_INCREMENTAL,
+            "max_inertia_growth": CLUSTERING_MAX_INERTIA_GROWTH,
+            "max_size_shift": CLUSTERING_MAX_SIZE_SHIFT
+        }
+
     def invoke(self) -> Generator[dict, None, None]:
         """Run clustering analysis with progress updates."""
         yield {'step': 'initialization', 'status': 'running', 'message': 'Setting up clustering analysis'}
@@ -181,43 +344,47 @@ class ClusteringModel(BaseModel):
         yield {'step': 'clustering', 'status': 'running', 'message': 'Running clustering analysis'}
         self.run_clustering_analysis()
 
-        yield {'step': 'complete', 'status': 'completed', 'message': 'Clustering analysis complete'}
+        if self.refit:
+            message = 'Clustering analysis complete'
+        else:
+            message = f'Assigned {self.changed_mines} new or changed mines to the existing clusters'
+        yield {'step': 'complete', 'status': 'completed', 'message': message}
 
     def get_json_results(self) -> str:
         """Get clustering results as JSON string."""
         results = self.generate_results()
         return json.dumps(results, indent=2, default=str)
 
-    def _get_best_k(self, df_processed) -> int:
-        """Find optimal number of clusters using elbow method and silhouette score."""
-        from sklearn.metrics import calinski_harabasz_score
+    def _get_best_k(self, df_processed) -> tuple:
+        """Find optimal number of clusters using silhouette score and cluster balance.
+
+        Candidates are fitted in parallel processes sharing the preprocessed matrix,
+        which joblib memory-maps rather than copying into each worker.
 
+        Returns:
+            Tuple of (k, fitted model, cluster labels) for the winning candidate
+        """
         max_k = min(10, len(df_processed) // 2)  # Ensure we don't have more clusters than reasonable
         if max_k < 2:
-            return 2
+            # Too few mines to score, as silhouette needs fewer clusters than mines
+            kmeans, labels, *_ = _fit_candidate(2, df_processed, self.parameters, False, CLUSTERING_SILHOUETTE_SAMPLE,
+                                                score=False)
+            return 2, kmeans, labels
 
-        logger.info(f"Testing cluster counts from 2 to {max_k}")
+        minibatch = len(df_processed) > CLUSTERING_MINIBATCH_THRESHOLD
+        algorithm = "MiniBatchKMeans" if minibatch else "KMeans"
+        logger.info(f"Testing cluster counts from 2 to {max_k} with {algorithm}")
 
-        silhouette_scores = []
-        inertias = []
-        calinski_scores = []
+        candidates = Parallel(n_jobs=CLUSTERING_N_JOBS)(
+            delayed(_fit_candidate)(k, df_processed, self.parameters, minibatch, CLUSTERING_SILHOUETTE_SAMPLE)
+            for k in range(2, max_k + 1)
+        )
 
         best_score = -1
-        best_k = 2
-
-        for k in range(2, max_k + 1):
-            kmeans = KMeans(n_clusters=k, **self.parameters, random_state=42).fit(df_processed)
-
-            # Calculate multiple metrics
-            sil_score = silhouette_score(df_processed, kmeans.labels_)
-            calinski_score = calinski_harabasz_score(df_processed, kmeans.labels_)
-
-            silhouette_scores.append(sil_score)
-            inertias.append(kmeans.inertia_)
-            calinski_scores.append(calinski_score)
+        best = None
 
+        for k, (kmeans, labels, sil_score, calinski_score, cluster_counts) in zip(range(2, max_k + 1), candidates):
             # Check cluster balance - avoid extremely imbalanced clusters
-            cluster_counts = pd.Series(kmeans.labels_).value_counts()
             min_cluster_size = cluster_counts.min()
             max_cluster_size = cluster_counts.max()
             balance_ratio = min_cluster_size / max_cluster_size
@@ -229,13 +396,22 @@ class ClusteringModel(BaseModel):
 
             if adjusted_score > best_score and min_cluster_size >= 2:  # Ensure no tiny clusters
                 best_score = adjusted_score
-                best_k = k
+                best = (k, kmeans, labels)
+
+        if best is None:
+            # No candidate avoided tiny clusters, fall back to two
+            kmeans, labels = candidates[0][0], candidates[0][1]
+            best = (2, kmeans, labels)
 
-        logger.info(f"Selected k={best_k} with adjusted score={best_score:.3f}")
-        return best_k
+        logger.info(f"Selected k={best[0]} with adjusted score={best_score:.3f}")
+        return best
 
     def generate_results(self) -> dict:
-        """Generate comprehensive results with cluster assignments and analysis."""
+        """Generate results with cluster statistics and each cluster's mines.
+
+        Members are listed closest to their cluster centre first. Pages of the
+        registered model's members are served by scoring.cluster_members.
+        """
         logger.info("Generating comprehensive clustering results")
 
         if self.clustered_data is None or "cluster" not in self.clustered_data.columns:
@@ -244,34 +420,39 @@ class ClusteringModel(BaseModel):
                 "clusters": {}
             }
 
-        df = self.clustered_data.copy()
-
-        # Add cluster statistics
-        cluster_stats = df.groupby('cluster').size().sort_values(ascending=False)
-        logger.info(f"Cluster distribution: {cluster_stats.to_dict()}")
+        df = self.clustered_data
+        grouped = df.groupby('cluster')
+
+        # Per cluster statistics in one pass over the data
+        sizes = grouped.size()
+        means = grouped[self.available].mean()
+        stds = grouped[self.available].std(ddof=0)
+        logger.info(f"Cluster distribution: {sizes.sort_values(ascending=False).to_dict()}")
+
+        # Centres in the original feature units rather than standardised ones
+        centroids = pd.DataFrame(
+            self.scaler.inverse_transform(self.kmeans.cluster_centers_),
+            columns=self.available
+        ) if self.kmeans is not None else means
+
+        # Rank members within their cluster once
+        member_cols = ['mine_id', 'mine_name'] + self.available + ['distance']
+        members = df.reindex(columns=['cluster'] + member_cols).sort_values(['cluster', 'distance', 'mine_id'])
+        members['mine_name'] = members['mine_name'].fillna('Unknown')
+
+        mines_by_cluster = {
+            cluster_id: cluster_members[member_cols].to_dict('records')
+            for cluster_id, cluster_members in members.groupby('cluster')
+        }
 
-        # Generate cluster summary with detailed mine information
         clusters = {}
-        for cluster_id in sorted(df['cluster'].unique()):
-            cluster_data = df[df['cluster'] == cluster_id]
-
-            # Get detailed mine information for this cluster
-            mines_detailed = []
-            for _, row in cluster_data.iterrows():
-                mine_info = {
-                    'mine_id': row['mine_id'],
-                    'mine_name': row.get('mine_name', 'Unknown')
-                }
-
-                # Add all available features used in clustering
-                for feature in self.available:
-                    if feature in row:
-                        mine_info[feature] = row[feature]
-
-                mines_detailed.append(mine_info)
-
+        for cluster_id in sizes.index:
+            mines_detailed = mines_by_cluster.get(cluster_id, [])
             clusters[f"cluster_{cluster_id}"] = {
-                "size": len(cluster_data),
+                "size": int(sizes[cluster_id]),
+                "centroid": centroids.loc[cluster_id].to_dict(),
+                "feature_mean": means.loc[cluster_id].to_dict(),
+                "feature_std": stds.loc[cluster_id].to_dict(),
                 "mines": mines_detailed
             }
 
@@ -283,7 +464,10 @@ class ClusteringModel(BaseModel):
                 "unavailable_features": self.unavailable,
                 "parameters": self.parameters,
                 "total_mines_analyzed": len(df),
-                "number_of_clusters": len(df['cluster'].unique())
+                "number_of_clusters": len(sizes),
+                "refit": self.refit,
+                "changed_mines": self.changed_mines,
+                "drift": self.drift
             },
             "clusters": clusters
         }
@@ -354,6 +538,50 @@ class ClusteringModel(BaseModel):
         results = self.generate_results()
         return results
 
+    def save_model(self, directory: str):
+        """Save the fitted scaler and KMeans with the medians used to fill missing features."""
+        if self.kmeans is None:
+            return None
+
+        # Mine ids and feature hashes let the next incremental run find new and changed mines
+        joblib.dump({
+            "scaler": self.scaler,
+            "kmeans": self.kmeans,
+            "mine_ids": self.df['mine_id'].astype(str).to_numpy(),
+            "row_hashes": _row_hashes(self.df[self.available]),
+            "baseline": self.baseline
+        }, os.path.join(directory, ARTIFACT_FILE))
+
+        return {
+            "features": feature_schema(self.df, self.available),
+            "config": {
+                "parameters": self.parameters,
+                "fill_values": {col: self.fill_values[col] for col in self.available},
+                "n_clusters": int(self.kmeans.n_clusters)
+            },
+            "metrics": {
+                "inertia": float((self.df['distance'] ** 2).sum()),
+                "total_mines_analyzed": len(self.df),
+                "refit": self.refit,
+                "changed_mines": self.changed_mines,
+                "drift": self.drift
+            }
+        }
+
+    @classmethod
+    def load_model(cls, directory: str, manifest: dict) -> dict:
+        artifacts = joblib.load(os.path.join(directory, ARTIFACT_FILE))
+        return {
+            "scaler": artifacts["scaler"],
+            "kmeans": artifacts["kmeans"],
+            "features": [feature["name"] for feature in manifest["features"]],
+            "fill_values": manifest["config"]["fill_values"],
+            # Older artifacts predate incremental assignment
+            "mine_ids": artifacts.get("mine_ids"),
+            "row_hashes": artifacts.get("row_hashes"),
+            "baseline": artifacts.get("baseline")
+        }
+
 if __name__ == "__main__":
     try:
         # Example configuration for clustering
@@ -0,0 +1,245 @@
+"""Multi-objective portfolio search with a vectorized NSGA-II.
+
+A portfolio is a fixed-size set of candidate mines, held as a row of indexes
+into the candidate arrays, so a population is a 2-D index array. Each
+portfolio is scored on three objectives, all maximized:
+
+    total_fitness    sum of the members' tier-score fitness
+    spread_km        mean great-circle distance between pairs of members
+    regions          number of distinct country/state regions covered
+
+subject to at most max_per_region members from one region and no repeated
+mine. The pairwise distances between candidates are computed once, then every
+generation gathers the whole population's member-to-member distances in one
+indexing operation. Infeasible portfolios are ranked with constrained
+domination: feasible beats infeasible, and smaller violations beat larger.
+"""
+
+from typing import Generator
+
+import numpy as np
+
+OBJECTIVES = ("total_fitness", "spread_km", "regions")
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def distance_matrix(latitude: np.ndarray, longitude: np.ndarray) -> np.ndarray:
+    """Great-circle distances in km between every pair of points. Missing coordinates count as 0 km away."""
+    lat = np.radians(np.asarray(latitude, dtype=np.float64))
+    lon = np.radians(np.asarray(longitude, dtype=np.float64))
+
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat[:, None]) * np.cos(lat[None, :]) * np.sin(dlon / 2) ** 2
+    distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+    return np.nan_to_num(distances, nan=0.0).astype(np.float32)
+
+
+def _distinct(values: np.ndarray) -> np.ndarray:
+    """Mask of the first occurrence of each value in every row of a row-sorted array."""
+    distinct = np.ones(values.shape, dtype=bool)
+    distinct[:, 1:] = values[:, 1:] != values[:, :-1]
+    return distinct
+
+
+def evaluate(population: np.ndarray, fitness: np.ndarray, distances: np.ndarray, regions: np.ndarray,
+             max_per_region: int) -> tuple:
+    """Objectives and constraint violation of every portfolio.
+
+    Returns:
+        Tuple of (objectives as a (n, 3) array in OBJECTIVES order, violation as a (n,) array)
+    """
+    n, size = population.shape
+    pairs = max(size * (size - 1), 1)
+
+    total_fitness = fitness[population].sum(axis=1)
+    # (n, size, size) distances between members, the diagonal is zero
+    spread = distances[population[:, :, None], population[:, None, :]].sum(axis=(1, 2)) / pairs
+
+    member_regions = np.sort(regions[population], axis=1)
+    first = _distinct(member_regions)
+    n_regions = first.sum(axis=1)
+
+    # Members beyond the cap in each region: position within its run of equal regions
+    run_start = np.maximum.accumulate(np.where(first, np.arange(size), 0), axis=1)
+    over_cap = (np.arange(size) - run_start) >= max_per_region
+    repeats = size - _distinct(np.sort(population, axis=1)).sum(axis=1)
+    violation = over_cap.sum(axis=1) + repeats
+
+    objectives = np.column_stack([total_fitness, spread, n_regions]).astype(np.float64)
+    return objectives, violation.astype(np.float64)
+
+
+def non_dominated_sort(objectives: np.ndarray, violation: np.ndarray) -> np.ndarray:
+    """Front of every portfolio, 0 for the Pareto front, from one batched domination matrix."""
+    at_least = (objectives[:, None, :] >= objectives[None, :, :]).all(axis=2)
+    better = (objectives[:, None, :] > objectives[None, :, :]).any(axis=2)
+    feasible = violation == 0
+
+    # dominates[i, j]: i dominates j
+    dominates = np.where(
+        feasible[:, None] & feasible[None, :],
+        at_least & better,
+        violation[:, None] < violation[None, :]
+    )
+
+    ranks = np.full(len(objectives), -1)
+    dominated_by = dominates.sum(axis=0)
+    front = 0
+    while (ranks < 0).any():
+        current = (dominated_by == 0) & (ranks < 0)
+        ranks[current] = front
+        dominated_by = dominated_by - dominates[current].sum(axis=0)
+        front += 1
+    return ranks
+
+
+def crowding_distance(objectives: np.ndarray, ranks: np.ndarray) -> np.ndarray:
+    """NSGA-II crowding distance within each front, infinite at each objective's extremes."""
+    crowding = np.zeros(len(objectives))
+    for front in np.unique(ranks):
+        members = np.flatnonzero(ranks == front)
+        if len(members) <= 2:
+            crowding[members] = np.inf
+            continue
+
+        values = objectives[members]
+        order = np.argsort(values, axis=0)
+        ordered = np.take_along_axis(values, order, axis=0)
+        span = ordered[-1] - ordered[0]
+        gaps = np.zeros_like(ordered)
+        gaps[1:-1] = (ordered[2:] - ordered[:-2]) / np.where(span > 0, span, 1)
+        gaps[0] = gaps[-1] = np.inf
+
+        # Scatter each objective's gaps back to member order and add them up
+        distance = np.zeros_like(values)
+        np.put_along_axis(distance, order, gaps, axis=0)
+        crowding[members] = distance.sum(axis=1)
+    return crowding
+
+
+def _tournament(ranks: np.ndarray, crowding: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    """Binary tournaments on front, then crowding distance."""
+    a, b = rng.integers(0, len(ranks), size=(2, k))
+    a_wins = (ranks[a] < ranks[b]) | ((ranks[a] == ranks[b]) & (crowding[a] >= crowding[b]))
+    return np.where(a_wins, a, b)
+
+
+def _repair(population: np.ndarray, n_candidates: int, rng: np.random.Generator, attempts: int = 5):
+    """Replace repeated mines in each portfolio with random candidates, in place.
+
+    Any repeats left after a few attempts count as constraint violations.
+    """
+    for _ in range(attempts):
+        order = np.argsort(population, axis=1)
+        repeated_sorted = ~_distinct(np.take_along_axis(population, order, axis=1))
+        if not repeated_sorted.any():
+            return
+        repeated = np.zeros_like(repeated_sorted)
+        np.put_along_axis(repeated, order, repeated_sorted, axis=1)
+        population[repeated] = rng.integers(0, n_candidates, size=int(repeated.sum()))
+
+
+def _offspring(population: np.ndarray, parents: np.ndarray, n_candidates: int, parameters: dict,
+               rng: np.random.Generator) -> np.ndarray:
+    """Uniform crossover of consecutive parents and random-replacement mutation, then repair."""
+    children = population[parents].copy()
+    n, size = children.shape
+
+    pairs = np.flatnonzero(rng.random(n // 2) < parameters["cxpb"]) * 2
+    swap = rng.random((len(pairs), size)) < 0.5
+    left, right = children[pairs], children[pairs + 1]
+    children[pairs] = np.where(swap, right, left)
+    children[pairs + 1] = np.where(swap, left, right)
+
+    mutated = rng.random(n) < parameters["mutpb"]
+    genes = (rng.random(children.shape) < parameters["indpb"]) & mutated[:, None]
+    children[genes] = rng.integers(0, n_candidates, size=int(genes.sum()))
+
+    _repair(children, n_candidates, rng)
+    return children
+
+
+def rank(population: dict) -> dict:
+    """population with the fronts and crowding distances of its portfolios recomputed."""
+    ranks = non_dominated_sort(population["objectives"], population["violation"])
+    return {**population, "ranks": ranks, "crowding": crowding_distance(population["objectives"], ranks)}
+
+
+def feasible_fitness(population: dict) -> np.ndarray:
+    """Total fitness of the feasible portfolios in population, or a single zero when there are none."""
+    feasible = population["violation"] == 0
+    return population["objectives"][feasible, 0] if feasible.any() else np.zeros(1)
+
+
+def initial_population(fitness: np.ndarray, distances: np.ndarray, regions: np.ndarray, parameters: dict,
+                       rng: np.random.Generator) -> dict:
+    """population_size portfolios of random distinct candidates, scored and ranked.
+
+    A population is a dict of arrays with a row per portfolio: the portfolios
+    themselves, their objectives, violations, fronts and crowding distances.
+    """
+    n_candidates = len(fitness)
+    size = min(parameters["portfolio_size"], n_candidates)
+    population = np.argsort(rng.random((parameters["population_size"], n_candidates)), axis=1)[:, :size]
+    objectives, violation = evaluate(population, fitness, distances, regions, parameters["max_per_region"])
+    return rank({"population": population, "objectives": objectives, "violation": violation})
+
+
+def next_generation(population: dict, fitness: np.ndarray, distances: np.ndarray, regions: np.ndarray,
+                    parameters: dict, rng: np.random.Generator) -> tuple:
+    """Breed as many children as there are portfolios, then keep the best of parents and children.
+
+    Survivors are chosen by front, then crowding distance, and are kept in that order.
+
+    Returns:
+        Tuple of (the next population, number of evaluations)
+    """
+    n = len(population["population"])
+    parents = _tournament(population["ranks"], population["crowding"], n, rng)
+    children = _offspring(population["population"], parents, len(fitness), parameters, rng)
+    child_objectives, child_violation = evaluate(children, fitness, distances, regions, parameters["max_per_region"])
+
+    combined = rank({
+        "population": np.concatenate([population["population"], children]),
+        "objectives": np.concatenate([population["objectives"], child_objectives]),
+        "violation": np.concatenate([population["violation"], child_violation])
+    })
+    survivors = np.lexsort((-combined["crowding"], combined["ranks"]))[:n]
+    return {key: values[survivors] for key, values in combined.items()}, n
+
+
+def evolve(fitness: np.ndarray, distances: np.ndarray, regions: np.ndarray,
+           parameters: dict) -> Generator[dict, None, None]:
+    """Evolve portfolios of the candidates with NSGA-II.
+
+    fitness, regions (integer codes) and the distance matrix describe the
+    candidates. Each generation breeds population_size children by tournament,
+    then keeps the best population_size of parents and children by front and
+    crowding distance. Yields the population, its objectives, violations and
+    fronts after every generation, the initial population being generation 0.
+    """
+    rng = np.random.default_rng(parameters["seed"])
+    population = initial_population(fitness, distances, regions, parameters, rng)
+    yield {"generation": 0, **population, "evaluations": len(population["population"])}
+
+    for generation in range(1, parameters["generations"] + 1):
+        population, evaluations = next_generation(population, fitness, distances, regions, parameters, rng)
+        yield {"generation": generation, **population, "evaluations": evaluations}
+
+
+def pareto_front(population: np.ndarray, objectives: np.ndarray, violation: np.ndarray,
+                 ranks: np.ndarray) -> tuple:
+    """Distinct feasible portfolios on the first front, highest total fitness first.
+
+    Returns:
+        Tuple of (portfolios as sorted index rows, their objectives)
+    """
+    on_front = (ranks == 0) & (violation == 0)
+    portfolios = np.sort(population[on_front], axis=1)
+    portfolios, first = np.unique(portfolios, axis=0, return_index=True)
+    front_objectives = objectives[on_front][first]
+
+    order = np.argsort(-front_objectives[:, 0], kind='stable')
+    return portfolios[order], front_objectives[order]
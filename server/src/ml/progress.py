@@ -0,0 +1,70 @@
+"""Timing for the progress events models yield from invoke().
+
+Models yield {'step', 'status', 'message'} dicts as each step starts. The
+tracker stamps every event with the wall clock time, the time since the run
+started and the time spent in the current step so far. When the step changes
+it also reports how long the previous step took, and keeps the totals per step.
+"""
+
+import json
+import time
+import datetime
+from typing import Iterable, Iterator
+
+
+class ProgressTracker:
+    """Adds timestamps and per-step timings to a model's progress events."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.step = None
+        self.step_started = self.started
+        self.durations = {}
+
+    def _close_step(self, now: float):
+        if self.step is not None:
+            self.durations[self.step] = self.durations.get(self.step, 0.0) + (now - self.step_started)
+
+    def event(self, event: dict) -> dict:
+        """Return a copy of event with timing fields added."""
+        now = time.perf_counter()
+        event = dict(event)
+        step = event.get('step', 'unknown')
+
+        if step != self.step:
+            if self.step is not None:
+                event['previous_step'] = self.step
+                event['previous_step_s'] = round(now - self.step_started, 3)
+            self._close_step(now)
+            self.step = step
+            self.step_started = now
+
+        event['timestamp'] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        event['elapsed_s'] = round(now - self.started, 3)
+        event['step_elapsed_s'] = round(now - self.step_started, 3)
+        return event
+
+    def track(self, events: Iterable[dict]) -> Iterator[dict]:
+        """Time each event as the model yields it."""
+        for event in events:
+            yield self.event(event)
+
+    def timings(self) -> dict:
+        """Seconds spent in each step so far, including the one still running."""
+        now = time.perf_counter()
+        timings = dict(self.durations)
+        if self.step is not None:
+            timings[self.step] = timings.get(self.step, 0.0) + (now - self.step_started)
+        return {step: round(seconds, 3) for step, seconds in timings.items()}
+
+
+def _default(value):
+    # numpy scalars and arrays, then anything else such as dates and UUIDs
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return str(value)
+
+
+def to_json(event: dict) -> str:
+    """Serialise an event, including numpy values in model results."""
+    return json.dumps(event, default=_default)
@@ -0,0 +1,193 @@
+"""Versioned store of trained model artifacts.
+
+Each successful run saves what its model needs to score mines again without
+retraining: the ranker's torch state_dict, the clustering scaler and KMeans, or
+the GA's scoring config and best individual. They are kept in
+public.model_artifacts, one row per version of each model type, holding
+
+    manifest    feature schema, data and code versions, run key, config and metrics
+    archive     gzipped tar of the files written by the model
+
+so the API and the job workers see the same models whatever node they run on,
+and the models outlive restarts. The latest version of a type is its highest.
+Versions are inserted in one transaction, so a reader never sees a partial
+artifact. Loaded artifacts are immutable and cached in process, so repeated
+scoring requests reuse the same objects.
+"""
+
+import io
+import os
+import json
+import tarfile
+import tempfile
+import datetime
+import functools
+import psycopg2
+from psycopg2.extras import Json, RealDictCursor
+
+from src.ml.BaseModel import BaseModel, model_class
+from src.utils.database import get_connection
+from src.utils.logging import setup
+
+logger = setup()
+
+MODEL_REGISTRY_CACHE_SIZE = int(os.getenv('MODEL_REGISTRY_CACHE_SIZE', 8))
+
+
+def _pack(directory: str) -> tuple:
+    """Files in directory and a gzipped tar of them."""
+    files = sorted(os.listdir(directory))
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:gz') as archive:
+        for name in files:
+            archive.add(os.path.join(directory, name), arcname=name)
+    return files, buffer.getvalue()
+
+
+def _unpack(archive: bytes, directory: str):
+    with tarfile.open(fileobj=io.BytesIO(archive), mode='r:gz') as tar:
+        tar.extractall(directory, filter='data')
+
+
+def latest_version(model_type: str):
+    """Newest registered version of model_type, or None if it was never trained."""
+    # From the primary, which a worker on another node may have just registered to
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT MAX(version) FROM public.model_artifacts WHERE model_type = %s", [model_type])
+            return cursor.fetchone()[0]
+
+
+def register(model: BaseModel, data_version: int, code_version: str, run_key: str = None):
+    """Save a trained model's artifacts as the new latest version of its type.
+
+    data_version, code_version and run_key are those of the run that trained it, as its results are stored under.
+
+    Returns:
+        The new manifest, or None if the model had nothing to save or saving failed
+    """
+    model_type = model.model_type
+
+    try:
+        with tempfile.TemporaryDirectory(prefix="lucent-model-") as build_dir:
+            saved = model.save_model(build_dir)
+            if saved is None:
+                logger.info(f"{model_type} has no trained artifacts to register")
+                return None
+            files, archive = _pack(build_dir)
+
+        with get_connection() as conn:
+            with conn.cursor() as cursor:
+                # Numbers the versions of a type one registration at a time
+                cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", [f"model_artifacts:{model_type}"])
+                cursor.execute(
+                    "SELECT COALESCE(MAX(version), 0) + 1 FROM public.model_artifacts WHERE model_type = %s",
+                    [model_type]
+                )
+                version = cursor.fetchone()[0]
+
+                manifest = {
+                    "model_type": model_type,
+                    "version": version,
+                    "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                    "data_version": data_version,
+                    "code_version": code_version,
+                    "run_key": run_key,
+                    "features": saved.get("features", []),
+                    "config": saved.get("config", {}),
+                    "metrics": saved.get("metrics", {}),
+                    "files": files,
+                }
+                # Round-tripped so the manifest returned matches the one loaded later
+                manifest = json.loads(json.dumps(manifest, default=str))
+
+                cursor.execute(
+                    """
+                    INSERT INTO public.model_artifacts (model_type, version, manifest, archive)
+                    VALUES (%s, %s, %s, %s)
+                    """,
+                    [model_type, version, Json(manifest), psycopg2.Binary(archive)]
+                )
+
+        logger.info(f"Registered {model_type} v{version} ({len(archive)} bytes)")
+        return manifest
+
+    except Exception as e:
+        logger.error(f"Error registering {model_type} artifacts: {e}")
+        return None
+
+
+def get_manifest(model_type: str, version: int) -> dict:
+    """Manifest of one registered version, or None if it does not exist."""
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT manifest FROM public.model_artifacts WHERE model_type = %s AND version = %s",
+                [model_type, version]
+            )
+            row = cursor.fetchone()
+            return row[0] if row else None
+
+
+def latest_manifest(model_type: str) -> dict:
+    """Manifest of the newest registered version of model_type, or None if it was never trained."""
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT manifest FROM public.model_artifacts WHERE model_type = %s ORDER BY version DESC LIMIT 1",
+                [model_type]
+            )
+            row = cursor.fetchone()
+            return row[0] if row else None
+
+
+def list_models(model_type: str = None) -> list:
+    """Manifests of every registered version, newest first, flagging each type's latest."""
+    query = """
+        SELECT manifest, version = MAX(version) OVER (PARTITION BY model_type) AS latest
+        FROM public.model_artifacts
+        WHERE %s::text IS NULL OR model_type = %s
+        ORDER BY model_type, version DESC
+    """
+    with get_connection() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(query, [model_type, model_type])
+            return [{**row["manifest"], "latest": row["latest"]} for row in cursor.fetchall()]
+
+
+@functools.lru_cache(maxsize=MODEL_REGISTRY_CACHE_SIZE)
+def _load(model_type: str, version: int) -> dict:
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT manifest, archive FROM public.model_artifacts WHERE model_type = %s AND version = %s",
+                [model_type, version]
+            )
+            row = cursor.fetchone()
+    if row is None:
+        raise LookupError(f"{model_type} v{version} is not registered")
+
+    manifest, archive = row
+    # Every model reads its files in full, so they are not needed once loaded
+    with tempfile.TemporaryDirectory(prefix="lucent-model-") as directory:
+        _unpack(bytes(archive), directory)
+        artifacts = model_class(model_type).load_model(directory, manifest)
+
+    logger.info(f"Loaded {model_type} v{version} from the registry")
+    return {"manifest": manifest, **artifacts}
+
+
+def load(model_type: str, version: int = None) -> dict:
+    """Load a registered artifact, the latest when no version is given.
+
+    Returns:
+        The manifest under "manifest" alongside the objects the model's load_model returns
+
+    Raises:
+        LookupError: If model_type has no such version
+    """
+    if version is None:
+        version = latest_version(model_type)
+        if version is None:
+            raise LookupError(f"No trained {model_type} is registered")
+    return _load(model_type, int(version))
@@ -0,0 +1,260 @@
+"""Memoized model runs.
+
+A run is keyed on its model type, canonical config, feature snapshot version
+and code version, and public.model_runs maps each key to the
+public.model_results row the run saved. Training the same model on the same
+data with the same code returns that row instead of running again, unless the
+caller forces a fresh run.
+
+Identical runs are coalesced: within a process the first caller computes and
+the others wait on its future, and across processes the computing caller
+holds a Postgres advisory lock on the key, so a caller on another node waits
+for the lock and then finds the stored run.
+
+execute() runs a model end to end under a claim. The API routes and the job
+workers all go through it.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Generator
+from psycopg2.extras import Json, RealDictCursor
+
+from src.ml import registry, snapshot
+from src.ml.BaseModel import BaseModel, model_class, model_factory
+from src.ml.helpers import save_ml_results
+from src.ml.progress import ProgressTracker
+from src.utils.database import get_connection, get_direct_connection
+from src.utils.logging import setup
+
+logger = setup()
+
+RUN_CACHE = os.getenv('RUN_CACHE', 'true').lower() == 'true'
+
+SOURCE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_pending = {}
+_pending_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def code_version() -> str:
+    """Digest of the server's Python sources as loaded by this process.
+
+    Unlike the git revision it is available in containers and covers uncommitted changes.
+    """
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(SOURCE_DIR):
+        dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+        for name in sorted(f for f in files if f.endswith('.py')):
+            path = os.path.join(root, name)
+            digest.update(os.path.relpath(path, SOURCE_DIR).encode())
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def canonical(config) -> str:
+    """Config as JSON with sorted keys and no whitespace, so equal configs give equal keys."""
+    return json.dumps(config, sort_keys=True, separators=(',', ':'), default=str)
+
+
+def run_key(model_type: str, config: dict, data_version: int, version: str) -> str:
+    payload = canonical([model_type, config, data_version, version])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def lookup(key: str) -> dict:
+    """The stored run for key with its results, or None."""
+    query = """
+        SELECT m.result_id, r.results, m.created_at
+        FROM public.model_runs m
+        JOIN public.model_results r ON r.id = m.result_id
+        WHERE m.run_key = %s
+    """
+    # From the primary, which a run on another node may have just written to
+    with get_connection() as conn:
+        with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(query, [key])
+            row = cursor.fetchone()
+            return dict(row) if row else None
+
+
+def stored_run(model_type: str, key: str) -> dict:
+    """The stored run for key as a hit, or None when there is none or the model it trained is gone.
+
+    For a model type that registers artifacts the run is only reused while the
+    latest registered version is the one it trained, which scoring and
+    incremental runs load. Otherwise it runs again and registers its model.
+    """
+    stored = lookup(key)
+    if stored is None:
+        return None
+
+    model_version = None
+    if model_class(model_type).save_model is not BaseModel.save_model:
+        manifest = registry.latest_manifest(model_type)
+        if manifest is None or manifest.get("run_key") != key:
+            logger.info(f"Stored {model_type} run {key[:12]} is not the latest registered model, running it again")
+            return None
+        model_version = manifest["version"]
+
+    return {"result_id": stored["result_id"], "results": stored["results"], "model_version": model_version, "cached": True}
+
+
+def _lock_id(key: str) -> int:
+    return int.from_bytes(bytes.fromhex(key[:16]), 'big', signed=True)
+
+
+class Claim:
+    """A caller's claim on a run. hit is the stored run to return, or None when the caller must run the model."""
+
+    def __init__(self, model_type: str, key: str, config: dict, data_version: int, hit: dict = None) -> None:
+        self.model_type = model_type
+        self.key = key
+        self.config = config
+        self.data_version = data_version
+        self.hit = hit
+        self.run = hit
+
+    def store(self, result_id: int, results: dict, model_version: int = None):
+        """Record the results the caller's run saved and the model version it registered, for identical runs to return."""
+        self.run = {"result_id": result_id, "results": results, "model_version": model_version, "cached": False}
+        if self.key is None or result_id is None:
+            return
+
+        query = """
+            INSERT INTO public.model_runs (run_key, model_type, config, data_version, code_version, result_id)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON CONFLICT (run_key) DO UPDATE
+            SET result_id = EXCLUDED.result_id, created_at = CURRENT_TIMESTAMP
+        """
+        try:
+            with get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(query, [
+                        self.key, self.model_type, Json(self.config, dumps=canonical),
+                        self.data_version, code_version(), result_id
+                    ])
+        except Exception as e:
+            logger.warning(f"Failed to record {self.model_type} run {self.key[:12]}: {e}")
+
+
+@contextmanager
+def claim(model_type: str, force: bool = False):
+    """Claim the run of model_type with its current config on the current data.
+
+    Yields a Claim whose hit is the stored run when there is one. Otherwise the
+    caller runs the model, saves its results and calls Claim.store, while
+    identical runs wait for it. force skips stored runs, though it still waits
+    for an identical run in progress and takes its fresh results.
+    """
+    config = model_class(model_type).run_config()
+    # From the primary, so a lagging replica never keys a run on data that has since changed
+    data_version = snapshot.current_version(primary=True)
+    if not RUN_CACHE or config is None:
+        yield Claim(model_type, None, config, data_version)
+        return
+
+    key = run_key(model_type, config, data_version, code_version())
+
+    if not force:
+        stored = stored_run(model_type, key)
+        if stored is not None:
+            logger.info(f"Reusing {model_type} run {key[:12]} (results {stored['result_id']})")
+            yield Claim(model_type, key, config, data_version, stored)
+            return
+
+    # Wait for an identical run in this process, or become the one that runs
+    while True:
+        with _pending_lock:
+            future = _pending.get(key)
+            if future is None:
+                future = _pending[key] = Future()
+                break
+        run = future.result()
+        if run is not None and not (force and run["cached"]):
+            logger.info(f"Coalesced {model_type} run {key[:12]} with the one in progress")
+            yield Claim(model_type, key, config, data_version, {**run, "cached": True})
+            return
+
+    conn = None
+    current = None
+    try:
+        # Wait for an identical run on another process or node
+        conn = get_direct_connection()
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_lock(%s)", [_lock_id(key)])
+
+        current = Claim(model_type, key, config, data_version, None if force else stored_run(model_type, key))
+        yield current
+
+    finally:
+        # Waiters retry on their own when the run failed
+        with _pending_lock:
+            _pending.pop(key, None)
+        future.set_result(current.run if current is not None else None)
+        if conn is not None:
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT pg_advisory_unlock(%s)", [_lock_id(key)])
+            finally:
+                conn.close()
+
+
+def execute(model_type: str, model_name: str, tracker: ProgressTracker, force: bool = False) -> Generator[dict, None, None]:
+    """Run model_type, or reuse an identical stored run, yielding its progress events timed by tracker.
+
+    The last event is the completed "results" step, with the result_id,
+    model_version, whether the results were cached and the results themselves.
+    Closing the generator early stops the model and releases the claim.
+
+    Raises:
+        ValueError: If model_type is unknown
+        RuntimeError: If the results could not be saved
+    """
+    with claim(model_type, force) as current:
+        if current.hit is not None:
+            yield tracker.event({
+                'step': 'results',
+                'status': 'completed',
+                'message': f'{model_name} results reused',
+                'result_id': current.hit['result_id'],
+                'model_version': current.hit['model_version'],
+                'cached': True,
+                'results': current.hit['results']
+            })
+            return
+
+        model = model_factory(model_type)
+        if model is None:
+            raise ValueError(f"Unknown model type: {model_type}")
+
+        events = model.invoke()
+        if events is not None:
+            yield from tracker.track(events)
+
+        yield tracker.event({'step': 'results', 'status': 'running', 'message': 'Saving results'})
+        results = model.get_results()
+        result_id = save_ml_results(model_name, results)
+        if result_id is None:
+            raise RuntimeError("Failed to save model results")
+        manifest = registry.register(model, current.data_version, code_version(), current.key)
+        current.store(result_id, results, manifest['version'] if manifest else None)
+
+        yield tracker.event({
+            'step': 'results',
+            'status': 'completed',
+            'message': f'{model_name} complete',
+            'result_id': result_id,
+            'model_version': manifest['version'] if manifest else None,
+            'cached': False,
+            'timings': tracker.timings(),
+            'results': results
+        })
@@ -0,0 +1,200 @@
+"""Score mines with registered models without retraining.
+
+Every model scores a whole batch at once: the tier-score formula for the GA,
+scaler and KMeans.predict for clusters, and one forward pass for the ranker.
+Mine features come from the shared feature snapshot and the ranker's shaft
+features from one query against its data source.
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from psycopg2 import sql
+
+from src.ml import registry, snapshot
+from src.utils.database import get_connection
+from src.utils.logging import setup
+
+logger = setup()
+
+
+def get_mines(mine_ids: list = None, columns: list = None) -> pd.DataFrame:
+    """Mines from the feature snapshot, all of them when mine_ids is None."""
+    table = snapshot.load_features()
+    if mine_ids is not None:
+        table = table.filter(pc.is_in(table['mine_id'], value_set=pa.array([str(m) for m in mine_ids])))
+    if columns is not None:
+        table = table.select(['mine_id', 'mine_name'] + [col for col in columns if col not in ('mine_id', 'mine_name')])
+    return table.to_pandas()
+
+
+def get_shafts(data_source: str, features: list, mine_ids: list = None) -> pd.DataFrame:
+    """Shaft features for the ranker in one query, for all mines when mine_ids is None."""
+    query = sql.SQL("""
+        SELECT mine_id::text AS mine_id, shaft_id::text AS shaft_id, {features}
+        FROM {source}
+        WHERE %s::uuid[] IS NULL OR mine_id = ANY(%s::uuid[])
+    """).format(
+        features=sql.SQL(", ").join(sql.Identifier(feature) for feature in features),
+        source=sql.Identifier(*data_source.split("."))
+    )
+
+    with get_connection(readonly=True) as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(query, [mine_ids, mine_ids])
+            columns = [desc[0] for desc in cursor.description]
+            return pd.DataFrame(cursor.fetchall(), columns=columns)
+
+
+def feature_matrix(df: pd.DataFrame, features: list, fill_values: dict = None) -> np.ndarray:
+    """Numeric float32 matrix of features, filling missing values from fill_values or with 0."""
+    fill_values = fill_values or {}
+    columns = [
+        pd.to_numeric(df[feature], errors='coerce').astype('float64').fillna(fill_values.get(feature, 0.0))
+        for feature in features
+    ]
+    if not columns:
+        return np.empty((len(df), 0), dtype=np.float32)
+    return np.column_stack(columns).astype(np.float32)
+
+
+def top_k(scores: np.ndarray, keys: np.ndarray, k: int = None) -> np.ndarray:
+    """Positions of the k highest scores, best first, or of every score when k is None.
+
+    Ties are ordered by key so the ranking is stable between calls. Only the
+    candidates at or above the k-th score are sorted, found with a partition.
+    """
+    scores = np.where(np.isnan(scores), -np.inf, np.asarray(scores, dtype=np.float64))
+    n = len(scores)
+
+    if k is not None and k < n:
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+        threshold = np.partition(scores, n - k)[n - k]
+        candidates = np.flatnonzero(scores >= threshold)
+    else:
+        candidates = np.arange(n)
+
+    order = np.lexsort((np.asarray(keys)[candidates], -scores[candidates]))
+    return candidates[order][:k]
+
+
+def best_shafts(shafts: pd.DataFrame, scores: np.ndarray) -> pd.DataFrame:
+    """Each mine's highest scoring shaft, as the mine's score."""
+    shafts = shafts.assign(score=scores)
+    if shafts.empty:
+        return shafts.rename(columns={"shaft_id": "best_shaft_id"})
+
+    best = shafts.loc[shafts.groupby("mine_id")["score"].idxmax()]
+    return best.rename(columns={"shaft_id": "best_shaft_id"}).reset_index(drop=True)
+
+
+def with_mine_names(df: pd.DataFrame) -> pd.DataFrame:
+    """Add mine_name from the feature snapshot after mine_id."""
+    names = get_mines(df["mine_id"].tolist(), columns=[])
+    df = df.merge(names, on="mine_id", how="left")
+    return df[["mine_id", "mine_name"] + [col for col in df.columns if col not in ("mine_id", "mine_name")]]
+
+
+def score_ranker(artifacts: dict, mine_ids: list = None) -> pd.DataFrame:
+    """Score every shaft in one forward pass and rank each mine by its best shaft."""
+    config = artifacts["manifest"]["config"]
+    features = artifacts["features"]
+    shafts = get_shafts(config["data_source"], features, mine_ids)
+
+    scores = artifacts["model"].predict(feature_matrix(shafts, features))
+    best = best_shafts(shafts, scores)
+    return with_mine_names(best)[["mine_id", "mine_name", "score", "best_shaft_id"] + features]
+
+
+def score_clusters(artifacts: dict, mine_ids: list = None) -> pd.DataFrame:
+    """Assign mines to the saved clusters, with their distance to the cluster centre."""
+    features = artifacts["features"]
+    mines = get_mines(mine_ids, columns=features)
+
+    # The scaler was fitted on a frame, so keep the feature names
+    x = pd.DataFrame(feature_matrix(mines, features, artifacts["fill_values"]), columns=features, dtype=np.float64)
+    x = artifacts["scaler"].transform(x)
+    distances = artifacts["kmeans"].transform(x) if len(mines) else np.empty((0, artifacts["kmeans"].n_clusters))
+
+    mines["cluster"] = distances.argmin(axis=1)
+    mines["distance"] = distances.min(axis=1)
+    return mines[["mine_id", "mine_name", "cluster", "distance"] + features]
+
+
+def score_genetic(artifacts: dict, mine_ids: list = None) -> pd.DataFrame:
+    """Score mines with the saved tier weights, on the scale of the mines the model was trained on."""
+    from src.ml.models.deap import SCORING_INPUTS, EvolutionaryModel
+
+    model = EvolutionaryModel.from_artifacts(artifacts)
+    model.mines_data = get_mines(mine_ids, columns=SCORING_INPUTS)
+    scored = model.calculate_tier_scores()
+
+    scored["score"] = scored["overall_fitness"]
+    scored["in_best_individual"] = scored["mine_id"].isin(artifacts["best_individual"])
+    tiers = [f"T{i}_score" for i in range(1, 6)]
+    return scored[["mine_id", "mine_name", "score", "in_best_individual"] + tiers]
+
+
+SCORERS = {
+    "linear_model": score_ranker,
+    "clustering_algorithm": score_clusters,
+    "genetic_algorithm": score_genetic,
+}
+
+
+def score(model_type: str, version: int = None, mine_ids: list = None, offset: int = 0, limit: int = None) -> tuple:
+    """Score mines with a registered model, the latest version when none is given.
+
+    Results are sorted best first: by score, or by cluster then distance to its centre,
+    with ties broken by mine_id so pages are stable. Only the requested page is sorted
+    when scoring by score.
+
+    Returns:
+        The page of scored mines, the number of mines scored and the manifest of the model version used
+
+    Raises:
+        LookupError: If there is no such registered model
+    """
+    if model_type not in SCORERS:
+        raise LookupError(f"Unknown model type: {model_type}")
+
+    artifacts = registry.load(model_type, version)
+    scored = SCORERS[model_type](artifacts, mine_ids)
+
+    if "score" in scored.columns:
+        order = top_k(scored["score"].to_numpy(), scored["mine_id"].to_numpy(), None if limit is None else offset + limit)
+    else:
+        order = np.lexsort((scored["mine_id"].to_numpy(), scored["distance"].to_numpy(), scored["cluster"].to_numpy()))
+    end = None if limit is None else offset + limit
+    page = scored.iloc[order[offset:end]].reset_index(drop=True)
+
+    logger.info(f"Scored {len(scored)} mines with {model_type} v{artifacts['manifest']['version']}")
+    return page, len(scored), artifacts["manifest"]
+
+
+def cluster_members(cluster: int, version: int = None, offset: int = 0, limit: int = None) -> tuple:
+    """Mines of one cluster of a registered clustering model, closest to its centre first.
+
+    Every mine is assigned to the saved clusters, as scoring does, with ties
+    broken by mine_id so pages are stable.
+
+    Returns:
+        The page of members, the number of mines in the cluster and the manifest of the model version used
+
+    Raises:
+        LookupError: If there is no such registered model or cluster
+    """
+    artifacts = registry.load("clustering_algorithm", version)
+    n_clusters = artifacts["kmeans"].n_clusters
+    if not 0 <= cluster < n_clusters:
+        raise LookupError(f"clustering_algorithm v{artifacts['manifest']['version']} has no cluster {cluster}, "
+                          f"only 0 to {n_clusters - 1}")
+
+    scored = score_clusters(artifacts)
+    members = scored[scored["cluster"] == cluster]
+    order = np.lexsort((members["mine_id"].to_numpy(), members["distance"].to_numpy()))
+    end = None if limit is None else offset + limit
+    page = members.iloc[order[offset:end]].reset_index(drop=True)
+    return page, len(members), artifacts["manifest"]
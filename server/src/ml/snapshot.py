@@ -0,0 +1,155 @@
+"""Feature snapshots shared by every process on a node.
+
+The mine feature matrix is built from the t0..t5 analytics join once per data
+version and written as an uncompressed Arrow IPC file. Readers memory-map the
+file, so the table is shared zero-copy between model runs and API workers
+instead of each re-running the join.
+
+The data version is the "*" row of public.data_versions, which writers and the
+seed's post-seed step bump. A new version is built by the first reader to need
+it, under a file lock so concurrent readers wait for one build rather than
+racing. Files are written to a temporary name and renamed into place, so
+readers never see a partial snapshot, and old versions stay valid for readers
+that still have them mapped after they are pruned.
+"""
+
+import os
+import glob
+import fcntl
+import tempfile
+import threading
+from decimal import Decimal
+
+import pandas as pd
+import pyarrow as pa
+
+from src.utils.database import get_connection
+from src.utils.logging import setup
+
+logger = setup()
+
+SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR', os.path.join(tempfile.gettempdir(), 'lucent-snapshots'))
+SNAPSHOT_KEEP = int(os.getenv('SNAPSHOT_KEEP', 2))
+
+FEATURES = "features"
+
+_loaded = {}
+_loaded_lock = threading.Lock()
+
+
+def _data_version(cursor) -> int:
+    cursor.execute("SELECT version FROM public.data_versions WHERE scope = '*'")
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def current_version(primary: bool = False) -> int:
+    """Latest data version recorded in the database, read from the primary when primary is set.
+
+    A read replica may lag behind the version a writer has just committed.
+    """
+    with get_connection(readonly=not primary) as conn:
+        with conn.cursor() as cursor:
+            return _data_version(cursor)
+
+
+def _path(name: str, version: int) -> str:
+    return os.path.join(SNAPSHOT_DIR, f"{name}-v{version}.arrow")
+
+
+def _versions(name: str) -> list:
+    paths = glob.glob(os.path.join(SNAPSHOT_DIR, f"{name}-v*.arrow"))
+    return sorted(int(os.path.basename(path)[len(name) + 2:-len(".arrow")]) for path in paths)
+
+
+def _to_arrow(df: pd.DataFrame) -> pa.Table:
+    """Convert query results to Arrow, storing NUMERIC columns as float64 rather than decimals."""
+    for col in df.columns:
+        if df[col].dtype == object:
+            first = df[col].dropna().head(1)
+            if len(first) and isinstance(first.iloc[0], Decimal):
+                df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _write(table: pa.Table, path: str):
+    fd, tmp_path = tempfile.mkstemp(dir=SNAPSHOT_DIR, prefix=".build-", suffix=".arrow")
+    os.close(fd)
+    try:
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+def _prune(name: str):
+    """Remove all but the newest SNAPSHOT_KEEP versions. Mapped files stay readable after unlinking."""
+    for version in _versions(name)[:-SNAPSHOT_KEEP]:
+        try:
+            os.unlink(_path(name, version))
+        except FileNotFoundError:
+            pass
+
+
+def _read(path: str) -> pa.Table:
+    return pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+
+
+def _build(name: str, query: str) -> int:
+    """Run query and write its snapshot. Returns the data version the snapshot reflects."""
+    with get_connection(readonly=True) as conn:
+        # Read the version and the data from the same snapshot of the database
+        with conn.cursor() as cursor:
+            cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+            version = _data_version(cursor)
+        df = pd.read_sql_query(query, conn)
+
+    _write(_to_arrow(df), _path(name, version))
+    _prune(name)
+    logger.info(f"Built {name} snapshot v{version} with {len(df)} rows")
+    return version
+
+
+def load(name: str, query: str) -> pa.Table:
+    """Get the memory-mapped snapshot of query for the current data version, building it if needed."""
+    version = current_version()
+
+    with _loaded_lock:
+        loaded = _loaded.get(name)
+    if loaded is not None and loaded[0] == version:
+        return loaded[1]
+
+    path = _path(name, version)
+    if not os.path.exists(path):
+        os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+        with open(os.path.join(SNAPSHOT_DIR, f"{name}.lock"), 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                # Another process may have built it while we waited for the lock
+                if not os.path.exists(path):
+                    version = _build(name, query)
+                    path = _path(name, version)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    table = _read(path)
+    with _loaded_lock:
+        _loaded[name] = (version, table)
+    return table
+
+
+def loaded_version(name: str = FEATURES):
+    """Data version of the snapshot this process loaded most recently, or None."""
+    with _loaded_lock:
+        loaded = _loaded.get(name)
+    return loaded[0] if loaded is not None else None
+
+
+def load_features() -> pa.Table:
+    """Get the mine feature matrix used by every model."""
+    # Imported here as helpers imports this module
+    from src.ml.helpers import get_features
+    return load(FEATURES, get_features())
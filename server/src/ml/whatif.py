@@ -0,0 +1,199 @@
+"""Re-score every mine with user-supplied tier-score weights.
+
+The tier scores are linear in the normalized features, clipped per tier, so a
+scoring config reduces to a (features x tiers) weight matrix. The normalized
+features of every mine are built once per data version and cached; a what-if
+is then one matrix product over that matrix, the tier clip and one
+matrix-vector product with the tier weights. Country and status scores are
+looked up from each mine's cached country and status codes, so overriding
+them never touches the feature matrix. Rank changes are against the default
+config, whose scores and ranks are cached with the features.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.ml import fitness, scoring
+from src.utils import cache
+from src.utils.logging import setup
+
+logger = setup()
+
+WHATIF_CACHE_TTL = float(os.getenv('WHATIF_CACHE_TTL', 3600))
+
+whatif_cache = cache.Cache('whatif', ttl=WHATIF_CACHE_TTL, max_entries=2)
+
+TIERS = ['T1', 'T2', 'T3', 'T4', 'T5']
+
+# Normalized features scored from a mapping of each mine's raw string
+MAPPED_FEATURES = {'country_score_norm': 'country', 'status_score_norm': 'status'}
+
+
+class FeatureMatrix:
+    """Normalized features of every mine with the default config's scores and ranks."""
+
+    def __init__(self, mines: pd.DataFrame, features: list, defaults: dict) -> None:
+        self.mine_ids = mines['mine_id'].to_numpy()
+        self.mine_names = mines['mine_name'].to_numpy()
+        self.features = features
+        self.index = {feature: i for i, feature in enumerate(features)}
+        self.required = mines['has_required_data'].to_numpy(dtype=np.float64)
+
+        # Mapped columns stay zero here and are added per config from the codes
+        self.x = np.zeros((len(mines), len(features)))
+        for feature in features:
+            if feature not in MAPPED_FEATURES:
+                self.x[:, self.index[feature]] = mines[feature].to_numpy(dtype=np.float64)
+
+        # Upper-cased as EvolutionaryModel._score_strings maps them
+        self.codes, self.values = {}, {}
+        for feature, column in MAPPED_FEATURES.items():
+            self.codes[feature], self.values[feature] = pd.factorize(mines[column].astype(str).str.upper())
+
+        self.defaults = defaults
+        self.default_scores = self.score(defaults)
+        self.default_ranks = ranks(self.default_scores, self.mine_ids)
+
+    def mapped(self, feature: str, config: dict) -> np.ndarray:
+        """A mapped feature of every mine under config's country or status scores."""
+        mapping = config[MAPPED_FEATURES[feature] + '_scores']
+        lookup = np.array([mapping.get(value, 0.0) for value in self.values[feature]])
+        return lookup[self.codes[feature]]
+
+    def score(self, config: dict) -> np.ndarray:
+        """Overall fitness of every mine under config."""
+        weights = np.zeros((len(self.features), len(TIERS)))
+        for t, tier in enumerate(TIERS):
+            for feature, weight in config['scoring_config'].get(tier, {}).items():
+                weights[self.index[feature], t] = weight
+
+        tiers = self.x @ weights
+        for feature in MAPPED_FEATURES:
+            mapped = weights[self.index[feature]]
+            if mapped.any():
+                tiers += np.outer(self.mapped(feature, config), mapped)
+
+        tier_weights = np.array([config['tier_weights'].get(tier, 0.0) for tier in TIERS])
+        return (np.clip(tiers, 0, 1) @ tier_weights) * self.required
+
+
+def ranks(scores: np.ndarray, mine_ids: np.ndarray) -> np.ndarray:
+    """1-based rank of every mine, ties broken by mine_id as scoring.top_k does."""
+    order = scoring.top_k(scores, mine_ids)
+    ranked = np.empty(len(scores), dtype=np.int64)
+    ranked[order] = np.arange(1, len(scores) + 1)
+    return ranked
+
+
+def default_config() -> dict:
+    from src.ml.models.deap import COUNTRY_SCORES, SCORING_CONFIG, STATUS_SCORES, TIER_WEIGHTS
+
+    return {
+        "tier_weights": TIER_WEIGHTS,
+        "scoring_config": SCORING_CONFIG,
+        "country_scores": COUNTRY_SCORES,
+        "status_scores": STATUS_SCORES
+    }
+
+
+def _build() -> FeatureMatrix:
+    from src.ml.models.deap import SCORING_INPUTS, EvolutionaryModel
+
+    model = EvolutionaryModel()
+    model.mines_data = scoring.get_mines(columns=SCORING_INPUTS)
+    mines = model.calculate_tier_scores()
+
+    features = [col for col in fitness.FITNESS_COLUMNS if col.endswith('_norm')]
+    matrix = FeatureMatrix(mines, features, default_config())
+    logger.info(f"Built what-if feature matrix for {len(mines)} mines")
+    return matrix
+
+
+def feature_matrix() -> FeatureMatrix:
+    """The cached feature matrix of the current data version. Treat it as read-only."""
+    return whatif_cache.get_or_set(cache.data_version(), _build, tables=("*",))
+
+
+def _weights(overrides, defaults: dict, name: str, keys=None) -> dict:
+    """defaults updated with the numeric overrides, which must be a dict of known keys."""
+    if overrides is None:
+        return dict(defaults)
+    if not isinstance(overrides, dict):
+        raise ValueError(f"{name} must be an object")
+
+    merged = dict(defaults)
+    for key, weight in overrides.items():
+        if keys is not None and key not in keys:
+            raise ValueError(f"Unknown {name} key: {key}")
+        if isinstance(weight, bool) or not isinstance(weight, (int, float)) or not np.isfinite(weight):
+            raise ValueError(f"{name}.{key} must be a number")
+        merged[key] = float(weight)
+    return merged
+
+
+def apply_overrides(defaults: dict, features: list, overrides: dict) -> dict:
+    """The default config with overrides merged in.
+
+    tier_weights replace single tier weights, scoring_config single feature
+    weights within a tier, and country_scores and status_scores single entries
+    (matched upper-cased).
+
+    Raises:
+        ValueError: If an override is not a number or names an unknown tier or feature
+    """
+    scoring_config = overrides.get('scoring_config')
+    if scoring_config is not None and not isinstance(scoring_config, dict):
+        raise ValueError("scoring_config must be an object")
+    unknown = set(scoring_config or {}) - set(TIERS)
+    if unknown:
+        raise ValueError(f"Unknown scoring_config tier: {sorted(unknown)[0]}")
+
+    def upper(mapping):
+        return {str(key).upper(): value for key, value in mapping.items()} if isinstance(mapping, dict) else mapping
+
+    return {
+        "tier_weights": _weights(overrides.get('tier_weights'), defaults['tier_weights'], 'tier_weights', TIERS),
+        "scoring_config": {
+            tier: _weights((scoring_config or {}).get(tier), defaults['scoring_config'].get(tier, {}),
+                           f'scoring_config.{tier}', features)
+            for tier in TIERS
+        },
+        "country_scores": _weights(upper(overrides.get('country_scores')), defaults['country_scores'], 'country_scores'),
+        "status_scores": _weights(upper(overrides.get('status_scores')), defaults['status_scores'], 'status_scores')
+    }
+
+
+def rescore(overrides: dict, top_n: int = 100) -> dict:
+    """Top top_n mines under the default config with overrides, and how far each moved.
+
+    rank_delta is the default rank minus the new rank, so mines that climbed are positive.
+    """
+    matrix = feature_matrix()
+    config = apply_overrides(matrix.defaults, matrix.features, overrides)
+
+    scores = matrix.score(config)
+    # top_k orders the whole page, so positions are the new ranks
+    order = scoring.top_k(scores, matrix.mine_ids, top_n)
+    default_ranks = matrix.default_ranks[order]
+
+    data = [
+        {
+            "mine_id": matrix.mine_ids[i],
+            "mine_name": matrix.mine_names[i],
+            "score": float(scores[i]),
+            "default_score": float(matrix.default_scores[i]),
+            "rank": int(rank),
+            "default_rank": int(default_rank),
+            "rank_delta": int(default_rank - rank)
+        }
+        for rank, (i, default_rank) in enumerate(zip(order, default_ranks), start=1)
+    ]
+
+    return {
+        "config": config,
+        "data": data,
+        "total_rows": len(scores),
+        "changed_mines": int(np.count_nonzero(scores != matrix.default_scores))
+    }
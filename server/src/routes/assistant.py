@@ -2,15 +2,25 @@
 
 import json
 from flask import Blueprint, jsonify, request, Response, stream_with_context
-from langchain_core.messages import HumanMessage, AIMessage
-from src.ai.agent import LucentBot
+from src.utils.admission import ANALYTICS, admit
 
 bp = Blueprint('chat', __name__, url_prefix='/api/v1')
-lucent_bot = LucentBot.with_tools()
+
+
+def get_bot():
+    """Get the shared Lucent Bot, building it on first use.
+
+    The agent pulls in the LangChain stack, reflects the data_clean schema and
+    creates the vector store engine, so it is not built at import time.
+    """
+    from src.ai.agent import LucentBot
+    return LucentBot.with_tools()
 
 
 def convert_history_to_langchain_messages(conversation_history):
     """Convert frontend message format to LangChain message objects."""
+    from langchain_core.messages import HumanMessage, AIMessage
+
     langchain_messages = []
 
     for msg in conversation_history:
@@ -26,6 +36,7 @@ def convert_history_to_langchain_messages(conversation_history):
 
 
 @bp.route('/chat', methods=['POST'])
+@admit(ANALYTICS)
 def chat():
     """Chat with Lucent Bot using streaming."""
     data = request.get_json()
@@ -37,6 +48,13 @@ def chat():
     if not message:
         return jsonify({"error": "Message cannot be empty"}), 400
 
+    try:
+        lucent_bot = get_bot()
+    except Exception as e:
+        return jsonify({"error": f"Assistant is unavailable: {str(e)}"}), 503
+
+    from langchain_core.messages import HumanMessage
+
     # Get conversation history from request
     conversation_history = data.get('conversation_history', [])
 
@@ -1,11 +1,36 @@
 from flask import Blueprint, jsonify, request
 from psycopg2.extras import RealDictCursor
+from src.utils import cache, sql
+from src.utils.admission import ANALYTICS, INTERACTIVE, admit
 from src.utils.database import get_connection
 
 bp = Blueprint('data', __name__, url_prefix='/api/v1')
 
+# Catalog entries only change with DDL, which arrives as a "*" data change
+catalog_cache = cache.Cache('catalog')
+counts_cache = cache.Cache('counts')
+
+
+def _fetch_one(cursor, query, params=None):
+    cursor.execute(query, params)
+    row = cursor.fetchone()
+    return dict(row) if row else None
+
+
+def _fetch_column(cursor, query, column, params=None):
+    cursor.execute(query, params)
+    return [row[column] for row in cursor.fetchall()]
+
+
+def _table_scopes(schema_name, table_name, table_type):
+    # Views can read from any table, so any change invalidates them
+    if table_type == 'VIEW':
+        return ('*',)
+    return (f'{schema_name}.{table_name}',)
+
 # Route 2: Get table metadata and data
 @bp.route('/schemas/<schema_name>/tables/<table_name>', methods=['GET'])
+@admit(INTERACTIVE)
 def get_table_info_and_data(schema_name, table_name):
     """Get metadata and data for a specific table."""
     try:
@@ -47,29 +72,31 @@ def get_table_info_and_data(schema_name, table_name):
         if offset > 0:
             data_query += f' OFFSET {offset}'
 
-        with get_connection() as conn:
+        with get_connection(readonly=True) as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cursor:
                 # Get table metadata
-                cursor.execute(metadata_query, [schema_name, table_name, schema_name, table_name])
-                metadata = cursor.fetchone()
+                metadata = catalog_cache.get_or_set(
+                    ('metadata', schema_name, table_name),
+                    lambda: _fetch_one(cursor, metadata_query, [schema_name, table_name, schema_name, table_name])
+                )
 
                 if not metadata:
                     return jsonify({"message": f"Table {schema_name}.{table_name} not found"}), 404
 
-                # Get row count
-                cursor.execute(row_count_query)
-                row_count_result = cursor.fetchone()
+                # Get row count, also the total for pagination
+                row_count_result = counts_cache.get_or_set(
+                    ('table', schema_name, table_name),
+                    lambda: _fetch_one(cursor, row_count_query),
+                    tables=_table_scopes(schema_name, table_name, metadata['table_type'])
+                )
                 row_count = row_count_result['row_count'] if row_count_result else 0
+                total_rows = row_count
 
                 # Get data
                 cursor.execute(data_query)
                 rows = cursor.fetchall()
                 result_data = [dict(row) for row in rows]
 
-                # Get total row count for pagination
-                cursor.execute(row_count_query)
-                total_rows = cursor.fetchone()['row_count']
-
                 result = {
                     "table_name": metadata['table_name'],
                     "table_type": metadata['table_type'],
@@ -90,6 +117,7 @@ def get_table_info_and_data(schema_name, table_name):
 
 # Route 3: Query one specific row
 @bp.route('/schemas/<schema_name>/tables/<table_name>/row', methods=['GET'])
+@admit(INTERACTIVE)
 def query_one_row(schema_name, table_name):
     """Query one specific row by id_key and id_value."""
     try:
@@ -115,7 +143,7 @@ def query_one_row(schema_name, table_name):
         query = f'SELECT {columns} FROM "{schema_name}"."{table_name}" WHERE "{id_key}" = %s'
 
         # Execute query
-        with get_connection() as conn:
+        with get_connection(readonly=True) as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cursor:
                 cursor.execute(query, [id_value])
                 row = cursor.fetchone()
@@ -135,6 +163,7 @@ def query_one_row(schema_name, table_name):
 
 # Route 4: Update one specific row
 @bp.route('/schemas/<schema_name>/tables/<table_name>/row', methods=['PUT'])
+@admit(INTERACTIVE)
 def update_one_row(schema_name, table_name):
     """Update one specific row by id_key and id_value."""
     try:
@@ -161,7 +190,11 @@ def update_one_row(schema_name, table_name):
             with conn.cursor() as cursor:
                 cursor.execute(query, params)
                 rows_affected = cursor.rowcount
+                if rows_affected:
+                    version = cache.notify_data_changed(conn, f'{schema_name}.{table_name}')
                 conn.commit()
+                if rows_affected:
+                    cache.data_changed(f'{schema_name}.{table_name}', version)
 
                 if rows_affected == 0:
                     return jsonify({
@@ -182,6 +215,7 @@ def update_one_row(schema_name, table_name):
 
 # Route 5: Execute raw SQL query
 @bp.route('/query', methods=['POST'])
+@admit(ANALYTICS)
 def execute_raw_sql():
     """Execute a raw SQL query with optional pagination."""
     try:
@@ -198,7 +232,8 @@ def execute_raw_sql():
         limit = data.get('limit', 100)
         offset = data.get('offset', 0)
 
-        with get_connection() as conn:
+        # Statements that provably only read can be served by a replica
+        with get_connection(readonly=sql.is_read_only(sql_query)) as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cursor:
                 # For SELECT queries, we need to handle pagination
                 sql_upper = sql_query.upper().strip()
@@ -248,7 +283,10 @@ def execute_raw_sql():
                         }), 200
                     else:
                         # INSERT/UPDATE/DELETE query - commit and return affected rows
+                        # The statement may touch any table, or the catalog itself
+                        version = cache.notify_data_changed(conn, '*')
                         conn.commit()
+                        cache.data_changed('*', version)
                         return jsonify({
                             "data": None,
                             "rows_affected": cursor.rowcount,
@@ -260,6 +298,7 @@ def execute_raw_sql():
 
 # Route 6: Get all schemas and their tables
 @bp.route('/schemas/tables', methods=['GET'])
+@admit(INTERACTIVE)
 def get_schemas_tables():
     """Get all schemas and their tables."""
     try:
@@ -292,47 +331,52 @@ def get_schemas_tables():
             ORDER BY schema, table_name
         """
 
-        with get_connection() as conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                # Get all schemas first
-                cursor.execute(schemas_query)
-                schema_rows = cursor.fetchall()
-
-                # Initialize schemas dict with empty arrays
-                schemas_dict = {}
-                for row in schema_rows:
-                    schemas_dict[row['schema_name']] = []
-
-                # Get all tables and views and populate the schemas
-                cursor.execute(tables_views_query)
-                table_view_rows = cursor.fetchall()
-
-                for row in table_view_rows:
-                    schema_name = row['schema']
-                    table_name = row['table_name']
-                    object_type = row['object_type']
-
-                    if schema_name in schemas_dict:
-                        schemas_dict[schema_name].append({
-                            "name": table_name,
-                            "type": object_type
+        def load_schemas_tables():
+            with get_connection(readonly=True) as conn:
+                with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                    # Get all schemas first
+                    cursor.execute(schemas_query)
+                    schema_rows = cursor.fetchall()
+
+                    # Initialize schemas dict with empty arrays
+                    schemas_dict = {}
+                    for row in schema_rows:
+                        schemas_dict[row['schema_name']] = []
+
+                    # Get all tables and views and populate the schemas
+                    cursor.execute(tables_views_query)
+                    table_view_rows = cursor.fetchall()
+
+                    for row in table_view_rows:
+                        schema_name = row['schema']
+                        table_name = row['table_name']
+                        object_type = row['object_type']
+
+                        if schema_name in schemas_dict:
+                            schemas_dict[schema_name].append({
+                                "name": table_name,
+                                "type": object_type
+                            })
+
+                    # Convert to list format
+                    result = []
+                    for schema, tables in schemas_dict.items():
+                        result.append({
+                            "schema": schema,
+                            "tables": tables
                         })
 
-                # Convert to list format
-                result = []
-                for schema, tables in schemas_dict.items():
-                    result.append({
-                        "schema": schema,
-                        "tables": tables
-                    })
+                    return result
 
-                return jsonify(result), 200
+        result = catalog_cache.get_or_set('schemas_tables', load_schemas_tables)
+        return jsonify(result), 200
 
     except Exception as e:
         return jsonify({"message": f"Failed to get schemas and tables: {str(e)}"}), 400
 
 # Route 9: Get joined locations and spatial data with filtering
 @bp.route('/schemas/<schema_name>/locations-spatial', methods=['GET'])
+@admit(INTERACTIVE)
 def get_joined_locations_spatial(schema_name):
     """Get joined dim_locations and dim_spatial data with optional filtering."""
     try:
@@ -403,7 +447,7 @@ def get_joined_locations_spatial(schema_name):
         if where_conditions:
             count_query += " WHERE " + " AND ".join(where_conditions)
 
-        with get_connection() as conn:
+        with get_connection(readonly=True) as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cursor:
                 # Get rows
                 cursor.execute(query, params)
@@ -411,8 +455,11 @@ def get_joined_locations_spatial(schema_name):
                 result_data = [dict(row) for row in rows]
 
                 # Get total row count
-                cursor.execute(count_query, params)
-                total_rows = cursor.fetchone()['count']
+                total_rows = counts_cache.get_or_set(
+                    ('locations_spatial', schema_name, tuple(where_conditions), tuple(params)),
+                    lambda: _fetch_one(cursor, count_query, params)['count'],
+                    tables=(f'{schema_name}.dim_locations', f'{schema_name}.dim_spatial')
+                )
 
                 # Add metadata
                 metadata = {
@@ -438,6 +485,7 @@ def get_joined_locations_spatial(schema_name):
         return jsonify({"message": f"Failed to get joined locations and spatial data: {str(e)}"}), 400
 
 @bp.route('/evaluation-board/mines', methods=['GET'])
+@admit(INTERACTIVE)
 def get_evaluation_board_mines():
     """Get mines for evaluation board with status priority sorting.
 
@@ -490,7 +538,7 @@ def get_evaluation_board_mines():
         # Build count query
         count_query = 'SELECT COUNT(*) FROM "data_analytics"."mine_summary"'
 
-        with get_connection() as conn:
+        with get_connection(readonly=True) as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cursor:
                 # Get rows
                 cursor.execute(query)
@@ -498,8 +546,11 @@ def get_evaluation_board_mines():
                 result_data = [dict(row) for row in rows]
 
                 # Get total row count
-                cursor.execute(count_query)
-                total_rows = cursor.fetchone()['count']
+                total_rows = counts_cache.get_or_set(
+                    ('evaluation_board',),
+                    lambda: _fetch_one(cursor, count_query)['count'],
+                    tables=('*',)
+                )
 
                 result = {
                     "data": result_data,
@@ -516,6 +567,7 @@ def get_evaluation_board_mines():
 
 # Spatial routes
 @bp.route('/spatial/mines', methods=['GET'])
+@admit(INTERACTIVE)
 def get_spatial_mines():
     """Get all mines with spatial data, with optional filtering and pagination."""
     try:
@@ -586,7 +638,7 @@ def get_spatial_mines():
             ORDER BY country
         """
 
-        with get_connection() as conn:
+        with get_connection(readonly=True) as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cursor:
                 # Get rows
                 cursor.execute(query, params)
@@ -594,13 +646,18 @@ def get_spatial_mines():
                 result_data = [dict(row) for row in rows]
 
                 # Get total row count
-                cursor.execute(count_query, params)
-                total_rows = cursor.fetchone()['count']
+                total_rows = counts_cache.get_or_set(
+                    ('spatial_mines', tuple(where_conditions), tuple(params)),
+                    lambda: _fetch_one(cursor, count_query, params)['count'],
+                    tables=('data_clean.dim_locations', 'data_clean.dim_spatial')
+                )
 
                 # Get distinct countries
-                cursor.execute(countries_query)
-                country_rows = cursor.fetchall()
-                distinct_countries = [row['country'] for row in country_rows]
+                distinct_countries = counts_cache.get_or_set(
+                    ('distinct_countries',),
+                    lambda: _fetch_column(cursor, countries_query, 'country'),
+                    tables=('data_clean.dim_locations',)
+                )
 
                 result = {
                     "data": result_data,
@@ -617,12 +674,13 @@ def get_spatial_mines():
         return jsonify({"message": f"Failed to get spatial mines: {str(e)}"}), 400
 
 @bp.route('/spatial/mine/<mine_id>', methods=['GET'])
+@admit(INTERACTIVE)
 def get_spatial_mine(mine_id):
     """Get a specific mine with spatial data."""
     try:
         query = 'SELECT * FROM "data_clean"."dim_spatial" WHERE "mine_id" = %s'
 
-        with get_connection() as conn:
+        with get_connection(readonly=True) as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cursor:
                 cursor.execute(query, [mine_id])
                 row = cursor.fetchone()
@@ -642,6 +700,7 @@ def get_spatial_mine(mine_id):
     
 
 @bp.route('schemas/<schema_name>/tables/<table_name>/nearby', methods=['GET'])
+@admit(INTERACTIVE)
 def get_nearby_locations(schema_name, table_name):
     """Get nearby locations within a specified radius from given latitude and longitude."""
     try:
@@ -699,6 +758,7 @@ def get_nearby_locations(schema_name, table_name):
         return jsonify({"message": f"Failed to get nearby locations: {str(e)}"}), 400
     
 @bp.route('/schemas/<schema_name>/tables/<table_name>/rows', methods=['GET'])
+@admit(INTERACTIVE)
 def query_random_rows(schema_name, table_name):
     """Query multiple rows from a specific table."""
     try:
@@ -723,7 +783,7 @@ def query_random_rows(schema_name, table_name):
             if offset > 0:
                 query += f' OFFSET {offset}'
 
-        with get_connection() as conn:
+        with get_connection(readonly=True) as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cursor:
                 # Get rows
                 cursor.execute(query)
@@ -744,6 +804,7 @@ def query_random_rows(schema_name, table_name):
 
 # Route 7: Insert a new row
 @bp.route('/schemas/<schema_name>/tables/<table_name>/insert', methods=['POST'])
+@admit(INTERACTIVE)
 def insert_row(schema_name, table_name):
     """Insert a new row into a specific table."""
     try:
@@ -761,7 +822,9 @@ def insert_row(schema_name, table_name):
         with get_connection() as conn:
             with conn.cursor() as cursor:
                 cursor.execute(query, list(data.values()))
+                version = cache.notify_data_changed(conn, f'{schema_name}.{table_name}')
                 conn.commit()
+                cache.data_changed(f'{schema_name}.{table_name}', version)
 
         return jsonify({"message": "Row inserted successfully"}), 201
 
@@ -1,89 +1,365 @@
-from flask import Blueprint, jsonify, request
+import uuid
+import numpy as np
+from flask import Blueprint, Response, jsonify, request, stream_with_context, url_for
 from psycopg2.extras import RealDictCursor
 from src.utils.database import get_connection
-from src.ml.BaseModel import model_factory, BaseModel
+from src.utils.admission import ANALYTICS, INTERACTIVE, TRAINING, admit
 import json
-from ..ml.helpers import save_ml_results
+from ..ml import jobs, progress, registry, runs, scoring, whatif
 
 bp = Blueprint('model', __name__, url_prefix='/api/v1')
 
 
-def invoke_model(model: BaseModel, model_name: str):
-    try:
-        # Run the model - may return progress updates or None
-        result = model.invoke()
-
-        if result is not None:
-            # Handle models that yield progress updates
-            for progress in result:
-                step = progress.get('step', 'unknown')
-                status = progress.get('status', 'unknown')
-                message = progress.get('message', '')
-                #print(f"[{step.upper()}] {status}: {message}")
-        else:
-            # Handle models that don't yield progress updates
-            print("Model execution completed.")
+def _force() -> bool:
+    """Whether the request asked to bypass stored runs, as ?force=true or "force": true in the body."""
+    if request.args.get('force', '').lower() == 'true':
+        return True
+    data = request.get_json(silent=True)
+    return isinstance(data, dict) and data.get('force') is True
 
-        results = model.get_results()
 
-        save_ml_results(model_name, results)
+def invoke_model(model_type: str, model_name: str, force: bool = False):
+    """Run a model, or reuse the stored results of an identical run.
 
-        return results
+    Returns:
+        The run's result_id, results and whether they were cached, or {} on failure
+    """
+    try:
+        run = {}
+        for event in runs.execute(model_type, model_name, progress.ProgressTracker(), force):
+            run = event
+        return run
 
     except Exception as e:
         print(f"Error: {e}")
         return {}
 
 
+def stream_model(model_type: str, model_name: str, force: bool = False):
+    """Run a model, yielding its timed progress events and finally its results.
+
+    An identical stored run is returned as the only event, marked cached.
+    """
+    tracker = progress.ProgressTracker()
+    try:
+        yield from runs.execute(model_type, model_name, tracker, force)
+
+    except Exception as e:
+        yield tracker.event({'step': 'error', 'status': 'error', 'message': str(e), 'timings': tracker.timings()})
+
+
 
 @bp.route('/run/<model_id>', methods=['GET'])
+@admit(TRAINING)
 def run_model(model_id: str):
+    force = _force()
 
     if str(model_id) == '1':
         print(f"\nCreating Genetic Algorithm model...")
-        model = model_factory("genetic_algorithm")
-        run_model(model, "Genetic Algorithm")
+        run = invoke_model("genetic_algorithm", "Genetic Algorithm", force)
 
     elif str(model_id) == '2':
         print(f"\nCreating Clustering model...")
-        model = model_factory("clustering_algorithm")
-        run_model(model, "Clustering Algorithm")
+        run = invoke_model("clustering_algorithm", "Clustering Algorithm", force)
 
     elif str(model_id) == '3':
         print(f"\nCreating Linear model...")
-        model = model_factory("linear_model")
-        run_model(model, "Linear Model")
+        run = invoke_model("linear_model", "Linear Model", force)
+
+    elif str(model_id) == '4':
+        print(f"\nCreating Sensitivity Analysis model...")
+        run = invoke_model("sensitivity_analysis", "Sensitivity Analysis", force)
 
     else:
-        print("Invalid choice. Please select 1, 2, or 3.")
+        return jsonify({"error": "Invalid model ID"}), 400
+
+    return jsonify({
+        "model_name": model_id,
+        "results": run.get("results", {}),
+        "result_id": run.get("result_id"),
+        "cached": run.get("cached", False)
+    }), 200
 
 
 @bp.route('/train/<model_id>', methods=['POST'])
+@admit(TRAINING)
 def train_model(model_id: str):
+    force = _force()
 
     if str(model_id) == '1':
     
-        model = model_factory("genetic_algorithm")
-        results = invoke_model(model, "Genetic Algorithm")
+        run = invoke_model("genetic_algorithm", "Genetic Algorithm", force)
+        results = run.get("results", {})
 
     elif str(model_id) == '2':
     
-        model = model_factory("clustering_algorithm")
-        results = invoke_model(model, "Clustering Algorithm")
+        run = invoke_model("clustering_algorithm", "Clustering Algorithm", force)
+        results = run.get("results", {})
 
     elif str(model_id) == '3':
     
-        model = model_factory("linear_model")
-        results = json.dumps(invoke_model(model, "Linear Model"))
+        run = invoke_model("linear_model", "Linear Model", force)
+        results = json.dumps(run.get("results", {}))
         print(results)
 
+    elif str(model_id) == '4':
+
+        run = invoke_model("sensitivity_analysis", "Sensitivity Analysis", force)
+        results = run.get("results", {})
+
     else:
         return jsonify({"error": "Invalid model ID"}), 400
     
-    return jsonify({"message": "Model training initiated successfully", "model_name": model_id, "results": results}), 200
+    return jsonify({
+        "message": "Model training initiated successfully",
+        "model_name": model_id,
+        "results": results,
+        "result_id": run.get("result_id"),
+        "cached": run.get("cached", False)
+    }), 200
+
+
+@bp.route('/train/<model_id>/stream', methods=['GET', 'POST'])
+@admit(TRAINING)
+def stream_training(model_id: str):
+    """Train a model, streaming progress as NDJSON, or as SSE with ?format=sse or Accept: text/event-stream.
+
+    Every event carries a timestamp, the elapsed time of the run and of its step. The
+    last event holds the results, or the error that stopped the run.
+    """
+    if str(model_id) not in jobs.MODELS:
+        return jsonify({"error": "Invalid model ID"}), 400
+
+    model_type, model_name = jobs.MODELS[str(model_id)]
+    force = _force()
+
+    use_sse = request.args.get('format') == 'sse' or request.accept_mimetypes.best == 'text/event-stream'
+
+    def generate():
+        for event in stream_model(model_type, model_name, force):
+            if use_sse:
+                name = 'error' if event['status'] == 'error' else 'result' if 'results' in event else 'progress'
+                yield f"event: {name}\ndata: {progress.to_json(event)}\n\n"
+            else:
+                yield progress.to_json(event) + "\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream' if use_sse else 'application/x-ndjson',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
 
 
 @bp.route('/models', methods=['GET'])
+@admit(INTERACTIVE)
 def get_models():
+    """List registered model versions, newest first, optionally for one model id or type."""
+    try:
+        model_type = request.args.get('model_type')
+        model_id = request.args.get('model_id')
+        if model_id is not None:
+            if model_id not in jobs.MODELS:
+                return jsonify({"error": "Invalid model ID"}), 400
+            model_type = jobs.MODELS[model_id][0]
+
+        return jsonify({"data": registry.list_models(model_type)}), 200
+
+    except Exception as e:
+        return jsonify({"error": f"Failed to list models: {str(e)}"}), 400
+
+
+@bp.route('/models/<model_id>/score', methods=['POST'])
+@admit(ANALYTICS)
+def score_mines(model_id: str):
+    """Score mines with a trained model instead of retraining it.
+
+    Takes mine_ids (a list, or "all"), an optional version (default latest) and
+    limit/offset, and returns the page of mines sorted best first.
+    """
+    try:
+        if str(model_id) not in jobs.MODELS:
+            return jsonify({"error": "Invalid model ID"}), 400
+
+        data = request.get_json(silent=True) or {}
+        mine_ids = data.get('mine_ids', 'all')
+        version = data.get('version', 'latest')
+        limit = data.get('limit', 100)
+        offset = data.get('offset', 0)
+
+        if mine_ids == 'all':
+            mine_ids = None
+        elif not isinstance(mine_ids, list):
+            return jsonify({"error": "mine_ids must be a list of mine ids or \"all\""}), 400
+
+        model_type = jobs.MODELS[str(model_id)][0]
+        try:
+            page, total_rows, manifest = scoring.score(
+                model_type, None if version == 'latest' else int(version), mine_ids, offset, limit
+            )
+        except LookupError as e:
+            return jsonify({"error": str(e)}), 404
+
+        result_data = page.replace({np.nan: None}).to_dict('records')
+
+        return jsonify({
+            "model_type": model_type,
+            "version": manifest['version'],
+            "data_version": manifest['data_version'],
+            "data": result_data,
+            "limit": limit,
+            "offset": offset,
+            "returned_rows": len(result_data),
+            "total_rows": total_rows
+        }), 200
+
+    except Exception as e:
+        return jsonify({"error": f"Failed to score mines: {str(e)}"}), 400
+
+
+@bp.route('/models/<model_id>/clusters/<int:cluster>/members', methods=['GET'])
+@admit(ANALYTICS)
+def get_cluster_members(model_id: str, cluster: int):
+    """Page through the mines of one cluster of a trained clustering model.
+
+    Takes an optional version (default latest) and limit/offset, and returns the
+    cluster's mines closest to its centre first.
+    """
+    try:
+        if str(model_id) not in jobs.MODELS:
+            return jsonify({"error": "Invalid model ID"}), 400
+
+        model_type = jobs.MODELS[str(model_id)][0]
+        if model_type != 'clustering_algorithm':
+            return jsonify({"error": f"{model_type} has no clusters"}), 400
+
+        version = request.args.get('version', 'latest')
+        limit = request.args.get('limit', type=int, default=100)
+        offset = request.args.get('offset', type=int, default=0)
 
-    return jsonify({"message": "Model training initiated successfully"}), 501
\ No newline at end of file
+        try:
+            page, total_rows, manifest = scoring.cluster_members(
+                cluster, None if version == 'latest' else int(version), offset, limit
+            )
+        except LookupError as e:
+            return jsonify({"error": str(e)}), 404
+
+        result_data = page.replace({np.nan: None}).to_dict('records')
+
+        return jsonify({
+            "model_type": model_type,
+            "version": manifest['version'],
+            "data_version": manifest['data_version'],
+            "cluster": cluster,
+            "data": result_data,
+            "limit": limit,
+            "offset": offset,
+            "returned_rows": len(result_data),
+            "total_rows": total_rows
+        }), 200
+
+    except Exception as e:
+        return jsonify({"error": f"Failed to list cluster members: {str(e)}"}), 400
+
+
+@bp.route('/scoring/what-if', methods=['POST'])
+@admit(ANALYTICS)
+def what_if():
+    """Re-score every mine with overridden tier-score weights.
+
+    Takes optional tier_weights, scoring_config, country_scores and status_scores
+    overrides of the genetic algorithm's defaults and top_n (default 100), and
+    returns the top_n mines with their rank changes against the defaults.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        top_n = data.get('top_n', 100)
+        if isinstance(top_n, bool) or not isinstance(top_n, int) or top_n < 0:
+            return jsonify({"error": "top_n must be a non-negative integer"}), 400
+
+        try:
+            result = whatif.rescore(data, top_n)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        return jsonify({**result, "top_n": top_n, "returned_rows": len(result["data"])}), 200
+
+    except Exception as e:
+        return jsonify({"error": f"Failed to re-score mines: {str(e)}"}), 400
+
+
+def _valid_job_id(job_id: str) -> bool:
+    try:
+        uuid.UUID(job_id)
+        return True
+    except ValueError:
+        return False
+
+
+@bp.route('/jobs', methods=['POST'])
+@admit(INTERACTIVE)
+def create_job():
+    """Queue a model run for a worker and return its job id straight away."""
+    try:
+        data = request.get_json(silent=True) or {}
+        model_id = str(data.get('model_id', ''))
+
+        if model_id not in jobs.MODELS:
+            return jsonify({"error": "Invalid model ID"}), 400
+
+        job = jobs.enqueue(*jobs.MODELS[model_id], force=data.get('force') is True)
+        location = url_for('model.get_job', job_id=job['job_id'])
+
+        return jsonify({"message": "Model training queued", "model_name": model_id, "job": job}), 202, {"Location": location}
+
+    except Exception as e:
+        return jsonify({"error": f"Failed to queue model training: {str(e)}"}), 400
+
+
+@bp.route('/jobs', methods=['GET'])
+@admit(INTERACTIVE)
+def list_jobs():
+    """List recent model jobs, optionally filtered by status."""
+    try:
+        status = request.args.get('status')
+        limit = request.args.get('limit', type=int, default=50)
+
+        return jsonify({"data": jobs.list_jobs(status, limit)}), 200
+
+    except Exception as e:
+        return jsonify({"error": f"Failed to list jobs: {str(e)}"}), 400
+
+
+@bp.route('/jobs/<job_id>', methods=['GET'])
+@admit(INTERACTIVE)
+def get_job(job_id: str):
+    """Get a job's status and latest progress, with its results once it has succeeded."""
+    try:
+        job = jobs.get_job(job_id) if _valid_job_id(job_id) else None
+        if job is None:
+            return jsonify({"error": f"Job {job_id} not found"}), 404
+
+        return jsonify({"job": job}), 200
+
+    except Exception as e:
+        return jsonify({"error": f"Failed to get job: {str(e)}"}), 400
+
+
+@bp.route('/jobs/<job_id>/cancel', methods=['POST'])
+@admit(INTERACTIVE)
+def cancel_job(job_id: str):
+    """Cancel a queued or running job."""
+    try:
+        job = jobs.get_job(job_id, include_results=False) if _valid_job_id(job_id) else None
+        if job is None:
+            return jsonify({"error": f"Job {job_id} not found"}), 404
+
+        if job['status'] in jobs.FINISHED_STATUSES:
+            return jsonify({"error": f"Job {job_id} already {job['status']}", "job": job}), 409
+
+        return jsonify({"message": "Cancellation requested", "job": jobs.cancel(job_id)}), 200
+
+    except Exception as e:
+        return jsonify({"error": f"Failed to cancel job: {str(e)}"}), 400
@@ -0,0 +1,83 @@
+"""Operational endpoints for metrics scraping, health checks and slow query reports."""
+
+import datetime
+from flask import Blueprint, Response, jsonify, request
+from psycopg2.extras import RealDictCursor
+from src.utils import database, metrics, slow_queries
+
+bp = Blueprint('monitoring', __name__)
+
+
+@bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Expose per-route request and database metrics in Prometheus text format."""
+    return Response(metrics.render(), mimetype=metrics.CONTENT_TYPE)
+
+
+@bp.route('/health/deep', methods=['GET'])
+def deep_health_check():
+    """Health check including connection pool status and database ping latency."""
+    result = {
+        "status": "healthy",
+        "timestamp": datetime.datetime.now().isoformat(),
+        "database": {"pool": database.pool_status()}
+    }
+
+    try:
+        result["database"]["ping_ms"] = round(database.ping() * 1000, 3)
+    except Exception as e:
+        result["status"] = "unhealthy"
+        result["database"]["error"] = str(e)
+        return jsonify(result), 503
+
+    return jsonify(result), 200
+
+
+@bp.route('/slow-queries', methods=['GET'])
+def get_slow_queries():
+    """List the routes with the most time spent in slow queries, with their worst statement."""
+    try:
+        limit = request.args.get('limit', type=int, default=20)
+        hours = request.args.get('hours', type=float, default=24)
+
+        routes_query = """
+            SELECT
+                route,
+                COUNT(*) AS occurrences,
+                ROUND(SUM(duration_ms)::numeric, 3)::FLOAT AS total_ms,
+                ROUND(AVG(duration_ms)::numeric, 3)::FLOAT AS avg_ms,
+                ROUND((PERCENTILE_CONT(0.95) WITHIN GROUP (ORDER BY duration_ms))::numeric, 3)::FLOAT AS p95_ms,
+                ROUND(MAX(duration_ms)::numeric, 3)::FLOAT AS max_ms,
+                MAX(created_at) AS last_seen
+            FROM public.slow_queries
+            WHERE created_at >= NOW() - make_interval(secs => %s)
+            GROUP BY route
+            ORDER BY total_ms DESC
+            LIMIT %s
+        """
+
+        # Slowest captured statement per route, preferring ones with a plan
+        worst_query = """
+            SELECT DISTINCT ON (route)
+                route, id, query_hash, query, param_shape, duration_ms, row_count, plan, created_at
+            FROM public.slow_queries
+            WHERE created_at >= NOW() - make_interval(secs => %s)
+              AND route = ANY(%s)
+            ORDER BY route, (plan IS NOT NULL) DESC, duration_ms DESC
+        """
+
+        with database.get_connection(readonly=True) as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(routes_query, [hours * 3600, limit])
+                routes = [dict(row) for row in cursor.fetchall()]
+
+                cursor.execute(worst_query, [hours * 3600, [row['route'] for row in routes]])
+                worst = {row['route']: dict(row) for row in cursor.fetchall()}
+
+        for row in routes:
+            row['worst_query'] = worst.get(row['route'])
+
+        return jsonify({"threshold_ms": slow_queries.SLOW_QUERY_MS, "hours": hours, "data": routes}), 200
+
+    except Exception as e:
+        return jsonify({"message": f"Failed to get slow queries: {str(e)}"}), 400
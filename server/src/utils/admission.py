@@ -0,0 +1,239 @@
+"""Admission control for API endpoints.
+
+Endpoints are grouped into request classes with their own concurrency limit and
+bounded wait queue, sharing one overall concurrency budget. When a slot frees up
+it goes to the highest priority waiter that its class limit allows, so
+interactive reads beat analytics, which beat training. Requests are rejected with
+429 and a Retry-After header as soon as their class queue is full, or when they
+have waited longer than the class timeout.
+"""
+
+import os
+import math
+import time
+import heapq
+import itertools
+import functools
+import threading
+from contextlib import contextmanager
+
+from flask import jsonify, make_response
+from src.utils import logging, metrics
+
+logger = logging.setup()
+
+INTERACTIVE = "interactive"
+ANALYTICS = "analytics"
+TRAINING = "training"
+
+# Lower runs first
+PRIORITIES = {INTERACTIVE: 0, ANALYTICS: 1, TRAINING: 2}
+
+ADMISSION_MAX_CONCURRENT = int(os.getenv('ADMISSION_MAX_CONCURRENT', 16))
+
+# Per class (concurrency limit, queue size, queue timeout in seconds)
+DEFAULT_LIMITS = {
+    INTERACTIVE: (16, 64, 10),
+    ANALYTICS: (4, 16, 15),
+    TRAINING: (1, 2, 5),
+}
+
+
+def _limits(request_class: str) -> tuple:
+    limit, queue, timeout = DEFAULT_LIMITS[request_class]
+    prefix = f"ADMISSION_{request_class.upper()}"
+    return (
+        int(os.getenv(f"{prefix}_LIMIT", limit)),
+        int(os.getenv(f"{prefix}_QUEUE", queue)),
+        float(os.getenv(f"{prefix}_TIMEOUT", timeout))
+    )
+
+
+WAIT_TIME = metrics.histogram("lucent_admission_wait_seconds", "Time requests waited for admission.", ("request_class",))
+REJECTED = metrics.counter("lucent_admission_rejected_total", "Requests rejected by admission control.", ("request_class", "reason"))
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted."""
+
+    def __init__(self, request_class: str, reason: str, retry_after: int) -> None:
+        super().__init__(f"{request_class} capacity exhausted ({reason})")
+        self.request_class = request_class
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("request_class", "granted")
+
+    def __init__(self, request_class: str) -> None:
+        self.request_class = request_class
+        self.granted = False
+
+
+class AdmissionController:
+    """Priority admission over per-class and overall concurrency limits."""
+
+    def __init__(self, max_concurrent: int = ADMISSION_MAX_CONCURRENT) -> None:
+        self.max_concurrent = max_concurrent
+        self.limits = {request_class: _limits(request_class) for request_class in PRIORITIES}
+        self.running = {request_class: 0 for request_class in PRIORITIES}
+        self.queued = {request_class: 0 for request_class in PRIORITIES}
+        # Smoothed time each class holds a slot, used to suggest Retry-After
+        self.hold_time = {request_class: 1.0 for request_class in PRIORITIES}
+        self._waiters = []
+        self._order = itertools.count()
+        self._condition = threading.Condition()
+
+    def _can_run(self, request_class: str) -> bool:
+        return (
+            sum(self.running.values()) < self.max_concurrent
+            and self.running[request_class] < self.limits[request_class][0]
+        )
+
+    def _grant_waiters(self):
+        """Hand free slots to waiters in priority then arrival order. Caller holds the lock."""
+        granted = False
+        remaining = []
+        while self._waiters:
+            entry = heapq.heappop(self._waiters)
+            waiter = entry[2]
+            if self._can_run(waiter.request_class):
+                waiter.granted = True
+                self.running[waiter.request_class] += 1
+                self.queued[waiter.request_class] -= 1
+                granted = True
+            else:
+                remaining.append(entry)
+        for entry in remaining:
+            heapq.heappush(self._waiters, entry)
+        if granted:
+            self._condition.notify_all()
+
+    def retry_after(self, request_class: str) -> int:
+        """Seconds a rejected client should wait, from the queue ahead of it and typical hold time."""
+        limit = self.limits[request_class][0]
+        backlog = self.queued[request_class] + self.running[request_class]
+        return max(1, math.ceil(self.hold_time[request_class] * backlog / max(limit, 1)))
+
+    def acquire(self, request_class: str):
+        """Wait for a slot for request_class, raising AdmissionRejected when none is available in time."""
+        _, queue_size, timeout = self.limits[request_class]
+        start = time.perf_counter()
+
+        with self._condition:
+            # Eligible waiters are always granted straight away, so anyone still queued is blocked
+            if self._can_run(request_class):
+                self.running[request_class] += 1
+                WAIT_TIME.observe(0.0, request_class=request_class)
+                return
+
+            if self.queued[request_class] >= queue_size:
+                REJECTED.inc(request_class=request_class, reason="queue_full")
+                raise AdmissionRejected(request_class, "queue full", self.retry_after(request_class))
+
+            waiter = _Waiter(request_class)
+            self.queued[request_class] += 1
+            heapq.heappush(self._waiters, (PRIORITIES[request_class], next(self._order), waiter))
+            self._grant_waiters()
+
+            deadline = time.monotonic() + timeout
+            while not waiter.granted:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+
+            if not waiter.granted:
+                self._waiters = [entry for entry in self._waiters if entry[2] is not waiter]
+                heapq.heapify(self._waiters)
+                self.queued[request_class] -= 1
+                REJECTED.inc(request_class=request_class, reason="timeout")
+                raise AdmissionRejected(request_class, "timed out waiting", self.retry_after(request_class))
+
+        WAIT_TIME.observe(time.perf_counter() - start, request_class=request_class)
+
+    def release(self, request_class: str, held: float = None):
+        with self._condition:
+            self.running[request_class] -= 1
+            if held is not None:
+                self.hold_time[request_class] = 0.8 * self.hold_time[request_class] + 0.2 * held
+            self._grant_waiters()
+
+    @contextmanager
+    def slot(self, request_class: str):
+        """Hold a slot for request_class for the duration of the block."""
+        self.acquire(request_class)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(request_class, time.perf_counter() - start)
+
+    def status(self) -> dict:
+        with self._condition:
+            return {
+                request_class: {
+                    "running": self.running[request_class],
+                    "queued": self.queued[request_class],
+                    "limit": self.limits[request_class][0],
+                    "queue_size": self.limits[request_class][1]
+                }
+                for request_class in PRIORITIES
+            }
+
+
+controller = AdmissionController()
+
+
+def admit(request_class: str):
+    """Admit a Flask view through the shared controller.
+
+    Streamed responses hold their slot until the stream is closed.
+    """
+    if request_class not in PRIORITIES:
+        raise ValueError(f"Unknown request class: {request_class}")
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                controller.acquire(request_class)
+            except AdmissionRejected as e:
+                logger.warning(f"Rejected {view.__name__}: {e}")
+                response = jsonify({"message": f"Server busy, retry later: {e}"})
+                response.status_code = 429
+                response.headers["Retry-After"] = str(e.retry_after)
+                return response
+
+            start = time.perf_counter()
+
+            def release():
+                controller.release(request_class, time.perf_counter() - start)
+
+            try:
+                response = make_response(view(*args, **kwargs))
+            except Exception:
+                release()
+                raise
+
+            if response.is_streamed:
+                response.call_on_close(release)
+            else:
+                release()
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+metrics.register_gauge(
+    "lucent_admission_requests",
+    "Requests running and queued per admission class.",
+    lambda: [
+        ({"request_class": request_class, "state": state}, status[state])
+        for request_class, status in controller.status().items()
+        for state in ("running", "queued", "limit", "queue_size")
+    ]
+)
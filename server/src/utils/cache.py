@@ -0,0 +1,256 @@
+"""In-process caches kept coherent across workers with Postgres LISTEN/NOTIFY.
+
+Writers call notify_data_changed() inside their transaction. That bumps the
+persistent version in public.data_versions and issues
+NOTIFY lucent_data_changed, which Postgres delivers to every listening worker
+once the transaction commits. Each worker runs one listener thread that records
+the new version and evicts cache entries depending on the changed table. The
+writer calls data_changed() once it has committed, so its own worker evicts
+without waiting for the notification.
+
+Cache entries declare the tables they were built from as "schema.table" scopes.
+"schema.*" depends on every table in a schema and "*" matches everything.
+"""
+
+import os
+import json
+import time
+import select
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Iterable
+
+from src.utils import database, logging, metrics
+
+logger = logging.setup()
+
+CHANNEL = "lucent_data_changed"
+
+CACHE_TTL = float(os.getenv('CACHE_TTL', 300))
+CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 1024))
+CACHE_LISTEN = os.getenv('CACHE_LISTEN', 'true').lower() == 'true'
+
+# Replicas may still be replaying a change after it is announced, so values loaded
+# shortly after an invalidation are only kept until they must have caught up
+CACHE_SETTLE_SECONDS = database.DB_REPLICA_MAX_LAG if database.DB_REPLICA_DSNS else 0
+
+HITS = metrics.counter("lucent_cache_hits_total", "Cache lookups served from memory.", ("cache",))
+MISSES = metrics.counter("lucent_cache_misses_total", "Cache lookups that ran the loader.", ("cache",))
+EVICTIONS = metrics.counter("lucent_cache_invalidations_total", "Cache entries evicted by data changes.", ("cache",))
+
+_caches = []
+_versions = {}
+_versions_lock = threading.Lock()
+_invalidated_at = {}
+
+
+def scopes_overlap(a: str, b: str) -> bool:
+    """Return True when two table scopes refer to overlapping data."""
+    if a == "*" or b == "*" or a == b:
+        return True
+    if a.endswith(".*") and b.startswith(a[:-1]):
+        return True
+    if b.endswith(".*") and a.startswith(b[:-1]):
+        return True
+    return False
+
+
+class Cache:
+    """Thread-safe LRU cache whose entries are evicted when their tables change."""
+
+    def __init__(self, name: str, ttl: float = CACHE_TTL, max_entries: int = CACHE_MAX_ENTRIES) -> None:
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation so loads that raced a write are not stored
+        self._generation = 0
+        _caches.append(self)
+
+    def get_or_set(self, key, loader: Callable[[], Any], tables: Iterable[str] = (), ttl: float = None) -> Any:
+        """Return the cached value for key, calling loader on a miss.
+
+        Args:
+            key: Hashable cache key
+            loader: Called with no arguments to build the value
+            tables: Scopes the value was built from
+            ttl: Override the cache's default time to live in seconds
+        """
+        ensure_listener()
+        tables = tuple(tables)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                HITS.inc(cache=self.name)
+                return entry[0]
+            generation = self._generation
+
+        MISSES.inc(cache=self.name)
+        value = loader()
+
+        ttl = ttl if ttl is not None else self.ttl
+        if _recently_invalidated(tables):
+            ttl = min(ttl, CACHE_SETTLE_SECONDS)
+
+        with self._lock:
+            if generation == self._generation and ttl > 0:
+                expires = now + ttl
+                self._entries[key] = (value, expires, tables)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        return value
+
+    def invalidate(self, scope: str = "*") -> int:
+        """Evict every entry depending on scope. Entries without tables only go on "*"."""
+        with self._lock:
+            self._generation += 1
+            stale = [
+                key for key, (_, _, tables) in self._entries.items()
+                if scope == "*" or any(scopes_overlap(scope, table) for table in tables)
+            ]
+            for key in stale:
+                del self._entries[key]
+
+        if stale:
+            EVICTIONS.inc(len(stale), cache=self.name)
+        return len(stale)
+
+
+def _recently_invalidated(tables: tuple) -> bool:
+    if not CACHE_SETTLE_SECONDS:
+        return False
+    cutoff = time.monotonic() - CACHE_SETTLE_SECONDS
+    with _versions_lock:
+        recent = [scope for scope, at in _invalidated_at.items() if at >= cutoff]
+    return any(scope == "*" or any(scopes_overlap(scope, table) for table in tables) for scope in recent)
+
+
+def data_version(scope: str = "*") -> int:
+    """Latest data version this worker has seen for a scope (0 when none yet)."""
+    with _versions_lock:
+        return _versions.get(scope, _versions.get("*", 0))
+
+
+def invalidate(scope: str = "*", version: int = None):
+    """Record a new version for scope and evict matching entries in every cache of this worker."""
+    with _versions_lock:
+        _invalidated_at[scope] = time.monotonic()
+        if version is not None:
+            _versions[scope] = max(version, _versions.get(scope, 0))
+            _versions["*"] = max(version, _versions.get("*", 0))
+
+    for cache in list(_caches):
+        cache.invalidate(scope)
+
+
+def notify_data_changed(conn, scope: str = "*") -> int:
+    """Publish a change to scope from inside the writer's transaction on conn.
+
+    Workers are notified when the transaction commits. Call data_changed() with
+    the returned version after the commit to apply it to this worker at once.
+
+    Returns:
+        The new data version
+    """
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO public.data_versions (scope, version, changed_at)
+            SELECT scope, (EXTRACT(EPOCH FROM clock_timestamp()) * 1000)::BIGINT, NOW()
+            FROM unnest(%s::TEXT[]) AS scope
+            ON CONFLICT (scope) DO UPDATE
+                SET version = GREATEST(public.data_versions.version + 1, EXCLUDED.version),
+                    changed_at = EXCLUDED.changed_at
+            RETURNING scope, version
+            """,
+            # The "*" row tracks the latest change to anything
+            [sorted({scope, "*"})]
+        )
+        versions = dict(cursor.fetchall())
+        version = versions[scope]
+
+        cursor.execute("SELECT pg_notify(%s, %s)", [CHANNEL, json.dumps({"scope": scope, "version": version})])
+
+    return version
+
+
+def data_changed(scope: str, version: int):
+    """Apply a committed change to this worker's caches and send the client's next reads to the primary.
+
+    Not done inside the transaction, where a reload could cache the old data or a
+    rollback would leave the caches ahead of the database.
+    """
+    invalidate(scope, version)
+    # Replicas may not have this change yet, so this client's next reads go to the primary
+    database.pin_to_primary()
+
+
+_listener = None
+_listener_pid = None
+_listener_lock = threading.Lock()
+
+
+def ensure_listener():
+    """Start this process's listener thread if it is not already running."""
+    global _listener, _listener_pid
+
+    if not CACHE_LISTEN:
+        return
+
+    # A forked worker inherits the flag but not the thread
+    if _listener is not None and _listener_pid == os.getpid() and _listener.is_alive():
+        return
+
+    with _listener_lock:
+        if _listener is None or _listener_pid != os.getpid() or not _listener.is_alive():
+            _listener = threading.Thread(target=_listen, name="cache-listener", daemon=True)
+            _listener_pid = os.getpid()
+            _listener.start()
+
+
+def _handle(payload: str):
+    try:
+        message = json.loads(payload)
+        scope, version = message.get("scope", "*"), message.get("version")
+    except (ValueError, AttributeError):
+        # Plain NOTIFY lucent_data_changed, 'schema.table' from SQL scripts
+        scope, version = payload or "*", None
+
+    invalidate(scope, version)
+
+
+def _listen():
+    backoff = 1
+    while True:
+        conn = None
+        try:
+            conn = database.get_direct_connection()
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {CHANNEL}")
+            logger.info(f"Listening for data changes on {CHANNEL}")
+
+            # Changes may have been missed while disconnected
+            invalidate("*")
+            backoff = 1
+
+            while True:
+                if select.select([conn], [], [], 5) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    _handle(conn.notifies.pop(0).payload)
+
+        except Exception as e:
+            logger.warning(f"Data change listener disconnected, retrying in {backoff}s: {e}")
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 60)
+        finally:
+            if conn is not None:
+                conn.close()
@@ -0,0 +1,224 @@
+"""In-process request metrics exposed in the Prometheus text format."""
+
+import time
+import threading
+import contextvars
+from typing import Callable, Iterable
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels.items():
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter keyed by label values."""
+
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(labels.get(label, "") for label in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> Iterable[tuple]:
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Histogram:
+    """Cumulative histogram keyed by label values."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets) + (float("inf"),)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(labels.get(label, "") for label in self.labelnames)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._values[key] = (counts, total + value)
+
+    def samples(self) -> Iterable[tuple]:
+        with self._lock:
+            values = {key: (list(counts), total) for key, (counts, total) in self._values.items()}
+        for key, (counts, total) in sorted(values.items()):
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+
+class Gauge:
+    """Gauge whose samples are produced by a callback at scrape time."""
+
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], Iterable[tuple]]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self._callback = callback
+
+    def samples(self) -> Iterable[tuple]:
+        for labels, value in self._callback():
+            yield self.name, labels, value
+
+
+_registry = []
+_registry_lock = threading.Lock()
+
+
+def _register(metric):
+    with _registry_lock:
+        _registry.append(metric)
+    return metric
+
+
+def counter(name: str, documentation: str, labelnames: tuple = ()) -> Counter:
+    """Create and register a counter."""
+    return _register(Counter(name, documentation, labelnames))
+
+
+def histogram(name: str, documentation: str, labelnames: tuple = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+    """Create and register a histogram."""
+    return _register(Histogram(name, documentation, labelnames, buckets))
+
+
+def register_gauge(name: str, documentation: str, callback: Callable[[], Iterable[tuple]]) -> Gauge:
+    """Register a gauge. The callback returns (labels, value) pairs when scraped."""
+    return _register(Gauge(name, documentation, callback))
+
+
+def render() -> str:
+    """Render every registered metric in the Prometheus text exposition format."""
+    with _registry_lock:
+        registered = list(_registry)
+
+    lines = []
+    for metric in registered:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        for name, labels, value in metric.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+REQUESTS = counter("lucent_http_requests_total", "HTTP requests handled.", ("route", "method", "status"))
+REQUEST_LATENCY = histogram("lucent_http_request_duration_seconds", "Time to produce a response.", ("route", "method"))
+RESPONSE_BYTES = histogram("lucent_http_response_bytes", "Response payload size.", ("route", "method"), BYTES_BUCKETS)
+DB_TIME = histogram("lucent_db_time_seconds", "Time spent executing queries per request.", ("route", "method"))
+DB_QUERIES = counter("lucent_db_queries_total", "Queries executed.", ("route", "method"))
+DB_ROWS = counter("lucent_db_rows_total", "Rows returned or affected by queries.", ("route", "method"))
+POOL_WAIT = histogram("lucent_db_pool_wait_seconds", "Time spent waiting for a pooled connection per request.", ("route", "method"))
+
+
+class RequestStats:
+    """Database work attributed to the request being handled."""
+
+    __slots__ = ("route", "method", "started", "db_time", "queries", "rows", "pool_wait")
+
+    def __init__(self, route: str, method: str) -> None:
+        self.route = route
+        self.method = method
+        self.started = time.perf_counter()
+        self.db_time = 0.0
+        self.queries = 0
+        self.rows = 0
+        self.pool_wait = 0.0
+
+
+_current = contextvars.ContextVar("lucent_request_stats", default=None)
+
+
+def current_stats():
+    """Get the stats of the request being handled, if any."""
+    return _current.get()
+
+
+def record_query(duration: float, rows: int) -> None:
+    """Attribute a query to the current request."""
+    stats = _current.get()
+    if stats is not None:
+        stats.db_time += duration
+        stats.queries += 1
+        stats.rows += rows
+
+
+def record_pool_wait(duration: float) -> None:
+    """Attribute time spent waiting on the connection pool to the current request."""
+    stats = _current.get()
+    if stats is not None:
+        stats.pool_wait += duration
+
+
+def init_app(app) -> None:
+    """Instrument every request handled by the Flask app."""
+    from flask import request
+
+    @app.before_request
+    def _start_request_stats():
+        _current.set(RequestStats(request.endpoint or "unmatched", request.method))
+
+    @app.after_request
+    def _record_request_stats(response):
+        stats = _current.get()
+        if stats is None:
+            return response
+
+        labels = {"route": stats.route, "method": stats.method}
+        REQUESTS.inc(route=stats.route, method=stats.method, status=str(response.status_code))
+        REQUEST_LATENCY.observe(time.perf_counter() - stats.started, **labels)
+        DB_TIME.observe(stats.db_time, **labels)
+        DB_QUERIES.inc(stats.queries, **labels)
+        DB_ROWS.inc(stats.rows, **labels)
+        POOL_WAIT.observe(stats.pool_wait, **labels)
+
+        # Streamed responses have no known length until the body has been sent
+        if response.content_length is not None:
+            RESPONSE_BYTES.observe(response.content_length, **labels)
+        elif not response.is_streamed:
+            RESPONSE_BYTES.observe(len(response.get_data()), **labels)
+
+        return response
+
+    @app.teardown_request
+    def _reset_request_stats(_error=None):
+        _current.set(None)
@@ -0,0 +1,133 @@
+"""Slow query capture for the server's database layer.
+
+Statements slower than SLOW_QUERY_MS are queued and written to public.slow_queries
+by a background thread. A sample of read-only statements is re-run with
+EXPLAIN (ANALYZE, BUFFERS) inside a read-only transaction so the plan is stored
+alongside the timing. Parameter values are never stored, only their types.
+"""
+
+import os
+import json
+import queue
+import random
+import hashlib
+import threading
+
+from src.utils import logging, metrics, sql
+
+logger = logging.setup()
+
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 500))
+SLOW_QUERY_EXPLAIN_RATE = float(os.getenv('SLOW_QUERY_EXPLAIN_RATE', 0.1))
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = int(os.getenv('SLOW_QUERY_EXPLAIN_TIMEOUT_MS', 30000))
+SLOW_QUERY_QUEUE_SIZE = int(os.getenv('SLOW_QUERY_QUEUE_SIZE', 1000))
+
+_queue = queue.Queue(maxsize=SLOW_QUERY_QUEUE_SIZE)
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def _param_shape(params):
+    """Describe parameters by type only so no values end up in the log."""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return {key: type(value).__name__ for key, value in params.items()}
+    return [type(value).__name__ for value in params]
+
+
+def record(query, params, duration: float, rows: int):
+    """Queue a slow statement for capture. Never blocks the caller."""
+    if isinstance(query, bytes):
+        query = query.decode()
+    elif not isinstance(query, str):
+        # psycopg2.sql.Composable needs a connection to render, skip it
+        return
+
+    stats = metrics.current_stats()
+    explain = sql.is_read_only(query) and random.random() < SLOW_QUERY_EXPLAIN_RATE
+
+    entry = {
+        "route": stats.route if stats else "background",
+        "query": query,
+        "query_hash": hashlib.md5(sql.normalise(query).encode()).hexdigest(),
+        "param_shape": _param_shape(params),
+        "duration_ms": duration * 1000,
+        "row_count": rows,
+        # Parameters are only held in memory for the EXPLAIN re-run
+        "params": params if explain else None,
+        "explain": explain
+    }
+
+    _ensure_worker()
+    try:
+        _queue.put_nowait(entry)
+    except queue.Full:
+        logger.warning(f"Slow query queue full, dropping entry for route {entry['route']}")
+
+
+def _ensure_worker():
+    global _worker
+
+    if _worker is None or not _worker.is_alive():
+        with _worker_lock:
+            if _worker is None or not _worker.is_alive():
+                _worker = threading.Thread(target=_run, name="slow-query-writer", daemon=True)
+                _worker.start()
+
+
+def _explain(conn, entry: dict):
+    """Re-run a read-only statement under EXPLAIN ANALYZE and discard its effects."""
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SET TRANSACTION READ ONLY")
+            cursor.execute("SET LOCAL statement_timeout = %s", [SLOW_QUERY_EXPLAIN_TIMEOUT_MS])
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {entry['query']}", entry['params'])
+            return cursor.fetchone()[0]
+    except Exception as e:
+        logger.warning(f"Failed to capture plan for slow query {entry['query_hash']}: {e}")
+        return None
+    finally:
+        conn.rollback()
+
+
+def _insert(conn, entry: dict, plan):
+    query = """
+        INSERT INTO public.slow_queries (route, query_hash, query, param_shape, duration_ms, row_count, plan)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """
+
+    with conn.cursor() as cursor:
+        cursor.execute(query, [
+            entry['route'],
+            entry['query_hash'],
+            entry['query'],
+            json.dumps(entry['param_shape']) if entry['param_shape'] is not None else None,
+            entry['duration_ms'],
+            entry['row_count'],
+            json.dumps(plan) if plan is not None else None
+        ])
+    conn.commit()
+
+
+def _run():
+    # Imported here as the database module hooks into this one
+    from src.utils import database
+
+    conn = None
+    while True:
+        entry = _queue.get()
+        try:
+            if conn is None or conn.closed:
+                conn = database.get_direct_connection()
+
+            plan = _explain(conn, entry) if entry['explain'] else None
+            _insert(conn, entry, plan)
+
+        except Exception as e:
+            logger.error(f"Failed to record slow query: {e}")
+            if conn is not None:
+                conn.close()
+            conn = None
+        finally:
+            _queue.task_done()
@@ -0,0 +1,45 @@
+"""Helpers for inspecting raw SQL statements."""
+
+import re
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_QUOTED = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|\$(\w*)\$.*?\$\1\$", re.DOTALL)
+
+READ_ONLY_KEYWORDS = {'SELECT', 'WITH', 'VALUES', 'TABLE', 'SHOW'}
+
+WRITE_KEYWORDS = {
+    'INSERT', 'UPDATE', 'DELETE', 'MERGE', 'UPSERT', 'CREATE', 'DROP', 'ALTER', 'TRUNCATE',
+    'GRANT', 'REVOKE', 'COPY', 'CALL', 'DO', 'LOCK', 'VACUUM', 'ANALYZE', 'REFRESH', 'INTO',
+    'NEXTVAL', 'SETVAL', 'NOTIFY', 'LISTEN', 'SET', 'RESET', 'COMMENT', 'REINDEX', 'CLUSTER'
+}
+
+_LOCKING_CLAUSE = re.compile(r"\bFOR\s+(NO\s+KEY\s+|KEY\s+)?(UPDATE|SHARE)\b")
+
+
+def normalise(sql: str) -> str:
+    """Strip comments, literals and quoted identifiers, collapse whitespace and upper-case the rest."""
+    stripped = _COMMENTS.sub(" ", sql)
+    stripped = _QUOTED.sub(" ? ", stripped)
+    return " ".join(stripped.split()).upper().rstrip("; ")
+
+
+def is_read_only(sql: str) -> bool:
+    """Return True when a statement can only read data.
+
+    The check is conservative: multiple statements, data-modifying CTEs, locking
+    clauses and SELECT ... INTO are all treated as writes. Side effects hidden
+    inside functions cannot be detected, so callers should still execute the
+    statement in a read-only transaction where it matters.
+    """
+    statement = normalise(sql)
+    if not statement or ";" in statement:
+        return False
+
+    tokens = re.findall(r"[A-Z_]+", statement)
+    if not tokens or tokens[0] not in READ_ONLY_KEYWORDS:
+        return False
+
+    if _LOCKING_CLAUSE.search(statement):
+        return False
+
+    return not any(token in WRITE_KEYWORDS for token in tokens[1:])
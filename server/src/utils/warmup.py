@@ -0,0 +1,57 @@
+"""Background warm-up of heavy subsystems so the API can serve requests immediately."""
+
+import os
+import time
+import threading
+from importlib import import_module
+
+from src.utils import logging
+
+logger = logging.setup()
+
+WARM_UP_ON_START = os.getenv('WARM_UP_ON_START', 'true').lower() == 'true'
+
+# Imported in order, cheapest first, so the common paths are ready soonest
+WARM_UP_MODULES = [
+    "src.ml.models.deap",
+    "src.ml.models.sklearn",
+    "src.ml.models.pytorch",
+]
+
+
+def _warm_up():
+    for module in WARM_UP_MODULES:
+        start = time.perf_counter()
+        try:
+            import_module(module)
+            logger.info(f"Warm-up imported {module} in {time.perf_counter() - start:.2f}s")
+        except Exception as e:
+            logger.warning(f"Warm-up failed to import {module}: {e}")
+
+    start = time.perf_counter()
+    try:
+        from src.ml import snapshot
+        snapshot.load_features()
+        logger.info(f"Warm-up loaded the feature snapshot in {time.perf_counter() - start:.2f}s")
+    except Exception as e:
+        # Models build it on their first run instead
+        logger.warning(f"Warm-up failed to load the feature snapshot: {e}")
+
+    start = time.perf_counter()
+    try:
+        from src.ai.agent import LucentBot
+        LucentBot.with_tools()
+        logger.info(f"Warm-up built Lucent Bot in {time.perf_counter() - start:.2f}s")
+    except Exception as e:
+        # The assistant retries on its first request instead
+        logger.warning(f"Warm-up failed to build Lucent Bot: {e}")
+
+
+def start():
+    """Start warming up in a daemon thread unless disabled with WARM_UP_ON_START=false."""
+    if not WARM_UP_ON_START:
+        return None
+
+    thread = threading.Thread(target=_warm_up, name="warm-up", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Model training worker.
+
+Claims queued model runs from public.model_jobs and runs them one at a time.
+Start as many workers as there are cores to spare, on this node or others:
+
+    poetry run python worker.py
+"""
+
+import os
+import time
+import select
+import signal
+import socket
+import argparse
+
+from src.ml import jobs
+from src.utils import database
+from src.utils.logging import setup
+
+logger = setup()
+
+stopping = False
+
+
+def request_stop(signum, _frame):
+    """Finish the current job, then exit."""
+    global stopping
+    stopping = True
+    logger.info(f"Received signal {signum}, stopping after the current job")
+
+
+def listen():
+    """Open a connection notified whenever a job is queued."""
+    conn = database.get_direct_connection()
+    conn.autocommit = True
+    with conn.cursor() as cursor:
+        cursor.execute(f"LISTEN {jobs.JOB_CHANNEL}")
+    return conn
+
+
+def wait_for_job(conn, timeout: float):
+    """Block until a job is queued or the timeout passes."""
+    if select.select([conn], [], [], timeout) != ([], [], []):
+        conn.poll()
+        conn.notifies.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run queued model training jobs")
+    parser.add_argument("--worker-id", default=f"{socket.gethostname()}:{os.getpid()}",
+                        help="Name recorded against claimed jobs (default: host:pid)")
+    parser.add_argument("--poll-interval", type=float, default=5,
+                        help="Seconds between polls when no notification arrives (default: 5)")
+    parser.add_argument("--once", action="store_true", help="Run every queued job, then exit")
+    args = parser.parse_args()
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    conn = None
+    logger.info(f"Worker {args.worker_id} started")
+
+    try:
+        while not stopping:
+            try:
+                job = jobs.claim(args.worker_id)
+            except Exception as e:
+                logger.error(f"Failed to claim a job: {e}")
+                time.sleep(args.poll_interval)
+                continue
+
+            if job is not None:
+                jobs.run(job)
+                continue
+
+            if args.once:
+                break
+
+            try:
+                if conn is None:
+                    conn = listen()
+                wait_for_job(conn, args.poll_interval)
+            except Exception as e:
+                # Fall back to polling until the notification connection is back
+                logger.warning(f"Job notifications unavailable: {e}")
+                if conn is not None:
+                    conn.close()
+                    conn = None
+                time.sleep(args.poll_interval)
+    finally:
+        if conn is not None:
+            conn.close()
+
+    logger.info(f"Worker {args.worker_id} stopped")
+
+
+if __name__ == "__main__":
+    main()